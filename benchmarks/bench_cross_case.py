@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cross-case semantic search benchmark at 10k+ cases.
+
+Fills a throwaway shared collection with N cases × M chunks of synthetic legal
+text (eval_dataset.json excerpts with randomised parties and statutes), embedded
+with the offline hashing function, then times search_all_cases() for:
+    unfiltered · restricted case set · ingest-date range · deep page
+
+Usage:
+    python benchmarks/bench_cross_case.py --cases 10000 --chunks 5 --queries 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pipeline.rag as rag
+from benchmarks.synthetic import load_cases
+from tests.fakes import HashingEmbeddingFunction
+
+_NAMES = ["Khan", "Ahmed", "Malik", "Qureshi", "Siddiqui", "Butt", "Chaudhry", "Raza", "Iqbal", "Sheikh"]
+_ORGS = ["Textiles", "Traders", "Builders", "Motors", "Pharma", "Steel", "Logistics", "Foods", "Estates", "Bank"]
+_STATUTES = ["Section 489-F PPC", "Industrial Relations Act 2012", "Contract Act 1872 s.73",
+             "Specific Relief Act s.12", "Payment of Wages Act 1936", "PECA 2016 s.20"]
+
+
+def _chunk(rng: random.Random, excerpt: str) -> str:
+    start = rng.randrange(0, max(1, len(excerpt) - 600))
+    return (
+        f"Respondent {rng.choice(_NAMES)} {rng.choice(_ORGS)} Ltd. Petitioner {rng.choice(_NAMES)}. "
+        f"Relief sought under {rng.choice(_STATUTES)}. {excerpt[start:start + 600]}"
+    )
+
+
+def _pct(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=10_000)
+    parser.add_argument("--chunks", type=int, default=5, help="chunks per case")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    excerpts = [c["document_excerpt"] for c in load_cases()]
+    embed = HashingEmbeddingFunction()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rag.CHROMA_DIR = tmp
+        rag.EMBEDDING_FUNCTION = embed
+        shared = rag._get_all_cases_collection()
+
+        started = time.perf_counter()
+        base_ts = int(time.time()) - 365 * 86400
+        ids, docs, metas = [], [], []
+
+        def flush():
+            shared.add(ids=ids, documents=docs, embeddings=embed(docs), metadatas=metas)
+            ids.clear(), docs.clear(), metas.clear()
+
+        for case_id in range(1, args.cases + 1):
+            ingested_at = base_ts + (case_id * 365 * 86400) // args.cases
+            excerpt = excerpts[case_id % len(excerpts)]
+            for i in range(args.chunks):
+                ids.append(f"c{case_id}_chunk_{i}")
+                docs.append(_chunk(rng, excerpt))
+                metas.append({"case_id": case_id, "chunk_index": i, "ingested_at": ingested_at})
+            if len(ids) >= 2_000:
+                flush()
+        if ids:
+            flush()
+        load_s = time.perf_counter() - started
+        print(f"\n⏱  {args.cases:,} cases · {shared.count():,} chunks loaded in {load_s:.0f}s")
+
+        case_set = rng.sample(range(1, args.cases + 1), 50)
+        mid = time.strftime("%Y-%m-%d", time.gmtime(base_ts + 180 * 86400))
+        end = time.strftime("%Y-%m-%d", time.gmtime(base_ts + 210 * 86400))
+
+        def query() -> str:
+            return f"{rng.choice(_ORGS)} {rng.choice(_STATUTES)}"
+
+        workloads = {
+            "all cases":         lambda: rag.search_all_cases(query(), budget_ms=0),
+            "50-case set":       lambda: rag.search_all_cases(query(), case_ids=case_set, budget_ms=0),
+            "30-day range":      lambda: rag.search_all_cases(query(), since=mid, until=end, budget_ms=0),
+            "page 5 (deep)":     lambda: rag.search_all_cases(query(), page=5, budget_ms=0),
+        }
+        print(f"\n   {'query':18s} {'p50 ms':>8s} {'p99 ms':>8s} {'cases/page':>11s}")
+        for name, run in workloads.items():
+            samples, cases = [], 0
+            for _ in range(args.queries):
+                t0 = time.perf_counter()
+                cases += len(run().case_ids())
+                samples.append(time.perf_counter() - t0)
+            print(f"   {name:18s} {1000 * _pct(samples, 50):8.1f} {1000 * _pct(samples, 99):8.1f} {cases / args.queries:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
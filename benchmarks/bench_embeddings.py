@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Embedding engine benchmark: throughput and quantized-cache recall.
+
+Chunks come from eval_dataset.json filings padded with procedural boilerplate and
+split by the pipeline's chunker. Two tables are printed:
+
+    throughput  chunks/sec of EmbeddingProvider for each batch size × thread count
+    cache       bytes per vector, on-disk cache size and retrieval agreement with
+                fresh float32 vectors for each cache precision (float32 / float16 / int8).
+                Chroma always receives float32; only cache hits are served quantized, so
+                each corpus is embedded once to fill the cache and ranked on the second,
+                cache-served pass. Agreement = share of the fresh top-k chunks (per case,
+                per brief retrieval query) that the cache-served vectors also rank in
+                their top-k.
+
+The default backend is the local ONNX MiniLM (downloaded on first use).
+--backend hashing runs fully offline with the test suite's hashing embeddings.
+
+Usage:
+    python benchmarks/bench_embeddings.py --pad-pages 10 --batch 8,32,64 --threads 1,2,4
+    python benchmarks/bench_embeddings.py --backend hashing
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pipeline.rag as rag
+from benchmarks.synthetic import load_cases
+from pipeline.embeddings import EmbeddingProvider, MiniLMBackend, VectorCodec
+from tests.fakes import HashingEmbeddingFunction, pad_filing
+
+
+def _corpus(pad_pages: int) -> dict[int, list[str]]:
+    return {
+        case["id"]: [c.text for c in rag.CHUNKER.split(pad_filing(case["document_excerpt"], pad_pages, seed=case["id"]))]
+        for case in load_cases()
+    }
+
+
+def _top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> list[set[int]]:
+    scores = query_vectors @ doc_vectors.T
+    return [set(np.argsort(-row, kind="stable")[:k]) for row in scores]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["minilm", "hashing"], default="minilm")
+    parser.add_argument("--pad-pages", type=int, default=10, help="boilerplate pages around each filing")
+    parser.add_argument("--batch", default="8,32,64", help="comma-separated batch sizes")
+    parser.add_argument("--threads", default="1,2,4", help="comma-separated worker thread counts")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = _corpus(args.pad_pages)
+    texts = [t for chunks in corpus.values() for t in chunks]
+    print(f"\n⏱  {len(texts)} chunks from {len(corpus)} filings ({args.pad_pages} boilerplate pages each), "
+          f"backend={args.backend}")
+
+    def backend(threads: int):
+        if args.backend == "hashing":
+            return HashingEmbeddingFunction()
+        return MiniLMBackend(intra_op_threads=max(1, (os.cpu_count() or 1) // threads))
+
+    # Warm up (model download / session build) outside the timings
+    EmbeddingProvider(backend(1), cache_path="")(texts[:4])
+
+    print(f"\n   {'batch':>5s} {'threads':>7s} {'chunks/s':>10s}")
+    for batch in map(int, args.batch.split(",")):
+        for threads in map(int, args.threads.split(",")):
+            provider = EmbeddingProvider(backend(threads), batch_size=batch, threads=threads, cache_path="")
+            provider(texts)
+            print(f"   {batch:5d} {threads:7d} {provider.stats()['chunks_per_s']:10.1f}")
+
+    print(f"\n   {'cache':8s} {'B/vector':>8s} {'cache MB':>9s} {f'top-{args.top_k} agree':>13s}")
+    baseline = None
+    for dtype in VectorCodec.DTYPES:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "cache.sqlite")
+            provider = EmbeddingProvider(backend(1), cache_dtype=dtype, cache_path=cache_path)
+            started = time.perf_counter()
+            tops = []
+            for chunks in corpus.values():
+                provider(chunks)
+            for chunks in corpus.values():
+                docs = np.stack(provider(chunks))
+                queries = np.stack(provider(rag._RETRIEVAL_QUERIES))
+                tops.append(_top_k(docs, queries, args.top_k))
+            provider.cache.close()
+            size_mb = os.path.getsize(cache_path) / 1e6
+        dim = len(docs[0])
+        if baseline is None:
+            baseline = tops
+        agree = np.mean([len(a & b) / len(a) for case_a, case_b in zip(baseline, tops)
+                         for a, b in zip(case_a, case_b) if a])
+        print(f"   {dtype:8s} {VectorCodec(dtype).bytes_per_vector(dim):8d} {size_mb:9.2f} {agree:13.3f}"
+              f"   ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
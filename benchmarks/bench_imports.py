@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the oracle and guardrail entry points.
+
+Each module is imported in a fresh interpreter (median of --runs) so nothing is
+shared between measurements. The heavy SDKs (anthropic, chromadb, langgraph, pypdf,
+web3) should load on first use, not at import — the "heavy" column lists the ones a
+module pulled in anyway.
+
+Usage:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --runs 7 --max-ms 500   # exit 1 over budget
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "oracle_utils", "hash_evidence", "monitor_vault",
+    "pipeline.errors", "pipeline.guardrails", "pipeline.metrics",
+    "pipeline.ipfs", "pipeline.graph", "pipeline.rag",
+]
+HEAVY = ("anthropic", "chromadb", "langgraph", "langsmith", "pypdf", "web3")
+
+_PROBE = """
+import json, sys, time
+sys.path[:0] = [{scripts!r}, {root!r}]
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str) -> dict:
+    probe = _PROBE.format(scripts=os.path.join(ROOT, "scripts"), root=ROOT, module=module, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=0.0,
+                        help="fail if oracle_utils / hash_evidence / pipeline.guardrails exceed this")
+    args = parser.parse_args()
+
+    print(f"\n   {'module':22s} {'median ms':>10s}  heavy")
+    over = []
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.runs)]
+        ms = statistics.median(r["ms"] for r in runs)
+        print(f"   {module:22s} {ms:10.1f}  {', '.join(runs[-1]['heavy']) or '-'}")
+        if args.max_ms and module in ("oracle_utils", "hash_evidence", "pipeline.guardrails") and ms > args.max_ms:
+            over.append(module)
+    if over:
+        print(f"\n✗ over {args.max_ms:.0f} ms: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
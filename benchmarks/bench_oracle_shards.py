@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Multi-instance oracle benchmark: throughput vs instance count, duplicate handling.
+
+N oracle processes dispatch the same event stream (monitor_vault.dispatch) against
+one shared lease database and event ledger. Each event's handler stands in for the
+pipeline: it sleeps --work-s (Claude / IPFS latency) and burns --cpu-ms of CPU. Every
+handled event is recorded in a shared SQLite table, so the report can show how many
+events each instance took and whether any was handled twice. After the run the whole
+stream is dispatched once more by a fresh instance (a restart replaying from block 0);
+"replayed" counts the events it handled again.
+
+Usage:
+    python benchmarks/bench_oracle_shards.py --instances 1,2,4 --events 80 --work-s 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "scripts"), ROOT]
+
+import monitor_vault
+from case_leases import LeaseStore
+from event_ledger import EventLedger
+from tests.fakes import FakeEvent
+
+
+def _instance(name: str, lease_db: str, ledger_db: str, log_db: str, events: int, cases: int, work_s: float, cpu_ms: float,
+              start: multiprocessing.Event) -> None:
+    log = sqlite3.connect(log_db, timeout=30, isolation_level=None)
+
+    def handle(event):
+        time.sleep(work_s)
+        until = time.perf_counter() + cpu_ms / 1000
+        while time.perf_counter() < until:
+            pass
+        log.execute("INSERT INTO handled VALUES (?, ?)", (event["logIndex"], name))
+
+    monitor_vault._HANDLERS = {"EvidenceFiled": handle}
+    leases, ledger = LeaseStore(lease_db, name), EventLedger(ledger_db)
+    pending = [("EvidenceFiled", FakeEvent(i % cases, i)) for i in range(events)]
+    start.wait()
+    while pending:
+        pending = monitor_vault.dispatch(pending, leases, ledger)
+        if pending:
+            time.sleep(0.01)    # the oracle polls every 2 s; short here so waiting does not dominate
+
+
+def run(instances: int, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        lease_db, log_db = os.path.join(tmp, "leases.sqlite"), os.path.join(tmp, "handled.sqlite")
+        ledger_db = os.path.join(tmp, "events.sqlite")
+        LeaseStore(lease_db).close()
+        EventLedger(ledger_db).close()
+        with sqlite3.connect(log_db) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE handled (log_index INTEGER, instance TEXT)")
+        ctx = multiprocessing.get_context("fork")
+        start = ctx.Event()
+        procs = [ctx.Process(target=_instance, args=(f"oracle-{i}", lease_db, ledger_db, log_db, args.events, args.cases,
+                                                     args.work_s, args.cpu_ms, start))
+                 for i in range(instances)]
+        for p in procs:
+            p.start()
+        time.sleep(0.5)
+        started = time.perf_counter()
+        start.set()
+        for p in procs:
+            p.join()
+        wall = time.perf_counter() - started
+        replay = ctx.Process(target=_instance, args=("replay", lease_db, ledger_db, log_db, args.events, args.cases,
+                                                     args.work_s, args.cpu_ms, start))
+        replay.start()
+        replay.join()
+        with sqlite3.connect(log_db) as conn:
+            rows = conn.execute("SELECT log_index, instance FROM handled WHERE instance != 'replay'").fetchall()
+            replayed = conn.execute("SELECT COUNT(*) FROM handled WHERE instance = 'replay'").fetchone()[0]
+    per_instance = sorted(sum(1 for _, name in rows if name == f"oracle-{i}") for i in range(instances))
+    return {
+        "instances": instances, "wall_s": wall, "events_per_s": len(rows) / wall,
+        "handled": len(rows), "duplicates": len(rows) - len({i for i, _ in rows}), "split": per_instance,
+        "replayed": replayed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", default="1,2,4", help="comma-separated instance counts")
+    parser.add_argument("--events", type=int, default=80)
+    parser.add_argument("--cases", type=int, default=40, help="distinct case_ids the events belong to")
+    parser.add_argument("--work-s", type=float, default=0.2, help="simulated I/O wait per event")
+    parser.add_argument("--cpu-ms", type=float, default=20.0, help="simulated CPU per event")
+    args = parser.parse_args()
+
+    print(f"\n⏱  {args.events} events over {args.cases} cases, {args.work_s}s wait + {args.cpu_ms} ms CPU each")
+    print(f"\n   {'instances':>9s} {'wall s':>8s} {'events/s':>9s} {'speedup':>8s} {'dupes':>6s} {'replayed':>8s}  split")
+    base = None
+    for n in map(int, args.instances.split(",")):
+        r = run(n, args)
+        base = base or r["events_per_s"]
+        print(f"   {n:9d} {r['wall_s']:8.2f} {r['events_per_s']:9.2f} {r['events_per_s'] / base:7.2f}x "
+              f"{r['duplicates']:6d} {r['replayed']:8d}  {r['split']}")
+
+
+if __name__ == "__main__":
+    main()
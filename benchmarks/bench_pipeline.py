@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with synthetic filings and stubbed services.
+
+- Synthetic legal PDFs (configurable page count) built from tests/eval_dataset.json
+- LocalIPFS HTTP stand-in serves them; the real IPFSFetcher downloads them
+- FakeAnthropic with configurable latency replaces Claude
+- Hashing embeddings in a throwaway Chroma store (--embeddings default for ONNX MiniLM)
+
+Drives build_graph(...).stream() to BRIEF_GENERATED for every case and reports
+per-node latency percentiles, throughput and peak memory. Results are written as
+JSON (tagged with the git commit) so runs can be diffed with --compare.
+
+Usage:
+    python benchmarks/bench_pipeline.py --cases 20 --pages 10 --concurrency 4
+    python benchmarks/bench_pipeline.py --pages 2 --direct-tokens 0     # short filings without the fast path
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline_<sha>.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from langgraph.checkpoint.memory import MemorySaver
+
+import pipeline.graph as graph
+import pipeline.rag as rag
+from benchmarks.synthetic import LocalIPFS, load_cases, synthetic_filing
+from oracle_utils import sha256_file
+from pipeline.ipfs import IPFSFetcher
+from pipeline.spool import DocumentSpool
+from tests.fakes import FakeAnthropic, HashingEmbeddingFunction
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+_NODES = ["receive", "integrity_check", "embedding", "analysis", "direct_analysis", "brief_generated"]
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 2),
+        "p50_ms": round(1000 * pct(50), 2),
+        "p90_ms": round(1000 * pct(90), 2),
+        "p99_ms": round(1000 * pct(99), 2),
+        "max_ms": round(1000 * ordered[-1], 2),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _run_case(pipeline, case_id: int, cid: str, file_hash: bytes) -> dict:
+    state = {
+        "case_id": case_id, "ipfs_cid": cid, "file_hash": file_hash, "local_path": "",
+        "status": "RECEIVED", "integrity_verified": False, "pii_flags": [],
+        "injection_detected": False, "chunk_count": 0, "ai_brief": "", "error": "",
+    }
+    config = {"configurable": {"thread_id": f"bench_{case_id}"}}
+    timings: dict[str, float] = {}
+    started = last = time.perf_counter()
+    status = "RECEIVED"
+    for update in pipeline.stream(state, config, stream_mode="updates"):
+        now = time.perf_counter()
+        for node, values in update.items():
+            timings[node] = now - last
+            if isinstance(values, dict) and values.get("status"):
+                status = values["status"]
+        last = now
+    return {"case_id": case_id, "status": status, "total": time.perf_counter() - started, "nodes": timings}
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    cases = load_cases()
+    with tempfile.TemporaryDirectory() as tmp, LocalIPFS(latency_s=args.ipfs_latency) as ipfs:
+        graph._spool = DocumentSpool(os.path.join(tmp, "spool"), quota_bytes=int(args.spool_quota_mb * 1024 * 1024))
+        graph._fetcher = IPFSFetcher([ipfs.gateway], timeout_s=30)
+        rag.CHROMA_DIR = os.path.join(tmp, "chroma")
+        graph.DIRECT_BRIEF_TOKENS = args.direct_tokens
+        if args.embeddings == "hashing":
+            rag.EMBEDDING_FUNCTION = HashingEmbeddingFunction()
+
+        jobs = []
+        for i in range(args.cases):
+            case = cases[i % len(cases)]
+            content = synthetic_filing(case, args.pages, seed=i)
+            cid = ipfs.add(content)
+            path = os.path.join(tmp, f"{cid}.pdf")
+            with open(path, "wb") as f:
+                f.write(content)
+            jobs.append((80_000 + i, cid, bytes.fromhex(sha256_file(path))))
+        doc_bytes = sum(len(d) for d in ipfs.docs.values())
+
+        ai_client = FakeAnthropic(latency_s=args.llm_latency)
+        pipeline = graph.build_graph(ai_client, lambda path, h: sha256_file(path) == h.hex(), MemorySaver())
+
+        # Warm-up: Chroma client, embedding model and PDF parser initialisation
+        _run_case(pipeline, 79_999, *jobs[0][1:])
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda job: _run_case(pipeline, *job), jobs))
+        wall = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        spool = graph._spool.usage()
+        if args.tracemalloc:
+            tracemalloc.stop()
+
+    failed = [r for r in results if r["status"] != "BRIEF_GENERATED"]
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "cases": args.cases, "pages": args.pages, "concurrency": args.concurrency,
+            "llm_latency_s": args.llm_latency, "ipfs_latency_s": args.ipfs_latency,
+            "embeddings": args.embeddings, "doc_bytes_total": doc_bytes,
+            "spool_quota_mb": args.spool_quota_mb, "direct_tokens": args.direct_tokens,
+        },
+        "throughput_cases_per_s": round(len(results) / wall, 3),
+        "wall_s": round(wall, 3),
+        "failed": len(failed),
+        "end_to_end": _percentiles([r["total"] for r in results]),
+        "nodes": {node: _percentiles([r["nodes"][node] for r in results if node in r["nodes"]]) for node in _NODES},
+        "memory": {
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before_kb) / 1024, 1),
+            "tracemalloc_peak_mb": round(traced_peak / 1e6, 1) if traced_peak is not None else None,
+        },
+        "spool": spool,
+    }
+
+
+def _print_report(report: dict, baseline: dict | None) -> None:
+    cfg = report["config"]
+    print(f"\n⏱  {cfg['cases']} cases × {cfg['pages']} pages, concurrency {cfg['concurrency']} "
+          f"(commit {report['commit']})")
+    print(f"   throughput: {report['throughput_cases_per_s']} cases/s · failed: {report['failed']}")
+    print(f"   memory: peak RSS {report['memory']['peak_rss_mb']} MB")
+    if "spool" in report:
+        print(f"   spool: {report['spool']['files']} files, {report['spool']['disk_bytes'] / 1e6:.2f} MB on disk "
+              f"(quota {cfg['spool_quota_mb']} MB), {report['spool']['pinned']} pinned")
+    print(f"\n   {'stage':18s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s}" + ("   Δp50" if baseline else ""))
+    rows = [("end_to_end", report["end_to_end"])] + list(report["nodes"].items())
+    for name, stats in rows:
+        if not stats:
+            continue
+        line = f"   {name:18s} {stats['p50_ms']:9.1f} {stats['p90_ms']:9.1f} {stats['p99_ms']:9.1f}"
+        if baseline:
+            base = baseline["end_to_end"] if name == "end_to_end" else baseline["nodes"].get(name, {})
+            if base.get("p50_ms"):
+                line += f"   {100 * (stats['p50_ms'] - base['p50_ms']) / base['p50_ms']:+.0f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5, help="pages per synthetic filing")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per stub Claude call")
+    parser.add_argument("--ipfs-latency", type=float, default=0.0, help="seconds per gateway response")
+    parser.add_argument("--embeddings", choices=["hashing", "default"], default="hashing")
+    parser.add_argument("--spool-quota-mb", type=float, default=2048, help="document spool quota")
+    parser.add_argument("--direct-tokens", type=int, default=graph.DIRECT_BRIEF_TOKENS,
+                        help="full-text fast path threshold (0 = every case through retrieval)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report Python heap peak (slower)")
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/results/pipeline_<commit>.json)")
+    parser.add_argument("--compare", help="baseline result JSON to diff against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline_{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Scheduler benchmark: time-to-brief under FIFO vs shortest-job-first with aging.
+
+Discrete-event simulation of one oracle (virtual clock, nothing sleeps). Filings
+arrive as a Poisson stream; most are short motions, a few are large bundles. Each
+job takes --fixed-s (Claude, IPFS round trips) plus --per-page-s per page. The
+same arrival trace is replayed through pipeline.scheduler.CaseScheduler under each
+policy; time-to-brief = wait in queue + processing. Slowdown = time-to-brief ÷
+processing time: the fairness measure, since a bundle is expected to take longer.
+
+Usage:
+    python benchmarks/bench_scheduler.py --jobs 2000 --load 0.85
+    python benchmarks/bench_scheduler.py --aging 0.1,0.5,2 --max-wait 0,60,120
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pipeline.scheduler import CaseScheduler
+
+
+def _trace(args: argparse.Namespace) -> list[tuple[float, int, float, bool]]:
+    """(arrival_s, case_id, pages, urgent) with arrival rate set for the requested load."""
+    rng = random.Random(args.seed)
+    pages = [rng.randint(1000, 2000) if rng.random() < args.bundle_share else rng.randint(2, 12)
+             for _ in range(args.jobs)]
+    mean_service = statistics.mean(args.fixed_s + p * args.per_page_s for p in pages)
+    rate = args.load / mean_service
+    t, trace = 0.0, []
+    for case_id, p in enumerate(pages):
+        t += rng.expovariate(rate)
+        trace.append((t, case_id, float(p), rng.random() < args.urgent_share))
+    return trace
+
+
+def simulate(trace, scheduler: CaseScheduler, args: argparse.Namespace) -> list[tuple[float, float, bool]]:
+    """Returns (pages, time_to_brief_s, urgent, slowdown) per job."""
+    out, now, i = [], 0.0, 0
+    while i < len(trace) or len(scheduler):
+        while i < len(trace) and trace[i][0] <= now:
+            arrival, case_id, pages, urgent = trace[i]
+            if urgent:
+                scheduler.set_priority(case_id, "urgent")
+            scheduler.add(case_id, (arrival, pages, urgent), pages, now=arrival)
+            i += 1
+        job = scheduler.pop(now=now)
+        if job is None:
+            now = trace[i][0]
+            continue
+        arrival, pages, urgent = job.item
+        service = args.fixed_s + pages * args.per_page_s
+        now += service
+        out.append((pages, now - arrival, urgent, (now - arrival) / service))
+    return out
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--load", type=float, default=0.85, help="offered load (utilisation of one oracle)")
+    parser.add_argument("--bundle-share", type=float, default=0.02, help="share of 1000-2000 page bundles")
+    parser.add_argument("--urgent-share", type=float, default=0.02)
+    parser.add_argument("--fixed-s", type=float, default=3.0)
+    parser.add_argument("--per-page-s", type=float, default=0.05)
+    parser.add_argument("--aging", default="0.5", help="comma-separated SCHED_AGING_S values to compare")
+    parser.add_argument("--max-wait", default="0,60",
+                        help="comma-separated SCHED_MAX_WAIT_S values to compare (0 = no deadline)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    trace = _trace(args)
+    print(f"\n⏱  {args.jobs} filings at load {args.load}, {args.bundle_share:.0%} bundles, "
+          f"{args.urgent_share:.0%} urgent (time-to-brief, seconds)")
+    print(f"\n   {'policy':22s} {'p50':>7s} {'p90':>7s} {'p99':>7s} {'max':>7s} {'bundle max':>10s} "
+          f"{'urgent p50':>10s} {'slowdown p99':>12s} {'slowdown max':>12s}")
+    policies = [("fifo", CaseScheduler("fifo"))] + [
+        (f"sjf aging={a} wait={w}", CaseScheduler("sjf", aging_s=float(a), max_wait_s=float(w)))
+        for a in args.aging.split(",") for w in args.max_wait.split(",")
+    ]
+    for name, scheduler in policies:
+        done = simulate(trace, scheduler, args)
+        times = [t for _, t, _, _ in done]
+        bundles = [t for p, t, _, _ in done if p >= 1000] or [0.0]
+        urgent = [t for _, t, u, _ in done if u] or [0.0]
+        slowdown = [s for _, _, _, s in done]
+        print(f"   {name:22s} {statistics.median(times):7.1f} {_pct(times, 0.9):7.1f} {_pct(times, 0.99):7.1f} "
+              f"{max(times):7.1f} {max(bundles):10.1f} {statistics.median(urgent):10.1f} "
+              f"{_pct(slowdown, 0.99):12.1f} {max(slowdown):12.1f}")
+
+
+if __name__ == "__main__":
+    main()
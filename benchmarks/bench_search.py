@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Search index benchmark: bulk-load N synthetic feed entries, then time queries.
+
+Entries reuse eval_dataset.json briefs with randomised party names, statuses,
+PII flags and timestamps, so the FTS vocabulary looks like a real feed.
+
+Usage:
+    python benchmarks/bench_search.py --entries 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from benchmarks.synthetic import load_cases
+from search_index import SearchIndex
+
+_NAMES = ["Khan", "Ahmed", "Malik", "Qureshi", "Siddiqui", "Butt", "Chaudhry", "Raza", "Iqbal", "Sheikh",
+          "Hussain", "Javed", "Rana", "Mirza", "Abbasi", "Baig", "Nawaz", "Shah", "Akhtar", "Zaidi"]
+_ORGS = ["Textiles", "Traders", "Builders", "Motors", "Pharma", "Steel", "Logistics", "Foods", "Estates", "Bank"]
+_STATUSES = ["BRIEF_GENERATED"] * 5 + ["VALIDATED"] * 4 + ["REJECTED"]
+_PII = ["NIC", "phone", "iban", "account_number", "medical_record"]
+
+
+def _entry(rng: random.Random, case: dict, case_id: int, index: int) -> dict:
+    petitioner = f"{rng.choice(_NAMES)} {rng.choice(_NAMES)}"
+    respondent = f"{rng.choice(_NAMES)} {rng.choice(_ORGS)} Ltd"
+    brief = (
+        f"**Parties Involved:**\n- Petitioner: {petitioner}\n- Respondent: {respondent}\n\n"
+        f"**Key Claims:**\n- {case['document_excerpt'][:400]}\n\n"
+        f"**Summary:**\n- {case['description'][:300]}"
+    )
+    day = rng.randrange(0, 730)
+    return {
+        "caseId": case_id, "index": index, "status": rng.choice(_STATUSES),
+        "integrity_verified": rng.random() > 0.02, "ai_summary": brief,
+        "pii_flags": rng.sample(_PII, rng.randrange(0, 3)), "chunk_count": rng.randrange(1, 40),
+        "timestamp_processed": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1_700_000_000 + day * 86400)),
+        "file_hash_hex": "%064x" % rng.getrandbits(256), "ipfs_cid": "Qm%044x" % rng.getrandbits(176),
+    }
+
+
+def _pct(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = load_cases()
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(os.path.join(tmp, "index.sqlite"))
+        started = time.perf_counter()
+        batch = []
+        for i in range(args.entries):
+            batch.append(_entry(rng, cases[i % len(cases)], 1_000 + i // 3, i % 3))
+            if len(batch) == 5_000:
+                index.add_many(batch)
+                batch = []
+        index.add_many(batch)
+        load_s = time.perf_counter() - started
+        size_mb = os.path.getsize(os.path.join(tmp, "index.sqlite")) / 1e6
+        print(f"\n⏱  Indexed {index.count():,} entries in {load_s:.1f}s ({index.count() / load_s:,.0f}/s), {size_mb:.0f} MB")
+
+        workloads = {
+            "party name":        lambda: index.search(f"{rng.choice(_NAMES)} {rng.choice(_ORGS)}"),
+            "prefix (typing)":   lambda: index.search(rng.choice(_NAMES)[:3]),
+            "text + status":     lambda: index.search(rng.choice(_ORGS), status="BRIEF_GENERATED"),
+            "text + date range": lambda: index.search(rng.choice(_NAMES), since="2024-01-01", until="2024-06-30"),
+            "metadata only":     lambda: index.search(status="REJECTED", integrity=False),
+            "CID lookup":        None,
+        }
+        cids = [r["ipfs_cid"] for r in index.search(limit=args.queries)]
+        workloads["CID lookup"] = lambda: index.search(rng.choice(cids))
+
+        print(f"\n   {'query':20s} {'p50 ms':>8s} {'p99 ms':>8s} {'hits':>6s}")
+        for name, run in workloads.items():
+            samples, hits = [], 0
+            for _ in range(args.queries):
+                t0 = time.perf_counter()
+                hits += len(run())
+                samples.append(time.perf_counter() - t0)
+            print(f"   {name:20s} {1000 * _pct(samples, 50):8.2f} {1000 * _pct(samples, 99):8.2f} {hits / args.queries:6.1f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Vector store lifecycle benchmark: space and startup time reclaimed by archiving
+finished cases, and the cost of restoring one on demand.
+
+Ingests N synthetic cases (offline hashing embeddings) into a throwaway embedded
+store, archives all but --live of them, compacts, and reports:
+    store size · cold startup (fresh interpreter) · archive size · restore latency
+
+Usage:
+    python benchmarks/bench_vector_archive.py --cases 300 --live 30 --chunks 40
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "scripts")]
+
+import pipeline.rag as rag
+from archive_vectors import startup_ms
+from benchmarks.synthetic import load_cases
+from tests.fakes import HashingEmbeddingFunction
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1e6:7.1f} MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--live", type=int, default=30, help="cases left in the live store")
+    parser.add_argument("--chunks", type=int, default=40, help="chunks per case (about 1,000 characters each)")
+    parser.add_argument("--restores", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    excerpts = [c["document_excerpt"] for c in load_cases()]
+    with tempfile.TemporaryDirectory() as tmp:
+        rag.CHROMA_DIR = os.path.join(tmp, "chroma")
+        rag.VECTOR_ARCHIVE_DIR = os.path.join(tmp, "archive")
+        rag.EMBEDDING_FUNCTION = HashingEmbeddingFunction()
+
+        started = time.perf_counter()
+        for case_id in range(1, args.cases + 1):
+            text = "\n\n".join(rng.choice(excerpts)[:1000] for _ in range(args.chunks))
+            rag.ingest_text(text, case_id)
+        print(f"Ingested {args.cases} cases in {time.perf_counter() - started:.1f}s\n")
+
+        size_before, startup_before = rag.store_bytes(), startup_ms(rag.CHROMA_DIR)
+        finished = rag.live_case_ids()[args.live:]
+        started = time.perf_counter()
+        archive_bytes = sum(rag.archive_case(c) for c in finished)
+        archive_s = time.perf_counter() - started
+        size_deleted = rag.store_bytes()
+        rag._chroma_client = None
+        started = time.perf_counter()
+        reclaimed = rag.compact_store()
+        compact_s = time.perf_counter() - started
+        size_after, startup_after = rag.store_bytes(), startup_ms(rag.CHROMA_DIR)
+
+        print(f"{'':28}{'store':>10}  {'startup':>9}")
+        print(f"{f'{args.cases} cases live':28}{_mb(size_before)}  {startup_before:6.0f} ms")
+        print(f"{f'{len(finished)} archived, no compaction':28}{_mb(size_deleted)}")
+        print(f"{f'{len(finished)} archived + compacted':28}{_mb(size_after)}  {startup_after:6.0f} ms")
+        print(f"\nArchive: {_mb(archive_bytes).strip()} for {len(finished)} cases "
+              f"({archive_s:.1f}s); compaction reclaimed {_mb(reclaimed).strip()} in {compact_s:.1f}s")
+
+        samples = []
+        for case_id in rng.sample(finished, min(args.restores, len(finished))):
+            started = time.perf_counter()
+            rag.retrieve_chunks(case_id, "relief sought")
+            samples.append(1000 * (time.perf_counter() - started))
+        print(f"Restore on first query: median {statistics.median(samples):.0f} ms, max {max(samples):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
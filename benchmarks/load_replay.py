@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Load replay against a local Anvil chain: filing-to-brief and validate-to-VALIDATED
+latency under realistic filing traffic, and where the oracle saturates as its
+concurrency grows.
+
+Per step (one instance count × one filing rate):
+    1. JusticeVault is deployed from the out/ artifact exactly as
+       scripts/DeployJusticeVault.s.sol deploys it (admin = deployer, Anvil account 0);
+       LAWYER_ROLE and JUDGE_ROLE are granted to further Anvil accounts
+    2. --instances oracle processes run the real monitor_vault.log_loop against it,
+       sharing the lease database, event ledger, checkpoints and feed as deployed
+       instances do. IPFS is a local gateway stand-in serving synthetic PDFs, Claude is
+       FakeAnthropic (--llm-latency), embeddings are the offline hashing function,
+       and each instance keeps its own embedded Chroma store
+    3. Lawyers call submitEvidence on a Poisson schedule at --rate filings/s for
+       --duration s, plus --burst extra filings every --burst-every s. A judge calls
+       validateEvidence --review-s after each brief appears in the feed
+    4. filing-to-brief:          submitEvidence receipt → feed entry for that event
+       validate-to-VALIDATED:    validateEvidence receipt → checkpoint status VALIDATED
+
+A step is saturated when briefs complete at under 90% of the offered rate, p95
+filing-to-brief exceeds --slo-s, or filings are still unfinished --drain-s after the
+last submission. The report gives, per instance count, the highest rate that held.
+
+anvil (Foundry) must be on PATH, unless --rpc-url points at a running node whose
+eth_accounts are unlocked (any Anvil).
+
+Usage:
+    python benchmarks/load_replay.py --instances 1,2,4 --rates 0.5,1,2,4 --duration 60
+    python benchmarks/load_replay.py --instances 2 --rates 1 --burst 20 --burst-every 30 --pages 2,10,80
+    python benchmarks/load_replay.py --rpc-url http://127.0.0.1:8545 --instances 1 --rates 0.5
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "scripts"), ROOT]
+
+from web3 import Web3
+
+import monitor_vault
+from benchmarks.synthetic import LocalIPFS, load_cases, synthetic_filing
+from config import ABI_PATH
+from event_ledger import event_key
+from feed_store import FeedStore
+from oracle_utils import sha256_file
+from pipeline.checkpoint import open_checkpointer
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+_ANVIL_ACCOUNTS = 20
+
+
+# ---------------------------------------------------------------------------
+# Chain
+# ---------------------------------------------------------------------------
+
+def start_anvil(port: int, block_time: float) -> subprocess.Popen:
+    if shutil.which("anvil") is None:
+        sys.exit("anvil not found on PATH — install Foundry, or pass --rpc-url of a running node")
+    cmd = ["anvil", "--port", str(port), "--accounts", str(_ANVIL_ACCOUNTS), "--silent"]
+    if block_time:
+        cmd += ["--block-time", str(block_time)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    w3 = Web3(Web3.HTTPProvider(f"http://127.0.0.1:{port}"))
+    deadline = time.time() + 15
+    while not w3.is_connected():
+        if proc.poll() is not None or time.time() > deadline:
+            proc.kill()
+            sys.exit(f"anvil did not come up on port {port}")
+        time.sleep(0.1)
+    return proc
+
+
+def deploy(w3: Web3, admin: str, lawyers: list[str], judges: list[str]):
+    """DeployJusticeVault.s.sol's deployment (new JusticeVault(deployer)), then the role grants."""
+    with open(ABI_PATH) as f:
+        artifact = json.load(f)
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor(admin).transact({"from": admin}))
+    contract = w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+    lawyer_role, judge_role = contract.functions.LAWYER_ROLE().call(), contract.functions.JUDGE_ROLE().call()
+    grants = [contract.functions.grantRole(lawyer_role, a).transact({"from": admin}) for a in lawyers]
+    grants += [contract.functions.grantRole(judge_role, a).transact({"from": admin}) for a in judges]
+    for tx in grants:
+        w3.eth.wait_for_transaction_receipt(tx)
+    return contract
+
+
+# ---------------------------------------------------------------------------
+# Oracle instances
+# ---------------------------------------------------------------------------
+
+def _oracle(name: str, rpc_url: str, address: str, tmp: str, gateway: str, args: argparse.Namespace) -> None:
+    """One oracle instance: the production log loop over a throwaway runtime."""
+    import pipeline.graph as graph
+    import pipeline.rag as rag
+    from case_leases import LeaseStore
+    from event_ledger import EventLedger
+    from oracle_utils import verify_file_integrity
+    from pipeline.ipfs import IPFSFetcher
+    from pipeline.spool import DocumentSpool
+    from search_index import SearchIndex
+    from tests.fakes import FakeAnthropic, HashingEmbeddingFunction
+
+    graph._spool = DocumentSpool(os.path.join(tmp, f"spool_{name}"))
+    graph._fetcher = IPFSFetcher([gateway], timeout_s=30)
+    rag.CHROMA_DIR = os.path.join(tmp, f"chroma_{name}")   # an embedded store belongs to one process
+    rag.EMBEDDING_FUNCTION = HashingEmbeddingFunction()
+    with open(ABI_PATH) as f:
+        abi = json.load(f)["abi"]
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    checkpointer = open_checkpointer(os.path.join(tmp, "checkpoints.sqlite"))
+    feed = FeedStore(os.path.join(tmp, "evidence_feed.json"))
+    monitor_vault._runtime = monitor_vault._Runtime(
+        w3=w3, contract=w3.eth.contract(address=address, abi=abi), checkpointer=checkpointer,
+        pipeline_graph=graph.build_graph(FakeAnthropic(latency_s=args.llm_latency), verify_file_integrity, checkpointer),
+        feed_store=feed, search_index=SearchIndex(os.path.join(tmp, f"search_{name}.sqlite")),
+        leases=LeaseStore(os.path.join(tmp, "leases.sqlite"), name, ttl_s=30),
+        ledger=EventLedger(os.path.join(tmp, "events.sqlite"), feed),
+    )
+    monitor_vault._POLL_S = args.poll_s
+    monitor_vault._METRICS_PORT = 0
+    monitor_vault.log_loop()
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+def arrivals(rate: float, duration: float, burst: int, burst_every: float, rng: random.Random) -> list[float]:
+    """Submission offsets in seconds: a Poisson stream at `rate`, plus `burst` at once every `burst_every` s."""
+    times, t = [], rng.expovariate(rate) if rate > 0 else duration
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    if burst and burst_every:
+        times += [b * burst_every for b in range(1, int(duration / burst_every) + 1) for _ in range(burst)]
+    return sorted(times)
+
+
+@dataclass
+class _Filing:
+    case_id: int
+    cid: str
+    file_hash: bytes
+    due: float                          # submission offset from the start of the step (s)
+    key: str | None = None              # event_key of its EvidenceFiled log
+    status: str | None = None           # feed status once the oracle has handled it
+    # perf_counter() stamps
+    filed: float | None = None          # submitEvidence receipt
+    briefed: float | None = None        # feed entry seen
+    validated_tx: float | None = None   # validateEvidence receipt
+    validated: float | None = None      # checkpoint status VALIDATED seen
+
+
+class FeedCursor:
+    """
+    Walks the feed as it grows, pairing entries with filings by event_key. An entry can
+    land before its submitEvidence receipt is processed (and the filing's key known):
+    it is kept and matched on a later poll instead of being skipped.
+    """
+
+    def __init__(self):
+        self.seen = 0
+        self.unmatched: list[dict] = []
+
+    def take(self, entries: list[dict], by_key: dict[str, _Filing]) -> list[tuple[dict, _Filing]]:
+        """(entry, filing) pairs for entries matched since the last call."""
+        fresh, self.unmatched = self.unmatched + entries[self.seen:], []
+        self.seen = len(entries)
+        matched = []
+        for entry in fresh:
+            filing = by_key.get(entry.get("event_key"))
+            if filing is None:
+                self.unmatched.append(entry)
+            else:
+                matched.append((entry, filing))
+        return matched
+
+
+def _pct(samples: list[float], p: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _latency(samples: list[float]) -> dict:
+    return {"n": len(samples), **{f"p{p}_s": None if not samples else round(_pct(samples, p), 3) for p in (50, 95)},
+            "max_s": round(max(samples), 3) if samples else None}
+
+
+def run_step(w3: Web3, rpc_url: str, ipfs: LocalIPFS, instances: int, rate: float, args: argparse.Namespace,
+             step_seed: int) -> dict:
+    rng = random.Random(step_seed)
+    accounts = w3.eth.accounts
+    admin, lawyers, judges = accounts[0], accounts[1:1 + args.lawyers], accounts[-args.judges:]
+    contract = deploy(w3, admin, lawyers, judges)
+    events = contract.events.EvidenceFiled()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Filings: a fresh case and a unique synthetic PDF each, page count drawn from --pages
+        cases = load_cases()
+        schedule = arrivals(rate, args.duration, args.burst, args.burst_every, rng)
+        warmup = [-1.0] * instances          # one per instance, before the clock starts; not reported
+        filings = []
+        for i, due in enumerate(warmup + schedule):
+            content = synthetic_filing(cases[i % len(cases)], rng.choice(args.pages), seed=step_seed * 10_000 + i)
+            path = os.path.join(tmp, "doc.pdf")
+            with open(path, "wb") as f:
+                f.write(content)
+            filings.append(_Filing(100_000 + i, ipfs.add(content), bytes.fromhex(sha256_file(path)), due))
+
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_oracle, args=(f"oracle-{n}", rpc_url, contract.address, tmp, ipfs.gateway, args),
+                             daemon=True) for n in range(instances)]
+        for p in procs:
+            p.start()
+
+        feed = FeedStore(os.path.join(tmp, "evidence_feed.json"))
+        saver = open_checkpointer(os.path.join(tmp, "checkpoints.sqlite"))
+        by_key: dict[str, _Filing] = {}
+        reviews: list[tuple[float, int, _Filing, int]] = []    # heap of (due, case, filing, evidence index)
+        lock = threading.Lock()
+        stop = threading.Event()
+        senders = ThreadPoolExecutor(max_workers=args.senders)
+
+        def submit(filing: _Filing, lawyer: str) -> None:
+            tx = contract.functions.submitEvidence(filing.case_id, filing.file_hash, filing.cid).transact({"from": lawyer})
+            receipt = w3.eth.wait_for_transaction_receipt(tx, poll_latency=0.05)
+            filing.filed = time.perf_counter()
+            with lock:
+                filing.key = event_key(events.process_receipt(receipt)[0])
+                by_key[filing.key] = filing
+
+        def validate(filing: _Filing, judge: str, index: int) -> None:
+            tx = contract.functions.validateEvidence(filing.case_id, index).transact({"from": judge})
+            w3.eth.wait_for_transaction_receipt(tx, poll_latency=0.05)
+            filing.validated_tx = time.perf_counter()
+
+        def track(until_done: list[_Filing], deadline: float) -> None:
+            """Poll the feed and checkpoints until every filing is validated or rejected, or deadline."""
+            cursor = FeedCursor()
+            while time.perf_counter() < deadline and not stop.is_set():
+                entries = feed.entries()
+                now = time.perf_counter()
+                with lock:
+                    for entry, filing in cursor.take(entries, by_key):
+                        if filing.briefed is None:
+                            filing.briefed, filing.status = now, entry["status"]
+                            if entry["status"] == "BRIEF_GENERATED":
+                                heapq.heappush(reviews, (now + args.review_s, filing.case_id, filing, entry["index"]))
+                while reviews and reviews[0][0] <= now:
+                    _, _, filing, index = heapq.heappop(reviews)
+                    senders.submit(validate, filing, judges[filing.case_id % len(judges)], index)
+                for filing in until_done:
+                    if filing.validated_tx is not None and filing.validated is None:
+                        latest = saver.get_tuple({"configurable": {"thread_id": f"case_{filing.case_id}"}})
+                        if latest and latest.checkpoint.get("channel_values", {}).get("status") == "VALIDATED":
+                            filing.validated = now
+                if all(f.validated is not None or f.status not in (None, "BRIEF_GENERATED") for f in until_done):
+                    return
+                time.sleep(0.05)
+
+        try:
+            # Warm-up: every instance loads its Chroma store, parser and graph on a first case
+            for n, filing in enumerate(filings[:instances]):
+                senders.submit(submit, filing, lawyers[n % len(lawyers)])
+            track(filings[:instances], time.perf_counter() + 120)
+
+            measured = filings[instances:]
+            tracker = threading.Thread(target=track, args=(measured, float("inf")), daemon=True)
+            started = time.perf_counter()
+            tracker.start()
+            for n, filing in enumerate(measured):
+                time.sleep(max(0.0, started + filing.due - time.perf_counter()))
+                senders.submit(submit, filing, lawyers[n % len(lawyers)])
+            last_submit = time.perf_counter()
+            tracker.join(timeout=args.drain_s + args.review_s)
+        finally:
+            stop.set()
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                p.join(timeout=10)
+            senders.shutdown(wait=False, cancel_futures=True)
+
+    filed = [f for f in measured if f.filed is not None]
+    briefed = [f for f in filed if f.briefed is not None]
+    to_brief = [f.briefed - f.filed for f in briefed]
+    to_validated = [f.validated - f.validated_tx for f in briefed if f.validated is not None]
+    window = max((f.briefed for f in briefed), default=last_submit) - started
+    offered = len(measured) / args.duration
+    achieved = len(briefed) / window if window > 0 else 0.0
+    p95 = _pct(to_brief, 95)
+    unfinished = len(measured) - len(briefed)
+    return {
+        "instances": instances, "rate": rate, "filings": len(measured),
+        "offered_per_s": round(offered, 3), "achieved_per_s": round(achieved, 3),
+        "rejected": sum(f.status not in (None, "BRIEF_GENERATED") for f in briefed),
+        "unfinished": unfinished,
+        "filing_to_brief": _latency(to_brief),
+        "validate_to_validated": _latency(to_validated),
+        "saturated": unfinished > 0 or achieved < 0.9 * offered or (p95 is not None and p95 > args.slo_s),
+    }
+
+
+def saturation_points(steps: list[dict]) -> dict[int, dict]:
+    """Per instance count: the highest rate that held and the lowest that saturated."""
+    points: dict[int, dict] = {}
+    for step in sorted(steps, key=lambda s: (s["instances"], s["rate"])):
+        point = points.setdefault(step["instances"], {"sustained_rate": None, "saturated_at": None})
+        if step["saturated"]:
+            if point["saturated_at"] is None:
+                point["saturated_at"] = step["rate"]
+        elif point["saturated_at"] is None:
+            point["sustained_rate"] = step["rate"]
+    return points
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _print_report(report: dict) -> None:
+    def ms(stats: dict, key: str) -> str:
+        return f"{1000 * stats[key]:8.0f}" if stats[key] is not None else f"{'—':>8}"
+
+    print(f"\n{'inst':>4} {'rate/s':>7} {'done/s':>7} {'n':>5} {'fail':>5} {'left':>5}"
+          f" {'brief p50':>9} {'p95 ms':>8} {'max ms':>8} {'valid p50':>9} {'p95 ms':>8}")
+    for s in report["steps"]:
+        b, v = s["filing_to_brief"], s["validate_to_validated"]
+        print(f"{s['instances']:>4} {s['rate']:>7g} {s['achieved_per_s']:>7.2f} {s['filings']:>5} {s['rejected']:>5}"
+              f" {s['unfinished']:>5} {ms(b, 'p50_s'):>9} {ms(b, 'p95_s')} {ms(b, 'max_s')}"
+              f" {ms(v, 'p50_s'):>9} {ms(v, 'p95_s')}" + ("  saturated" if s["saturated"] else ""))
+    print()
+    for instances, point in report["saturation"].items():
+        held = f"{point['sustained_rate']:g} filings/s" if point["sustained_rate"] is not None else "no tested rate"
+        broke = f", saturates at {point['saturated_at']:g}/s" if point["saturated_at"] is not None else ""
+        print(f"{instances} instance(s): sustains {held}{broke}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", default="1,2", help="oracle instance counts to compare")
+    parser.add_argument("--rates", default="0.5,1,2", help="offered filing rates (filings/s) per step")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of submissions per step")
+    parser.add_argument("--burst", type=int, default=0, help="extra filings submitted at once every --burst-every s")
+    parser.add_argument("--burst-every", type=float, default=0)
+    parser.add_argument("--pages", default="2,10,40", help="page counts filings are drawn from")
+    parser.add_argument("--review-s", type=float, default=1.0, help="judge review time before validateEvidence")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per stub Claude call")
+    parser.add_argument("--poll-s", type=float, default=0.2, help="oracle idle poll interval (ORACLE_POLL_S)")
+    parser.add_argument("--slo-s", type=float, default=30, help="p95 filing-to-brief beyond which a step is saturated")
+    parser.add_argument("--drain-s", type=float, default=120, help="wait after the last submission")
+    parser.add_argument("--lawyers", type=int, default=8)
+    parser.add_argument("--judges", type=int, default=4)
+    parser.add_argument("--senders", type=int, default=16, help="threads submitting transactions")
+    parser.add_argument("--block-time", type=float, default=0, help="anvil block time (0 = mine every transaction)")
+    parser.add_argument("--port", type=int, default=8546, help="port for the anvil this tool starts")
+    parser.add_argument("--rpc-url", help="use a running node instead of starting anvil")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/results/load_<commit>.json)")
+    args = parser.parse_args()
+    args.pages = [int(p) for p in args.pages.split(",")]
+    if args.lawyers + args.judges + 1 > _ANVIL_ACCOUNTS:
+        parser.error(f"at most {_ANVIL_ACCOUNTS - 1} lawyer + judge accounts")
+
+    anvil = None if args.rpc_url else start_anvil(args.port, args.block_time)
+    rpc_url = args.rpc_url or f"http://127.0.0.1:{args.port}"
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    steps = []
+    try:
+        with LocalIPFS() as ipfs:
+            for instances in (int(n) for n in args.instances.split(",")):
+                for rate in (float(r) for r in args.rates.split(",")):
+                    step = run_step(w3, rpc_url, ipfs, instances, rate, args, args.seed + len(steps))
+                    steps.append(step)
+                    print(f"   {instances} instance(s) at {rate:g}/s: {step['achieved_per_s']:.2f}/s done, "
+                          f"p95 filing-to-brief {step['filing_to_brief']['p95_s']} s"
+                          + (" — saturated" if step["saturated"] else ""), flush=True)
+    finally:
+        if anvil is not None:
+            anvil.terminate()
+            anvil.wait(timeout=10)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "rpc_url")},
+        "steps": steps,
+        "saturation": saturation_points(steps),
+    }
+    _print_report(report)
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
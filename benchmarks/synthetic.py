@@ -0,0 +1,145 @@
+"""
+Synthetic workload helpers shared by the benchmarks.
+
+make_pdf()          — minimal, valid multi-page text PDF (pypdf can extract it)
+synthetic_filing()  — a legal filing of N pages built from eval_dataset.json excerpts
+LocalIPFS           — threaded HTTP stand-in for an IPFS gateway (GET /ipfs/<cid>)
+"""
+import hashlib
+import json
+import os
+import random
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(ROOT, "tests", "eval_dataset.json")
+
+_LINES_PER_PAGE = 48
+_CHARS_PER_LINE = 90
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode("latin-1")
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Render each string as one page of 10pt Helvetica text."""
+    objects: list[bytes] = []
+    n_pages = len(pages)
+    font_id = 3 + 2 * n_pages
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n_pages))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    for i, text in enumerate(pages):
+        lines = []
+        for para in text.split("\n"):
+            lines.extend(textwrap.wrap(para, _CHARS_PER_LINE) or [""])
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        ops += [f"({_escape(line)}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{off:010d} 00000 n \n".encode() for off in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def load_cases() -> list[dict]:
+    with open(DATASET_PATH) as f:
+        return json.load(f)
+
+
+def synthetic_filing(case: dict, pages: int, seed: int = 0) -> bytes:
+    """
+    A filing of `pages` pages: the case excerpt on page 1, then shuffled excerpt
+    paragraphs (annexures, exhibits) filling the rest of the bundle.
+    """
+    rng = random.Random(seed)
+    paragraphs = [p for p in case["document_excerpt"].split("\n") if p.strip()]
+    body_pages = [case["document_excerpt"]]
+    per_page = _LINES_PER_PAGE * _CHARS_PER_LINE
+    for n in range(1, pages):
+        text, para_no = [f"ANNEXURE {n}"], 1
+        while sum(len(t) for t in text) < per_page * 0.8:
+            text.append(f"{para_no}. {rng.choice(paragraphs)}")
+            para_no += 1
+        body_pages.append("\n".join(text))
+    return make_pdf(body_pages)
+
+
+def fake_cid(content: bytes) -> str:
+    """Deterministic CID-shaped identifier (not a real multihash)."""
+    return "Qm" + hashlib.sha256(content).hexdigest()[:44]
+
+
+class LocalIPFS:
+    """In-process IPFS gateway stand-in serving registered documents at /ipfs/<cid>."""
+
+    def __init__(self, latency_s: float = 0.0, port: int = 0):
+        self.latency_s = latency_s
+        self.docs: dict[str, bytes] = {}
+        self.requests = 0
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                store.requests += 1
+                body = store.docs.get(self.path.rsplit("/", 1)[-1])
+                if store.latency_s:
+                    time.sleep(store.latency_s)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                body = store.docs.get(self.path.rsplit("/", 1)[-1])
+                self.send_response(200 if body is not None else 404)
+                if body is not None:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def gateway(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/ipfs/"
+
+    def add(self, content: bytes) -> str:
+        cid = fake_cid(content)
+        self.docs[cid] = content
+        return cid
+
+    def __enter__(self) -> "LocalIPFS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,131 @@
+"""
+Durable checkpoint storage for the oracle pipeline graph.
+
+Cases paused at interrupt_before=["validate"] can wait days for a judge.
+Keeping them in a MemorySaver grows oracle RSS without bound and loses every
+paused thread on restart, so handle_validated_event resumes nothing.
+
+This module stores checkpoints in a SQLite file instead:
+  - zlib-compressed msgpack payloads keep the on-disk state compact
+  - prune_terminal_threads() drops VALIDATED / REJECTED threads once they
+    are older than the retention window (REJECTED threads are kept for a
+    while so they can still be re-driven)
+  - terminal_threads() lists finished threads for other clean-up (the vector
+    archive in scripts/archive_vectors.py)
+
+Oracle instances share this file (WAL mode, so several processes can write it), which
+makes a multi-instance deployment single-host: SQLite locking is not reliable over
+network filesystems, and an instance with its own file could not resume a case paused
+by another (EvidenceValidated) or continue one it took over. There is no shared
+(server) checkpointer option.
+"""
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+from typing import Any
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", os.path.join(BASE_DIR, "checkpoints.sqlite"))
+RETENTION_SECONDS = int(os.getenv("CHECKPOINT_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+TERMINAL_STATUSES = frozenset({"VALIDATED", "REJECTED"})
+
+# Payloads below this size are stored as-is — zlib framing would outweigh the savings
+_COMPRESS_MIN_BYTES = 512
+_ZLIB_PREFIX = "zlib+"
+
+
+class CompressedSerializer:
+    """
+    JsonPlusSerializer wrapper that zlib-compresses large payloads.
+    The type tag is prefixed with "zlib+" so uncompressed rows written by
+    older oracles (or below the size threshold) still load unchanged.
+    """
+
+    def __init__(self, level: int = 6):
+        self._inner = JsonPlusSerializer()
+        self._level = level
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self._inner.dumps_typed(obj)
+        if len(data) < _COMPRESS_MIN_BYTES:
+            return type_, data
+        return _ZLIB_PREFIX + type_, zlib.compress(data, self._level)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith(_ZLIB_PREFIX):
+            return self._inner.loads_typed((type_[len(_ZLIB_PREFIX):], zlib.decompress(payload)))
+        return self._inner.loads_typed((type_, payload))
+
+
+def open_checkpointer(path: str = CHECKPOINT_DB) -> SqliteSaver:
+    """
+    Open (or create) the on-disk checkpoint store.
+    The connection is shared across threads; SqliteSaver serialises access with its own lock.
+    Other oracle processes on the host write the same file, so it runs in WAL mode and
+    waits for their locks.
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    saver = SqliteSaver(conn, serde=CompressedSerializer())
+    saver.setup()
+    return saver
+
+
+def _thread_ids(saver: SqliteSaver) -> list[str]:
+    with saver.cursor(transaction=False) as cur:
+        cur.execute("SELECT DISTINCT thread_id FROM checkpoints")
+        return [row[0] for row in cur.fetchall()]
+
+
+def _checkpoint_age(ts: str, now: datetime) -> float:
+    try:
+        written = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return 0.0
+    if written.tzinfo is None:
+        written = written.replace(tzinfo=timezone.utc)
+    return (now - written).total_seconds()
+
+
+def thread_statuses(saver: SqliteSaver, now: datetime | None = None) -> dict[str, tuple[str | None, float]]:
+    """thread_id → (status, age in seconds) of every thread's latest checkpoint."""
+    now = now or datetime.now(timezone.utc)
+    statuses = {}
+    for thread_id in _thread_ids(saver):
+        latest = saver.get_tuple({"configurable": {"thread_id": thread_id}})
+        if latest is None:
+            continue
+        statuses[thread_id] = (latest.checkpoint.get("channel_values", {}).get("status"),
+                               _checkpoint_age(latest.checkpoint.get("ts", ""), now))
+    return statuses
+
+
+def terminal_threads(saver: SqliteSaver, min_age_s: float = 0, now: datetime | None = None) -> list[str]:
+    """Threads whose latest checkpoint is terminal (VALIDATED / REJECTED) and at least min_age_s old."""
+    return [thread_id for thread_id, (status, age) in thread_statuses(saver, now).items()
+            if status in TERMINAL_STATUSES and age >= min_age_s]
+
+
+def prune_terminal_threads(
+    saver: SqliteSaver,
+    retention_s: int = RETENTION_SECONDS,
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    Delete every thread whose latest checkpoint is terminal (VALIDATED / REJECTED)
+    and older than retention_s. Paused and in-flight threads are never touched.
+    Returns the pruned thread IDs.
+    """
+    pruned = terminal_threads(saver, retention_s, now)
+    for thread_id in pruned:
+        saver.delete_thread(thread_id)
+    return pruned
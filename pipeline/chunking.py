@@ -0,0 +1,202 @@
+"""
+Structure-aware chunking for court documents.
+
+Generic splitters cut wherever a character budget runs out. Court filings have
+structure worth keeping together, so LegalChunker splits along it:
+
+    headings        — "FACTS OF THE CASE:", "PRAYER", "IN THE COURT OF ..." start a section
+    party blocks    — consecutive "Petitioner: ..." / "Respondent: ..." lines stay in one block
+    numbered paras  — "1.", "2)", "(a)", "(iv)" each start a block
+
+Blocks are packed into chunks of up to chunk_size characters and never straddle a
+section boundary. Only a block longer than chunk_size is cut, at sentence ends.
+Chunks do not overlap. Every chunk records its 1-based page and page_end (pages are
+separated by form feeds, as rag.extract_text writes them), its [start, end) character
+offsets in the source text, and the heading of its section.
+
+split_pages chunks a document page by page and yields the same chunks as split on
+the joined text. Only the unsettled tail (the open chunk and the block before it) is
+carried over to the next page, so memory does not grow with the document.
+"""
+import bisect
+import re
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator
+
+from pipeline.lexical import PARTY_ROLES
+
+PAGE_BREAK = "\f"
+
+_HEADING = re.compile(r"^(?=[^a-z]*[A-Z]{3})[A-Z0-9][A-Z0-9 ,.'&()/\-]{2,80}:?$")
+_NUMBERED = re.compile(r"^(?:\d{1,3}[.)]|\(\d{1,3}\)|\([a-z]\)|\((?:i|ii|iii|iv|v|vi|vii|viii|ix|x)\))\s")
+_PARTY_LINE = re.compile(rf"^{PARTY_ROLES}\b\s*(?:No\.\s*\d+\s*)?[:\-–]")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+_LINE = re.compile(r"[^\n\f]*")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    start: int      # character offsets into the source text, [start, end)
+    end: int
+    page: int       # 1-based page the chunk starts on
+    page_end: int
+    section: str    # heading of the enclosing section ("" before the first heading)
+
+    def metadata(self) -> dict:
+        return {"page": self.page, "page_end": self.page_end, "start": self.start,
+                "end": self.end, "section": self.section}
+
+
+@dataclass
+class _Block:
+    start: int
+    end: int
+    kind: str       # "heading" | "party" | "para"
+
+
+def _trim(text: str, start: int, end: int) -> tuple[int, int]:
+    """Shrink [start, end) so it neither starts nor ends with whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _blocks(text: str) -> list[_Block]:
+    """Split text into structural blocks, in order. Wrapped lines continue the open block."""
+    blocks: list[_Block] = []
+    open_block = False
+    for match in _LINE.finditer(text):
+        start, end = _trim(text, match.start(), match.end())
+        if start == end:
+            open_block = False
+            continue
+        line = text[start:end]
+        if _PARTY_LINE.match(line):
+            kind = "party"
+        elif _HEADING.match(line):
+            kind = "heading"
+        else:
+            kind = "para"
+        previous = blocks[-1] if blocks else None
+        continues = (
+            open_block and previous is not None and "heading" not in (kind, previous.kind)
+            and not _NUMBERED.match(line)
+            and (kind == "para" or previous.kind == "party")
+        )
+        if continues:
+            previous.end = end
+        else:
+            blocks.append(_Block(start, end, kind))
+        open_block = True
+    return blocks
+
+
+def _pieces(text: str, block: _Block, size: int) -> list[tuple[int, int]]:
+    """Sentence spans of an oversized block; a sentence longer than `size` is cut at spaces."""
+    spans: list[tuple[int, int]] = []
+    start = block.start
+    ends = [m.end() for m in _SENTENCE_END.finditer(text, block.start, block.end)] + [block.end]
+    for end in ends:
+        s, e = _trim(text, start, end)
+        while e - s > size:
+            cut = text.rfind(" ", s + 1, s + size)
+            cut = cut if cut > s else s + size
+            spans.append(_trim(text, s, cut))
+            s, e = _trim(text, cut, e)
+        if s < e:
+            spans.append((s, e))
+        start = end
+    return spans
+
+
+class LegalChunker:
+    """Reusable, stateless splitter (rag.CHUNKER is the instance ingest uses)."""
+
+    def __init__(self, chunk_size: int = 1000, min_section_chars: int = 200):
+        self.chunk_size = chunk_size
+        self.min_section_chars = min_section_chars   # below this, a new heading joins the open chunk
+
+    @property
+    def signature(self) -> str:
+        """Changes whenever the same text would chunk differently (part of ingest fingerprints)."""
+        return f"legal-v1:{self.chunk_size}:{self.min_section_chars}"
+
+    def split(self, text: str) -> list[Chunk]:
+        return self._split(text)[0]
+
+    def split_pages(self, pages: Iterable[str]) -> Iterator[Chunk]:
+        """Chunks of PAGE_BREAK.join(pages), yielded as soon as later pages cannot change them."""
+        buffer, base, pages_before, section = "", 0, 0, ""
+
+        def placed(chunk: Chunk) -> Chunk:
+            return replace(chunk, start=chunk.start + base, end=chunk.end + base,
+                           page=chunk.page + pages_before, page_end=chunk.page_end + pages_before)
+
+        for n, page in enumerate(pages):
+            buffer += (PAGE_BREAK if n else "") + page
+            chunks, blocks = self._split(buffer, section)
+            if not blocks:
+                continue
+            # The last block may still continue on the next page, and with it the chunk
+            # it would join. Everything before the last chunk that opened at a block start
+            # ahead of it is settled; chunking restarts from that chunk with the same state.
+            block_starts = {b.start for b in blocks}
+            keep = max((k for k, c in enumerate(chunks)
+                        if c.start < blocks[-1].start and c.start in block_starts), default=0)
+            if keep == 0:
+                continue
+            yield from (placed(c) for c in chunks[:keep])
+            cut, section = chunks[keep].start, chunks[keep].section
+            pages_before += buffer.count(PAGE_BREAK, 0, cut)
+            base += cut
+            buffer = buffer[cut:]
+        yield from (placed(c) for c in self._split(buffer, section)[0])
+
+    def _split(self, text: str, section: str = "") -> tuple[list[Chunk], list[_Block]]:
+        page_breaks = [m.start() for m in re.finditer(PAGE_BREAK, text)]
+        chunks: list[Chunk] = []
+        open_start: int | None = None
+        open_end = 0
+        open_section = ""
+
+        def flush() -> None:
+            nonlocal open_start
+            if open_start is not None:
+                chunks.append(Chunk(
+                    text=text[open_start:open_end], start=open_start, end=open_end,
+                    page=bisect.bisect_right(page_breaks, open_start) + 1,
+                    page_end=bisect.bisect_right(page_breaks, open_end - 1) + 1,
+                    section=open_section,
+                ))
+                open_start = None
+
+        heading_start: int | None = None    # a heading is held back and opens the next span
+        blocks = _blocks(text)
+        for block in blocks:
+            if block.kind == "heading":
+                if open_start is not None and open_end - open_start >= self.min_section_chars:
+                    flush()
+                section = text[block.start:block.end].rstrip(":").strip()
+                if heading_start is None:
+                    heading_start = block.start
+                continue
+            spans = ([(block.start, block.end)] if block.end - block.start <= self.chunk_size
+                     else _pieces(text, block, self.chunk_size))
+            for start, end in spans:
+                if heading_start is not None:
+                    start, heading_start = heading_start, None
+                if open_start is not None and end - open_start > self.chunk_size:
+                    flush()
+                if open_start is None:
+                    open_start, open_section = start, section
+                open_end = end
+        if heading_start is not None:
+            if open_start is None:
+                open_start, open_section = heading_start, section
+            open_end = len(text.rstrip())
+        flush()
+        return chunks, blocks
+
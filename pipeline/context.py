@@ -0,0 +1,72 @@
+"""
+Token-budgeted context assembly for brief prompts.
+
+Retrieval hands back chunks in relevance order. Neighbouring chunks read best as
+one passage, and chunks from older, overlapping ingests repeat each other's edges.
+This module bounds the prompt by tokens instead of chunk count:
+
+    count_tokens      — local token estimate (no API call, no tokenizer download)
+    merge_overlap     — join two consecutive chunks, dropping the text they share
+    assemble_context  — take chunks by relevance while they fit the budget, then merge
+                        runs of adjacent chunk_index values into single passages
+"""
+import re
+from dataclasses import dataclass
+
+# Claude's tokenizer is not available locally. Counting word pieces of at most four
+# characters, plus each punctuation mark, approximates it on English text and tends
+# to over-count, which is the safe side for a budget.
+_PIECE = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d]")
+_SEPARATOR_TOKENS = 4   # "\n\n[12] " around each numbered passage
+
+
+def count_tokens(text: str) -> int:
+    return len(_PIECE.findall(text))
+
+
+def merge_overlap(left: str, right: str, max_overlap: int = 400) -> str:
+    """Append `right` to `left`, skipping the longest prefix of `right` that ends `left`."""
+    for size in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left} {right}"
+
+
+@dataclass
+class Passage:
+    first: int      # chunk_index range merged into this passage
+    last: int
+    text: str
+
+
+def _passages(chunks: dict[int, str]) -> list[Passage]:
+    """Merge runs of consecutive chunk indices into passages, in document order."""
+    passages: list[Passage] = []
+    for index in sorted(chunks):
+        if passages and index == passages[-1].last + 1:
+            passages[-1].text = merge_overlap(passages[-1].text, chunks[index])
+            passages[-1].last = index
+        else:
+            passages.append(Passage(index, index, chunks[index]))
+    return passages
+
+
+def _cost(passages: list[Passage]) -> int:
+    return sum(count_tokens(p.text) + _SEPARATOR_TOKENS for p in passages)
+
+
+def assemble_context(ranked: list[tuple[int, str]], budget_tokens: int) -> list[Passage]:
+    """
+    Fill `budget_tokens` from `ranked` (chunk_index, text) pairs, most relevant first.
+    A chunk that does not fit is skipped, and a later, smaller one may still fit.
+    A chunk next to one already chosen costs only its non-overlapping text.
+    Returns merged passages in document order.
+    """
+    chosen: dict[int, str] = {}
+    for index, text in ranked:
+        if index in chosen:
+            continue
+        trial = {**chosen, index: text}
+        if _cost(_passages(trial)) <= budget_tokens:
+            chosen = trial
+    return _passages(chosen)
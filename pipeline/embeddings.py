@@ -0,0 +1,271 @@
+"""
+Embedding providers for the RAG pipeline.
+
+rag.py used to leave embedding to whatever Chroma defaults to. Here it is explicit:
+
+    EmbeddingProvider   — wraps any backend (texts → vectors): batches of batch_size run on a
+                          thread pool and throughput (chunks/sec) is tracked. Optionally backed
+                          by a quantized cache.
+    MiniLMBackend       — all-MiniLM-L6-v2 on onnxruntime CPU (the model Chroma's default
+                          uses), with intra-op threads split across the pool's workers
+    VectorCodec         — float32 / float16 / int8 (per-vector scale) vector encoding
+    EmbeddingCache      — SQLite cache of encoded vectors keyed by (model, sha256 of text)
+
+Chroma stores float32 for the HNSW index whatever it is given, so quantizing the vectors
+handed to it would only lose precision. Fresh vectors go to Chroma exactly as the model
+produced them; the codec applies where bytes are saved — the cache (EMBED_CACHE_DTYPE) and
+the finished-case vector archive (VECTOR_ARCHIVE_DTYPE in rag.py). A cache hit serves the
+decoded vector, i.e. at cache precision.
+
+Settings (env):
+    EMBED_BATCH_SIZE   texts per inference call (default 32)
+    EMBED_THREADS      concurrent batches (default min(4, CPUs))
+    EMBED_CACHE_DTYPE  cache precision: float32 | float16 | int8 (default float16)
+    EMBED_CACHE_PATH   SQLite cache file ("" = no cache)
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Callable, Sequence
+
+import numpy as np
+
+from pipeline.metrics import EMBED_BATCH_SECONDS
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0")) or min(4, os.cpu_count() or 1)
+EMBED_CACHE_DTYPE = os.getenv("EMBED_CACHE_DTYPE", "float16")
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+
+Backend = Callable[[list[str]], Sequence[Sequence[float]]]
+
+
+# ---------------------------------------------------------------------------
+# Vector codec
+# ---------------------------------------------------------------------------
+
+class VectorCodec:
+    """Fixed-width binary encoding of embedding vectors at a chosen precision."""
+
+    DTYPES = ("float32", "float16", "int8")
+
+    def __init__(self, dtype: str = "float32"):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unknown vector dtype '{dtype}' (expected one of {', '.join(self.DTYPES)})")
+        self.dtype = dtype
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return {"float32": 4 * dim, "float16": 2 * dim, "int8": dim + 4}[self.dtype]
+
+    def encode(self, vectors: np.ndarray) -> list[bytes]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dtype == "float32":
+            return [v.tobytes() for v in vectors]
+        if self.dtype == "float16":
+            return [v.astype(np.float16).tobytes() for v in vectors]
+        # int8: symmetric per-vector scale, stored as a float32 prefix
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return [np.float32(s).tobytes() + c.tobytes() for s, c in zip(scales, codes)]
+
+    def decode(self, blobs: Sequence[bytes]) -> np.ndarray:
+        if not blobs:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.dtype == "float32":
+            return np.stack([np.frombuffer(b, dtype=np.float32) for b in blobs])
+        if self.dtype == "float16":
+            return np.stack([np.frombuffer(b, dtype=np.float16) for b in blobs]).astype(np.float32)
+        scales = np.array([np.frombuffer(b[:4], dtype=np.float32)[0] for b in blobs], dtype=np.float32)
+        codes = np.stack([np.frombuffer(b[4:], dtype=np.int8) for b in blobs]).astype(np.float32)
+        return codes * scales[:, None]
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class EmbeddingCache:
+    """Encoded vectors keyed by (model, codec, sha256(text)). Re-ingesting unchanged text skips inference."""
+
+    def __init__(self, path: str, codec: VectorCodec):
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (model TEXT, digest BLOB, vector BLOB, PRIMARY KEY (model, digest))"
+        )
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.sha256(text.encode()).digest()
+
+    def get_many(self, model: str, digests: list[bytes]) -> dict[bytes, bytes]:
+        key = f"{model}/{self.codec.dtype}"
+        found: dict[bytes, bytes] = {}
+        with self._lock:
+            for start in range(0, len(digests), 500):
+                batch = digests[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM vectors WHERE model = ? AND digest IN ({','.join('?' * len(batch))})",
+                    [key, *batch],
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, model: str, items: list[tuple[bytes, bytes]]) -> None:
+        key = f"{model}/{self.codec.dtype}"
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)",
+                                   [(key, digest, blob) for digest, blob in items])
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class MiniLMBackend:
+    """all-MiniLM-L6-v2 (384-d, ONNX, CPU). One session shared by all worker threads.
+
+    Inference goes through the embedding function's public __call__; the subclass only
+    replaces the session options (the `model` property, stable across chromadb 1.5.x,
+    which requirements.txt pins).
+    """
+
+    name = "all-MiniLM-L6-v2"
+
+    def __init__(self, intra_op_threads: int = 1):
+        self.intra_op_threads = intra_op_threads
+        self._model_lock = threading.Lock()
+        self._loaded = None
+
+    @property
+    def _model(self):
+        # Built once: the pool's first batches arrive on several threads at the same time
+        if self._loaded is None:
+            with self._model_lock:
+                if self._loaded is None:
+                    self._loaded = self._build()
+        return self._loaded
+
+    def _build(self):
+        # Reuses Chroma's downloader/tokenizer; only the session options differ
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+        threads = self.intra_op_threads
+
+        class _CpuMiniLM(ONNXMiniLM_L6_V2):
+            @cached_property
+            def model(self):
+                so = self.ort.SessionOptions()
+                so.log_severity_level = 3
+                so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                so.intra_op_num_threads = threads
+                return self.ort.InferenceSession(
+                    os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "model.onnx"),
+                    providers=["CPUExecutionProvider"], sess_options=so,
+                )
+
+        return _CpuMiniLM(preferred_providers=["CPUExecutionProvider"])
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self._model(texts), dtype=np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Provider
+# ---------------------------------------------------------------------------
+
+class EmbeddingProvider:
+    """Batched, multi-threaded embedding over any backend, with an optional quantized cache."""
+
+    def __init__(
+        self,
+        backend: Backend,
+        batch_size: int = EMBED_BATCH_SIZE,
+        threads: int = EMBED_THREADS,
+        cache_dtype: str = EMBED_CACHE_DTYPE,
+        cache_path: str = EMBED_CACHE_PATH,
+        name: str | None = None,
+    ):
+        self.backend = backend
+        self.name = name or getattr(backend, "name", type(backend).__name__)
+        if callable(self.name):   # Chroma embedding functions expose name() as a static method
+            self.name = self.name()
+        self.batch_size = max(1, batch_size)
+        self.threads = max(1, threads)
+        self.codec = VectorCodec(cache_dtype)
+        self.cache = EmbeddingCache(cache_path, self.codec) if cache_path else None
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="embed")
+        self._stats_lock = threading.Lock()
+        self._embedded = self._cache_hits = 0
+        self._busy_s = 0.0
+
+    @property
+    def signature(self) -> str:
+        """Identifies the vectors this provider produces (the model; Chroma always gets float32)."""
+        return self.name
+
+    def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        started = time.perf_counter()
+        vectors = np.asarray(self.backend(texts), dtype=np.float32)
+        EMBED_BATCH_SECONDS.observe(time.perf_counter() - started, model=self.name)
+        return vectors
+
+    def __call__(self, texts: list[str]) -> list[np.ndarray]:
+        if not texts:
+            return []
+        started = time.perf_counter()
+        out: list[np.ndarray | None] = [None] * len(texts)
+        digests = [EmbeddingCache.digest(t) for t in texts] if self.cache else []
+        if self.cache:
+            cached = self.cache.get_many(self.name, list(set(digests)))
+            for i, digest in enumerate(digests):
+                if digest in cached:
+                    out[i] = self.codec.decode([cached[digest]])[0]
+        todo = [i for i, v in enumerate(out) if v is None]
+        batches = [todo[s:s + self.batch_size] for s in range(0, len(todo), self.batch_size)]
+        results = self._pool.map(lambda batch: self._embed_batch([texts[i] for i in batch]), batches)
+        for batch, vectors in zip(batches, results):
+            for i, vector in zip(batch, vectors):
+                out[i] = vector
+            if self.cache:
+                self.cache.put_many(self.name, list(zip((digests[i] for i in batch), self.codec.encode(vectors))))
+        with self._stats_lock:
+            self._embedded += len(todo)
+            self._cache_hits += len(texts) - len(todo)
+            self._busy_s += time.perf_counter() - started
+        return out
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "model": self.name, "cache_dtype": self.codec.dtype,
+                "batch_size": self.batch_size, "threads": self.threads,
+                "embedded": self._embedded, "cache_hits": self._cache_hits,
+                "seconds": round(self._busy_s, 3),
+                "chunks_per_s": round(self._embedded / self._busy_s, 1) if self._busy_s else 0.0,
+            }
+
+
+_provider: EmbeddingProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """Process-wide provider for the local MiniLM backend, configured from the environment."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                intra = max(1, (os.cpu_count() or 1) // EMBED_THREADS)
+                _provider = EmbeddingProvider(MiniLMBackend(intra_op_threads=intra))
+    return _provider
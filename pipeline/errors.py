@@ -0,0 +1,60 @@
+"""
+Error classes for pipeline nodes.
+
+TransientError  → worth retrying (gateway timeouts, connection resets, HTTP 429/5xx,
+                  Claude overload). Node retry policies back off and try again; once
+                  attempts are exhausted the case can be re-driven from its checkpoint.
+PermanentError  → retrying cannot help (tamper, unreadable PDF, 4xx, bad credentials).
+                  The node routes the case straight to REJECTED.
+"""
+import sys
+
+
+class PipelineError(Exception):
+    """Base class for classified pipeline failures."""
+
+
+class TransientError(PipelineError):
+    """Failure expected to clear on retry."""
+
+
+class PermanentError(PipelineError):
+    """Failure that will recur on every retry."""
+
+
+_TRANSIENT_HTTP_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _is_transient_cause(exc: BaseException) -> bool:
+    if isinstance(exc, TransientError):
+        return True
+    if isinstance(exc, PermanentError):
+        return False
+    # An SDK's exceptions can only exist once the SDK is imported, so look it up
+    # instead of importing it here (keeps this module — and graph — cheap to import)
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+            return True
+        if isinstance(exc, requests.HTTPError) and exc.response is not None:
+            return exc.response.status_code in _TRANSIENT_HTTP_STATUS
+    anthropic = sys.modules.get("anthropic")
+    if anthropic is not None:
+        if isinstance(exc, (anthropic.APIConnectionError, anthropic.RateLimitError, anthropic.InternalServerError)):
+            return True
+        if isinstance(exc, anthropic.APIStatusError):
+            return exc.status_code in _TRANSIENT_HTTP_STATUS or exc.status_code >= 500
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def classify(exc: BaseException, context: str) -> PipelineError:
+    """Wrap an arbitrary exception as TransientError or PermanentError, keeping its message."""
+    if isinstance(exc, PipelineError):
+        return exc
+    cls = TransientError if _is_transient_cause(exc) else PermanentError
+    return cls(f"{context}: {exc}")
+
+
+def is_transient(exc: BaseException) -> bool:
+    """retry_on predicate for node RetryPolicy — retry transient failures only."""
+    return _is_transient_cause(exc)
@@ -4,27 +4,78 @@ LangGraph oracle pipeline for JusticeVault.
 States:  RECEIVED → INTEGRITY_CHECK → EMBEDDING → ANALYSIS → BRIEF_GENERATED
                                                                       ↓ (interrupt)
                                                                   VALIDATED
-Any node failure → REJECTED
+EMBEDDING reads the document once, page by page: the guardrail scan (PageScanner) sees
+the same page stream the route decision and the chunker consume, and a flagged document's
+chunks are dropped before they reach the store.
+Short filings (at most DIRECT_BRIEF_TOKENS of text) take a fast path: EMBEDDING keeps
+their text in the state (document_text) and routes them to direct_analysis, which briefs
+on it without the vector store. Once the brief is out, the deferred_index node brings the
+vector store in line with the filing: DIRECT_INDEXING=deferred indexes the same text, so
+cross-case search finds it; DIRECT_INDEXING=skip drops the case's earlier chunks instead,
+so none are served as current. A rejected filing is never indexed. Being a graph node,
+pending indexing is checkpointed: a crash resumes it with the case, under the case lease.
+Longer filings are ingested page by page, never held whole.
+Permanent node failure → REJECTED
+Transient node failure → retried with jittered backoff (per-node RetryPolicy); if retries
+are exhausted the failed node stays pending in the checkpoint and redrive() resumes it.
 
 Human-in-the-loop: graph interrupts before the VALIDATE node.
 The oracle resumes when it detects an EvidenceValidated event on-chain.
+Checkpoints are persisted to SQLite (pipeline/checkpoint.py), so paused cases survive restarts.
 """
+import logging
 import os
 import sys
-import requests
-from typing import TypedDict, Literal
-
-import anthropic
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+import time
+from itertools import chain
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, TypedDict, Literal
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.guardrails import scan_document
-from pipeline.rag import ingest_document, generate_brief
+from pipeline.chunking import PAGE_BREAK
+from pipeline.context import count_tokens
+from pipeline.errors import TransientError, classify, is_transient
+from pipeline.guardrails import PageScanner, ScanResult, UnsafeDocument
+from pipeline.metrics import BYTES_DOWNLOADED, NODE_RETRIES, current_span, instrument_node
+
+# langgraph (and the SQLite checkpointer) load in build_graph, so importing this module
+# for PipelineState or redrive stays cheap.
+if TYPE_CHECKING:
+    import anthropic
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph import StateGraph
+    from langgraph.types import RetryPolicy
+    from pipeline.ipfs import IPFSFetcher
+    from pipeline.spool import DocumentSpool
+
+log = logging.getLogger(__name__)
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _TEMP_DIR = os.path.join(_BASE_DIR, "temp_legal_files")
-_IPFS_GATEWAY = os.getenv("IPFS_GATEWAY", "https://ipfs.io/ipfs/")
+
+# Fast path: a filing this short is briefed on its full text — retrieval would select
+# nearly all of it anyway (CONTEXT_TOKEN_BUDGET is 2600). 0 turns the fast path off.
+DIRECT_BRIEF_TOKENS = int(os.getenv("DIRECT_BRIEF_TOKENS", "3000"))
+DIRECT_INDEXING = os.getenv("DIRECT_INDEXING", "deferred")    # deferred | skip
+
+# Per-node retry policies — only TransientError (and raw transient causes) is retried.
+# integrity_check is local and deterministic, so it never retries.
+_RETRY_SETTINGS: dict[str, dict] = {
+    "receive":   dict(initial_interval=1.0, max_interval=20.0, max_attempts=4),
+    "embedding": dict(initial_interval=0.5, max_interval=5.0,  max_attempts=2),
+    "analysis":  dict(initial_interval=2.0, max_interval=60.0, max_attempts=3),
+}
+_RETRY_POLICIES: "dict[str, RetryPolicy] | None" = None   # built on first build_graph()
+
+
+def _retry_policies() -> "dict[str, RetryPolicy]":
+    global _RETRY_POLICIES
+    if _RETRY_POLICIES is None:
+        from langgraph.types import RetryPolicy
+        _RETRY_POLICIES = {
+            node: RetryPolicy(**settings, jitter=True, retry_on=is_transient)
+            for node, settings in _RETRY_SETTINGS.items()
+        }
+    return _RETRY_POLICIES
 
 Status = Literal[
     "RECEIVED", "INTEGRITY_CHECK", "EMBEDDING",
@@ -44,90 +95,252 @@ class PipelineState(TypedDict):
     chunk_count: int
     ai_brief: str
     error: str
+    route: str              # "rag" | "direct", chosen by EMBEDDING
+    document_text: str      # direct route: the filing's text, briefed and indexed without re-reading the file
+    event_key: str          # ledger key (txHash:logIndex) of the EvidenceFiled event that started the run
+
+
+_fetcher: "IPFSFetcher | None" = None
+
+
+def _get_fetcher() -> "IPFSFetcher":
+    global _fetcher
+    if _fetcher is None:
+        from pipeline.ipfs import IPFSFetcher
+        _fetcher = IPFSFetcher.from_env()
+    return _fetcher
+
+
+def document_sizes(cids: list[str]) -> dict[str, int | None]:
+    """Sizes of case documents before RECEIVE downloads them (the oracle's scheduler cost)."""
+    return _get_fetcher().content_lengths(cids)
+
+
+_spool: "DocumentSpool | None" = None
+
+
+def _get_spool() -> "DocumentSpool":
+    global _spool
+    if _spool is None:
+        from pipeline.spool import DocumentSpool
+        # One slot-<n>/ per process: instances on this host never touch each other's files
+        _spool = DocumentSpool.open_slot(_TEMP_DIR)
+    return _spool
+
+
+# The RAG stack (chromadb, ONNX embeddings, Claude SDK) loads on the first case,
+# not when the graph module is imported
+def extract_text(file_path: str) -> str:
+    from pipeline.rag import extract_text as _extract
+    return _extract(file_path)
+
+
+def iter_pages(file_path: str) -> Iterator[str]:
+    from pipeline.rag import iter_pages as _iter
+    return _iter(file_path)
+
+
+def ingest_document(file_path: str, case_id: int, text: str | None = None, pages: Iterable[str] | None = None,
+                    before_commit: Callable[[], None] | None = None) -> int:
+    from pipeline.rag import ingest_document as _ingest
+    return _ingest(file_path, case_id, text, pages, before_commit)
+
+
+def drop_case_vectors(case_id: int) -> None:
+    from pipeline.rag import drop_case
+    drop_case(case_id)
+
+
+def generate_brief(case_id: int, ai_client: "anthropic.Anthropic") -> str:
+    from pipeline.rag import generate_brief as _generate
+    return _generate(case_id, ai_client)
+
+
+def generate_direct_brief(text: str, ai_client: "anthropic.Anthropic") -> tuple[str, int]:
+    from pipeline.rag import generate_direct_brief as _generate
+    return _generate(text, ai_client)
 
 
 # ---------------------------------------------------------------------------
 # Node implementations
 # ---------------------------------------------------------------------------
 
-def _receive(state: PipelineState) -> dict:
+def _fail(exc: Exception, context: str) -> dict:
+    """
+    Transient failures are raised so the node's RetryPolicy backs off and retries;
+    permanent failures route the case to REJECTED.
+    """
+    err = classify(exc, context)
+    if isinstance(err, TransientError):
+        span = current_span()
+        NODE_RETRIES.inc(node=span.node if span else "unknown")
+        log.warning("%s — retrying", err)
+        raise err from exc
+    return {"status": "REJECTED", "error": str(err)}
+
+
+def _download(state: PipelineState) -> str:
+    """Fetch the case document into the spool, pinned by the case until EMBEDDING is done."""
     case_id, cid = state["case_id"], state["ipfs_cid"]
-    local_path = os.path.join(_TEMP_DIR, f"case_{case_id}_{cid[:6]}.pdf")
-    os.makedirs(_TEMP_DIR, exist_ok=True)
-    print(f"📡 [RECEIVED] Downloading case #{case_id} from IPFS...")
+    log.info("Downloading case #%s from IPFS (%s)", case_id, cid)
+    fetched = _get_fetcher().fetch(cid, state["file_hash"])
+    local_path = _get_spool().put(fetched.content, case_id)
+    BYTES_DOWNLOADED.inc(len(fetched.content), source=fetched.source)
+    log.info("Download complete via %s", fetched.source, extra={
+        "bytes": len(fetched.content), "source": fetched.source,
+        "duration_ms": round(1000 * fetched.elapsed_s, 2), "attempts": fetched.attempts,
+    })
+    return local_path
+
+
+def _local_document(state: PipelineState) -> str:
+    """
+    The spooled document for a case. A case resumed after a restart re-pins its file,
+    or downloads it again if the spool evicted it in the meantime.
+    """
+    return _get_spool().acquire(state["local_path"], state["case_id"]) or _download(state)
+
+
+def _receive(state: PipelineState) -> dict:
     try:
-        resp = requests.get(f"{_IPFS_GATEWAY}{cid}", timeout=10)
-        resp.raise_for_status()
-        with open(local_path, "wb") as f:
-            f.write(resp.content)
-        print(f"📥 Download complete.")
-        return {"local_path": local_path, "status": "INTEGRITY_CHECK"}
+        return {"local_path": _download(state), "status": "INTEGRITY_CHECK"}
     except Exception as exc:
-        return {"status": "REJECTED", "error": f"Download failed: {exc}"}
+        return _fail(exc, "Download failed")
 
 
 def _integrity_check(state: PipelineState, verify_fn) -> dict:
-    print(f"🔐 [INTEGRITY_CHECK] Verifying SHA-256 for case #{state['case_id']}...")
     try:
-        if verify_fn(state["local_path"], state["file_hash"]):
-            print("✅ Integrity verified.")
+        started = time.perf_counter()
+        verified = verify_fn(_local_document(state), state["file_hash"])
+        duration_ms = round(1000 * (time.perf_counter() - started), 2)
+        if verified:
+            log.info("Integrity verified", extra={"duration_ms": duration_ms})
             return {"integrity_verified": True, "status": "EMBEDDING"}
-        print("❌ TAMPER DETECTED.")
+        log.error("TAMPER DETECTED — SHA-256 mismatch", extra={"duration_ms": duration_ms})
         return {"integrity_verified": False, "status": "REJECTED",
                 "error": "File hash mismatch — tamper detected"}
     except Exception as exc:
         return {"status": "REJECTED", "error": f"Integrity check failed: {exc}"}
 
 
+def _scanned(scan: ScanResult) -> None:
+    log.info("Guardrails: %s", scan.summary())
+    if scan.pii_detections:
+        log.warning("PII flagged: %s", ", ".join(scan.pii_detections))
+
+
 def _embedding(state: PipelineState) -> dict:
-    print(f"🛡️  [EMBEDDING] Guardrails + ingest for case #{state['case_id']}...")
     try:
-        scan = scan_document(state["local_path"])
-        print(f"   Guardrails: {scan.summary()}")
-        if not scan.safe:
-            print("🚨 Prompt injection detected — blocking LLM.")
-            return {
-                "status": "REJECTED",
-                "injection_detected": True,
-                "pii_flags": scan.pii_detections,
-                "error": f"Prompt injection: {scan.summary()}",
-            }
-        if scan.pii_detections:
-            print(f"⚠️  PII flagged: {', '.join(scan.pii_detections)}")
-        count = ingest_document(state["local_path"], state["case_id"])
+        local_path = _local_document(state)
+        scanner = PageScanner()
+        pages = scanner.scan(iter_pages(local_path))
+        # Pages are read only as far as the route decision needs: a long filing is never held whole
+        head, tokens, short = [], 0, DIRECT_BRIEF_TOKENS > 0
+        if short:
+            for page in pages:
+                head.append(page)
+                tokens += count_tokens(page)
+                if tokens > DIRECT_BRIEF_TOKENS:
+                    short = False
+                    break
+        if short:
+            scan = scanner.result()
+            _scanned(scan)
+            if not scan.safe:
+                raise UnsafeDocument(scan)
+            text = PAGE_BREAK.join(head)
+            if not text.strip():
+                raise ValueError(f"No extractable text in {local_path}")
+            # The text travels in the state: neither the brief nor the indexing reads the file again
+            log.info("Short filing — briefing on the full text", extra={"context_tokens": count_tokens(text)})
+            _get_spool().release(state["case_id"])
+            return {"status": "ANALYSIS", "route": "direct", "injection_detected": False,
+                    "pii_flags": scan.pii_detections, "document_text": text}
+
+        def admit() -> None:
+            # The scan has seen every page by now; a flagged document's staged chunks are dropped
+            if not scanner.result().safe:
+                raise UnsafeDocument(scanner.result())
+
+        count = ingest_document(local_path, state["case_id"], pages=chain(head, pages), before_commit=admit)
+        scan = scanner.result()
+        _scanned(scan)
+        # Later nodes read the vector store; the file stays spooled (unpinned) for re-drives
+        _get_spool().release(state["case_id"])
         return {
             "status": "ANALYSIS",
+            "route": "rag",
             "injection_detected": False,
             "pii_flags": scan.pii_detections,
             "chunk_count": count,
         }
+    except UnsafeDocument as exc:
+        log.warning("Prompt injection detected — blocking LLM")
+        return {
+            "status": "REJECTED",
+            "injection_detected": True,
+            "pii_flags": exc.result.pii_detections,
+            "error": str(exc),
+        }
     except Exception as exc:
-        return {"status": "REJECTED", "error": f"Embedding failed: {exc}"}
+        return _fail(exc, "Embedding failed")
 
 
-def _analysis(state: PipelineState, ai_client: anthropic.Anthropic) -> dict:
-    print(f"🤖 [ANALYSIS] Generating brief for case #{state['case_id']}...")
+def _analysis(state: PipelineState, ai_client: "anthropic.Anthropic") -> dict:
     try:
         brief = generate_brief(state["case_id"], ai_client)
         return {"status": "BRIEF_GENERATED", "ai_brief": brief}
     except Exception as exc:
-        return {"status": "REJECTED", "error": f"Brief generation failed: {exc}"}
+        return _fail(exc, "Brief generation failed")
+
+
+def _direct_analysis(state: PipelineState, ai_client: "anthropic.Anthropic") -> dict:
+    try:
+        # Checkpoints written before document_text existed still point at the spooled file
+        text = state.get("document_text") or extract_text(_local_document(state))
+        brief, passages = generate_direct_brief(text, ai_client)
+    except Exception as exc:
+        return _fail(exc, "Brief generation failed")
+    _get_spool().release(state["case_id"])
+    return {"status": "BRIEF_GENERATED", "ai_brief": brief, "chunk_count": passages}
+
+
+def _deferred_index(state: PipelineState) -> dict:
+    """
+    Bring the vector store in line with a briefed fast-path filing, beside brief_generated:
+    index its chunks (DIRECT_INDEXING=deferred), or drop the case's earlier chunks so none
+    are served as current (skip). A failure only costs cross-case search, so it is logged
+    rather than failing the case.
+    """
+    case_id = state["case_id"]
+    try:
+        if DIRECT_INDEXING == "deferred":
+            count = ingest_document(state["local_path"], case_id, state["document_text"])
+            log.info("Deferred indexing: %d chunks", count, extra={"case_id": case_id, "chunks": count})
+        else:
+            drop_case_vectors(case_id)
+    except Exception as exc:
+        log.warning("Deferred indexing failed — case stale in cross-case search: %s", exc,
+                    extra={"case_id": case_id})
+    return {}
 
 
 def _brief_generated(state: PipelineState) -> dict:
     # Graph interrupts here — judge validates on-chain, oracle resumes graph
-    print(f"📋 [BRIEF_GENERATED] Case #{state['case_id']} ready. Awaiting judicial validation.")
+    log.info("Case #%s brief ready — awaiting judicial validation", state["case_id"])
     return {}
 
 
 def _validate(state: PipelineState) -> dict:
     # Resumed after judge calls validateEvidence() on-chain
-    print(f"⚖️  [VALIDATED] Case #{state['case_id']} judicially confirmed.")
+    log.info("Case #%s judicially confirmed", state["case_id"])
     return {"status": "VALIDATED"}
 
 
 def _rejected(state: PipelineState) -> dict:
-    print(f"🚫 [REJECTED] Case #{state['case_id']}: {state.get('error', 'unknown error')}")
+    log.warning("Case #%s rejected: %s", state["case_id"], state.get("error", "unknown error"))
+    if _spool is not None:
+        _spool.release(state["case_id"])
     return {}
 
 
@@ -142,45 +355,107 @@ def _after_integrity(state: PipelineState) -> str:
     return "embedding" if state["status"] == "EMBEDDING" else "rejected"
 
 def _after_embedding(state: PipelineState) -> str:
-    return "analysis" if state["status"] == "ANALYSIS" else "rejected"
+    if state["status"] != "ANALYSIS":
+        return "rejected"
+    return "direct_analysis" if state.get("route") == "direct" else "analysis"
 
 def _after_analysis(state: PipelineState) -> str:
     return "brief_generated" if state["status"] == "BRIEF_GENERATED" else "rejected"
 
+def _after_direct_analysis(state: PipelineState) -> str | list[str]:
+    # Only a briefed filing reaches the vector store
+    return ["brief_generated", "deferred_index"] if state["status"] == "BRIEF_GENERATED" else "rejected"
+
 
 # ---------------------------------------------------------------------------
 # Graph factory
 # ---------------------------------------------------------------------------
 
-def build_graph(ai_client: anthropic.Anthropic, verify_fn) -> StateGraph:
+def build_graph(
+    ai_client: "anthropic.Anthropic",
+    verify_fn,
+    checkpointer: "BaseCheckpointSaver | None" = None,
+) -> "StateGraph":
     """
     Compile the oracle pipeline graph.
     Pass ai_client and verify_fn so nodes can close over them without globals.
+    checkpointer defaults to the durable SQLite store so paused cases survive restarts;
+    pass a MemorySaver for throwaway runs (benchmarks, evals).
     """
+    from langgraph.graph import StateGraph, END
+
     def integrity_check(state): return _integrity_check(state, verify_fn)
     def analysis(state):        return _analysis(state, ai_client)
+    def direct_analysis(state): return _direct_analysis(state, ai_client)
 
     builder = StateGraph(PipelineState)
-
-    builder.add_node("receive",         _receive)
-    builder.add_node("integrity_check", integrity_check)
-    builder.add_node("embedding",       _embedding)
-    builder.add_node("analysis",        analysis)
-    builder.add_node("brief_generated", _brief_generated)
-    builder.add_node("validate",        _validate)
-    builder.add_node("rejected",        _rejected)
+    retry = _retry_policies()
+
+    # Every node is wrapped in a metrics span (wall + CPU time per node, see pipeline/metrics.py)
+    builder.add_node("receive",         instrument_node("receive", _receive),                retry_policy=retry["receive"])
+    builder.add_node("integrity_check", instrument_node("integrity_check", integrity_check))
+    builder.add_node("embedding",       instrument_node("embedding", _embedding),            retry_policy=retry["embedding"])
+    builder.add_node("analysis",        instrument_node("analysis", analysis),               retry_policy=retry["analysis"])
+    builder.add_node("direct_analysis", instrument_node("direct_analysis", direct_analysis), retry_policy=retry["analysis"])
+    builder.add_node("deferred_index",  instrument_node("deferred_index", _deferred_index))
+    builder.add_node("brief_generated", instrument_node("brief_generated", _brief_generated))
+    builder.add_node("validate",        instrument_node("validate", _validate))
+    builder.add_node("rejected",        instrument_node("rejected", _rejected))
 
     builder.set_entry_point("receive")
 
     builder.add_conditional_edges("receive",         _after_receive,   {"integrity_check": "integrity_check", "rejected": "rejected"})
     builder.add_conditional_edges("integrity_check", _after_integrity,  {"embedding": "embedding",             "rejected": "rejected"})
-    builder.add_conditional_edges("embedding",       _after_embedding,  {"analysis": "analysis",               "rejected": "rejected"})
+    builder.add_conditional_edges("embedding",       _after_embedding,  {"analysis": "analysis", "direct_analysis": "direct_analysis",
+                                                                         "rejected": "rejected"})
     builder.add_conditional_edges("analysis",        _after_analysis,   {"brief_generated": "brief_generated", "rejected": "rejected"})
+    builder.add_conditional_edges("direct_analysis", _after_direct_analysis,
+                                  {"brief_generated": "brief_generated", "deferred_index": "deferred_index", "rejected": "rejected"})
 
+    # Runs beside brief_generated; the case pauses at VALIDATE once both are done
+    builder.add_edge("deferred_index",  END)
     builder.add_edge("brief_generated", "validate")
     builder.add_edge("validate",        END)
     builder.add_edge("rejected",        END)
 
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        from pipeline.checkpoint import open_checkpointer
+        checkpointer = open_checkpointer()
     # Graph pauses before validate — resumes when judge validates on-chain
     return builder.compile(checkpointer=checkpointer, interrupt_before=["validate"])
+
+
+# ---------------------------------------------------------------------------
+# Re-drive
+# ---------------------------------------------------------------------------
+
+def redrive(graph, config: dict) -> dict:
+    """
+    Resume a failed case from its last successful checkpoint instead of refiling.
+
+    - Transient failure that exhausted its retries: the failed node is still pending
+      in the latest checkpoint, so the thread simply resumes from it.
+    - Permanent failure (routed to REJECTED): fork from the newest checkpoint taken
+      before the failing node ran. Earlier nodes are not re-executed, so a failed
+      ANALYSIS does not re-download, re-hash or re-embed.
+    """
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        raise ValueError(f"No checkpoint for thread {config['configurable']['thread_id']}")
+
+    pending = snapshot.next
+    if pending and "validate" not in pending and "rejected" not in pending:
+        log.info("Re-driving case #%s from pending node '%s'", snapshot.values["case_id"], pending[0],
+                 extra={"case_id": snapshot.values["case_id"]})
+        return graph.invoke(None, config)
+
+    if snapshot.values.get("status") != "REJECTED":
+        raise ValueError(f"Case #{snapshot.values.get('case_id')} is {snapshot.values.get('status')} — nothing to re-drive")
+
+    for past in graph.get_state_history(config):
+        if past.next and "rejected" not in past.next and past.values.get("status") != "REJECTED":
+            log.info("Re-driving case #%s from node '%s'", past.values["case_id"], past.next[0],
+                     extra={"case_id": past.values["case_id"]})
+            return graph.invoke(None, past.config)
+
+    raise ValueError(f"No resumable checkpoint for case #{snapshot.values.get('case_id')}")
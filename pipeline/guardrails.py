@@ -1,16 +1,16 @@
 """
 PII detection and prompt injection defence.
-Runs on every document before chunking or LLM calls.
+Runs on every document before its chunks are stored or any LLM call is made.
+Documents are scanned page by page (PageScanner), so the pipeline can scan the same
+page stream it chunks and memory does not grow with the page count.
 """
+import importlib.util
+import logging
 import re
-import sys
 from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 
-try:
-    from pypdf import PdfReader
-    _HAS_PYPDF = True
-except ImportError:
-    _HAS_PYPDF = False
+log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # PII patterns — structured identifiers common in Pakistani legal documents
@@ -57,44 +57,80 @@ class ScanResult:
         return " | ".join(self.flags)
 
 
-def _extract_text(file_path: str) -> str:
-    if not _HAS_PYPDF:
-        return ""
-    try:
-        reader = PdfReader(file_path)
-        return "\n".join(page.extract_text() or "" for page in reader.pages)
-    except Exception as exc:
-        print(f"⚠️  Guardrails: text extraction failed — {exc}", file=sys.stderr)
-        return ""
+class UnsafeDocument(ValueError):
+    """A document the scan blocked (prompt injection); carries the scan result."""
 
+    def __init__(self, result: ScanResult):
+        super().__init__(f"Prompt injection: {result.summary()}")
+        self.result = result
 
-def scan_document(file_path: str) -> ScanResult:
+
+# pypdf loads on the first scan rather than at import
+_HAS_PYPDF = importlib.util.find_spec("pypdf") is not None
+
+# Characters of the previous page kept in front of the next one, so a pattern split
+# across a page break still matches (longer than any match of the patterns above)
+_CARRY_CHARS = 256
+
+
+class PageScanner:
     """
-    Scan a PDF for PII and prompt injection before any LLM call.
+    Scans a document page by page. Each page is searched together with the tail of the
+    one before it; a match lying entirely in that tail was already counted.
 
     PII found  → flagged in result, processing continues (legal docs contain PII by nature).
     Injection  → result.safe = False, caller must block LLM call.
     """
-    result = ScanResult()
-    text = _extract_text(file_path)
 
-    if not text:
-        result.flags.append("TEXT_EXTRACTION_FAILED")
-        return result
+    def __init__(self):
+        self._tail = ""
+        self._pii: dict[str, int] = {label: 0 for label in _PII_PATTERNS}
+        self._injection = False
+        self._has_text = False
 
-    # --- PII scan ---
-    for label, pattern in _PII_PATTERNS.items():
-        matches = pattern.findall(text)
-        if matches:
-            result.pii_detections.append(f"{label}:{len(matches)}")
-            result.flags.append(f"PII:{label}")
+    def feed(self, page: str) -> None:
+        self._has_text = self._has_text or bool(page.strip())
+        window = f"{self._tail}\n{page}" if self._tail else page
+        fresh = len(window) - len(page)     # matches must end past the carried tail
+        for label, pattern in _PII_PATTERNS.items():
+            self._pii[label] += sum(m.end() > fresh for m in pattern.finditer(window))
+        if not self._injection:
+            self._injection = any(pattern.search(window) for pattern in _INJECTION_PATTERNS)
+        self._tail = window[-_CARRY_CHARS:]
 
-    # --- Prompt injection scan ---
-    for pattern in _INJECTION_PATTERNS:
-        if pattern.search(text):
+    def scan(self, pages: Iterable[str]) -> Iterator[str]:
+        """Pass pages through, scanning each one on the way."""
+        for page in pages:
+            self.feed(page)
+            yield page
+
+    def result(self) -> ScanResult:
+        result = ScanResult()
+        if not self._has_text:
+            result.flags.append("TEXT_EXTRACTION_FAILED")
+            return result
+        for label, count in self._pii.items():
+            if count:
+                result.pii_detections.append(f"{label}:{count}")
+                result.flags.append(f"PII:{label}")
+        if self._injection:
             result.injection_detected = True
             result.safe = False
             result.flags.append("INJECTION_DETECTED")
-            break  # one match is enough to block
+        return result
+
+
+def scan_document(file_path: str) -> ScanResult:
+    """Scan a PDF for PII and prompt injection before any LLM call, one page at a time."""
+    scanner = PageScanner()
+    if not _HAS_PYPDF:
+        return scanner.result()
+    from pipeline.rag import iter_pages
 
-    return result
+    try:
+        for page in iter_pages(file_path, stage="guardrails"):
+            scanner.feed(page)
+    except Exception as exc:
+        log.warning("Guardrails: text extraction failed — %s", exc)
+        return ScanResult(flags=["TEXT_EXTRACTION_FAILED"])
+    return scanner.result()
@@ -0,0 +1,296 @@
+"""
+IPFS document fetching across multiple gateways with hedged requests.
+
+- Gateways are ranked by observed latency and error rate (GatewayStats).
+- The best-ranked gateway is asked first. If no request has produced a byte within
+  hedge_after_s, a hedged request goes to the next gateway; a failed request fails
+  over immediately. Whichever finishes first *with a matching SHA-256* wins — a fast
+  but wrong answer never beats a slower correct one.
+- A LocalBlockstore (a directory of files named by CID) is consulted first. It is the
+  fallback when gateways are unreachable and the offline stand-in for tests.
+- Document sizes for the oracle's scheduler (content_lengths) are HEAD requests sent to
+  every gateway at once for a whole batch of CIDs, bounded by one overall deadline.
+  A CID names immutable content, so sizes are cached.
+
+Configuration (env):
+    IPFS_GATEWAYS        comma-separated gateway prefixes (falls back to IPFS_GATEWAY)
+    IPFS_TIMEOUT         per-request connect/read timeout in seconds
+    IPFS_HEDGE_AFTER_S   time-to-first-byte before a hedged request is fired
+    IPFS_BLOCKSTORE_DIR  optional local blockstore directory
+    IPFS_SIZE_PROBE_S    overall deadline of a batch of size probes (default 1.0)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import requests
+
+from pipeline.errors import TransientError
+
+_DEFAULT_GATEWAYS = "https://ipfs.io/ipfs/,https://dweb.link/ipfs/"
+_STREAM_CHUNK = 256 * 1024
+# Weight of the newest sample in the latency moving average
+_EWMA_ALPHA = 0.3
+IPFS_SIZE_PROBE_S = float(os.getenv("IPFS_SIZE_PROBE_S", "1.0"))
+# Sizes remembered per fetcher (CIDs are immutable, so entries never go stale)
+_SIZE_CACHE_ENTRIES = 4096
+
+
+def _normalize_hash(expected) -> str:
+    if isinstance(expected, (bytes, bytearray)) or hasattr(expected, "hex"):
+        expected = expected.hex()
+    return str(expected).lower().removeprefix("0x")
+
+
+@dataclass
+class GatewayStats:
+    """Rolling latency / error statistics used to rank a gateway."""
+    url: str
+    ewma_latency_s: float | None = None
+    successes: int = 0
+    failures: int = 0
+    hash_mismatches: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        total = self.successes + self.failures + self.hash_mismatches
+        return (self.failures + self.hash_mismatches) / total if total else 0.0
+
+    def score(self) -> float:
+        """Lower is better. Unseen gateways score as 1s so they get tried early."""
+        latency = self.ewma_latency_s if self.ewma_latency_s is not None else 1.0
+        return latency * (1.0 + 4.0 * self.error_rate)
+
+    def record_latency(self, elapsed_s: float) -> None:
+        if self.ewma_latency_s is None:
+            self.ewma_latency_s = elapsed_s
+        else:
+            self.ewma_latency_s += _EWMA_ALPHA * (elapsed_s - self.ewma_latency_s)
+
+
+class LocalBlockstore:
+    """A directory of documents stored under their CID."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, cid: str) -> str:
+        return os.path.join(self.root, cid)
+
+    def get(self, cid: str) -> bytes | None:
+        try:
+            with open(self.path_for(cid), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, cid: str, content: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path_for(cid) + ".part"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, self.path_for(cid))
+
+
+@dataclass
+class FetchResult:
+    content: bytes
+    source: str
+    verified: bool
+    elapsed_s: float
+    attempts: list[str] = field(default_factory=list)
+
+
+class IPFSFetcher:
+    """Hedged, hash-verified fetcher over a ranked list of gateways."""
+
+    def __init__(
+        self,
+        gateways: list[str],
+        timeout_s: float = 10.0,
+        hedge_after_s: float = 1.5,
+        max_inflight: int = 2,
+        blockstore: LocalBlockstore | None = None,
+    ):
+        self.timeout_s = timeout_s
+        self.hedge_after_s = hedge_after_s
+        self.max_inflight = max(1, max_inflight)
+        self.blockstore = blockstore
+        self._stats = {url: GatewayStats(url) for url in gateways}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        # Losing hedges linger until their next chunk or timeout, so leave headroom for concurrent cases
+        self._pool = ThreadPoolExecutor(max_workers=max(4, 2 * len(gateways)), thread_name_prefix="ipfs")
+        # Size probes get their own threads: a batch of HEADs must not queue behind downloads
+        self._probe_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ipfs-head")
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "IPFSFetcher":
+        raw = os.getenv("IPFS_GATEWAYS") or os.getenv("IPFS_GATEWAY") or _DEFAULT_GATEWAYS
+        blockstore_dir = os.getenv("IPFS_BLOCKSTORE_DIR", "")
+        return cls(
+            gateways=[g.strip() for g in raw.split(",") if g.strip()],
+            timeout_s=float(os.getenv("IPFS_TIMEOUT", "10")),
+            hedge_after_s=float(os.getenv("IPFS_HEDGE_AFTER_S", "1.5")),
+            blockstore=LocalBlockstore(blockstore_dir) if blockstore_dir else None,
+        )
+
+    def ranked(self) -> list[GatewayStats]:
+        """Gateways ordered best-first by latency and error rate."""
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda s: s.score())
+
+    def _download(self, gateway: str, cid: str, first_byte: threading.Event, cancel: threading.Event) -> bytes:
+        parts: list[bytes] = []
+        with self._session.get(f"{gateway}{cid}", timeout=self.timeout_s, stream=True) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(_STREAM_CHUNK):
+                if cancel.is_set():
+                    raise TransientError(f"{gateway}: cancelled (another gateway won)")
+                first_byte.set()
+                parts.append(chunk)
+        first_byte.set()
+        return b"".join(parts)
+
+    def _record(self, gateway: str, elapsed_s: float, outcome: str) -> None:
+        with self._lock:
+            stats = self._stats[gateway]
+            if outcome == "ok":
+                stats.successes += 1
+                stats.record_latency(elapsed_s)
+            elif outcome == "mismatch":
+                stats.hash_mismatches += 1
+            else:
+                stats.failures += 1
+                stats.record_latency(max(elapsed_s, self.timeout_s))
+
+    def content_length(self, cid: str, deadline_s: float = IPFS_SIZE_PROBE_S) -> int | None:
+        """Document size without downloading it (see content_lengths). None if nobody says in time."""
+        return self.content_lengths([cid], deadline_s)[cid]
+
+    def content_lengths(self, cids: list[str], deadline_s: float = IPFS_SIZE_PROBE_S) -> dict[str, int | None]:
+        """
+        Sizes of several documents: cached, else the local blockstore, else the first
+        Content-Length from HEAD requests sent to every gateway concurrently. The whole
+        batch waits at most deadline_s; a probe answering later still fills the cache.
+        """
+        sizes: dict[str, int | None] = {}
+        with self._lock:
+            for cid in cids:
+                sizes[cid] = self._sizes.get(cid)
+        for cid in cids:
+            if sizes[cid] is None and self.blockstore is not None:
+                try:
+                    sizes[cid] = os.path.getsize(self.blockstore.path_for(cid))
+                except OSError:
+                    pass
+        missing = [cid for cid in dict.fromkeys(cids) if sizes[cid] is None]
+        probes = {self._probe_pool.submit(self._head, gateway.url, cid): cid
+                  for cid in missing for gateway in self.ranked()}
+        deadline = time.monotonic() + deadline_s
+        pending = set(probes)
+        while pending and any(sizes[cid] is None for cid in missing):
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                cid = probes[future]
+                if sizes[cid] is None and future.result() is not None:
+                    sizes[cid] = future.result()
+        return sizes
+
+    def _head(self, gateway: str, cid: str) -> int | None:
+        try:
+            resp = self._session.head(f"{gateway}{cid}", timeout=self.timeout_s, allow_redirects=True)
+        except requests.RequestException:
+            return None
+        if not (resp.ok and resp.headers.get("Content-Length", "").isdigit()):
+            return None
+        size = int(resp.headers["Content-Length"])
+        with self._lock:
+            self._sizes[cid] = size
+            self._sizes.move_to_end(cid)
+            while len(self._sizes) > _SIZE_CACHE_ENTRIES:
+                self._sizes.popitem(last=False)
+        return size
+
+    def fetch(self, cid: str, expected_hash) -> FetchResult:
+        """
+        Fetch a document, returning the first response whose SHA-256 matches expected_hash.
+        If every source answered but none matched, the first answer is returned with
+        verified=False so the integrity check can flag the tamper. If no source answered,
+        TransientError is raised.
+        """
+        expected = _normalize_hash(expected_hash)
+        started = time.monotonic()
+
+        if self.blockstore is not None:
+            local = self.blockstore.get(cid)
+            if local is not None and hashlib.sha256(local).hexdigest() == expected:
+                return FetchResult(local, "blockstore", True, time.monotonic() - started, ["blockstore"])
+
+        queue = [s.url for s in self.ranked()]
+        cancel = threading.Event()
+        inflight: dict[Future, tuple[str, float, threading.Event]] = {}
+        attempts: list[str] = []
+        errors: list[str] = []
+        unverified: FetchResult | None = None
+
+        def launch() -> None:
+            gateway = queue.pop(0)
+            first_byte = threading.Event()
+            attempts.append(gateway)
+            fut = self._pool.submit(self._download, gateway, cid, first_byte, cancel)
+            inflight[fut] = (gateway, time.monotonic(), first_byte)
+
+        try:
+            if queue:
+                launch()
+            while inflight:
+                hedge_possible = queue and len(inflight) < self.max_inflight
+                timeout = self.hedge_after_s if hedge_possible else None
+                done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Hedge only when nobody has started streaming bytes yet
+                    if not any(ev.is_set() for _, _, ev in inflight.values()):
+                        launch()
+                    continue
+
+                for fut in done:
+                    gateway, t0, _ = inflight.pop(fut)
+                    elapsed = time.monotonic() - t0
+                    try:
+                        content = fut.result()
+                    except Exception as exc:
+                        self._record(gateway, elapsed, "error")
+                        errors.append(f"{gateway}: {exc}")
+                        if queue:
+                            launch()
+                        continue
+
+                    if hashlib.sha256(content).hexdigest() == expected:
+                        self._record(gateway, elapsed, "ok")
+                        return FetchResult(content, gateway, True, time.monotonic() - started, attempts)
+
+                    self._record(gateway, elapsed, "mismatch")
+                    errors.append(f"{gateway}: SHA-256 mismatch")
+                    if unverified is None:
+                        unverified = FetchResult(content, gateway, False, time.monotonic() - started, attempts)
+                    if queue:
+                        launch()
+        finally:
+            cancel.set()
+
+        if unverified is not None:
+            return unverified
+        if self.blockstore is not None:
+            local = self.blockstore.get(cid)
+            if local is not None:
+                return FetchResult(local, "blockstore", False, time.monotonic() - started, attempts + ["blockstore"])
+        raise TransientError(f"All IPFS sources failed for {cid}: {'; '.join(errors) or 'no gateways configured'}")
@@ -0,0 +1,256 @@
+"""
+Lexical retrieval and local reranking for brief context selection.
+
+Dense embeddings blur exact identifiers — party names, case numbers, statute
+references like "Section 6 of the Punjab Rented Premises Act 2009". This module
+adds the lexical side of hybrid retrieval (rag.hybrid_retrieve):
+
+    BM25Index                — Okapi BM25 over a document list, in memory
+    LexicalIndex             — the same BM25, persisted: one SQLite file of per-chunk term
+                               postings written at ingest, so a query reads only the postings
+                               of its own terms instead of every chunk of the case
+    reciprocal_rank_fusion   — merge dense and lexical rankings without score calibration
+    rerank                   — cheap local reranker: fused score + query-term coverage
+                               + density of legal identifiers (statutes, case numbers,
+                               dates, amounts, party roles), which also demotes procedural
+                               boilerplate that merely shares the query's words
+"""
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with".split()
+)
+
+# Identifiers a brief must not miss, by type. The reranker rewards the types a query
+# asks about (its trigger words); a query that triggers none rewards all of them.
+PARTY_ROLES = r"(?:Petitioner|Respondent|Plaintiff|Defendant|Complainant|Accused|Appellant|Applicant|Claimant|Employer|Employee)s?"
+_LEGAL_ENTITIES: dict[str, tuple[list[re.Pattern], frozenset[str]]] = {
+    "party": (
+        [
+            re.compile(rf"^\s*{PARTY_ROLES}\b\s*(?:No\.\s*\d+\s*)?[:\-–]", re.MULTILINE),   # party block lines
+            re.compile(r"\b(?:Mr|Mrs|Ms|Dr|M/s)\.?\s+[A-Z][a-z]+"),
+        ],
+        frozenset("parties party plaintiff defendant petitioner respondent complainant accused appellant".split()),
+    ),
+    "statute": (
+        [
+            re.compile(r"\b(?:Section|Sec\.|Article|Art\.|Rule|Order)\s*\d+[A-Z]?(?:-[A-Z])?\b", re.IGNORECASE),
+            re.compile(r"\b[A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z()]+)*\s+(?:Act|Ordinance|Code),?\s*\d{4}\b"),
+        ],
+        frozenset("claims allegations charges legal arguments statute section violation".split()),
+    ),
+    "case_number": (
+        [re.compile(r"\b(?:Case|Suit|Petition|Appeal|FIR|Writ)\s*No\.?\s*[\w/-]*\d[\w/-]*", re.IGNORECASE)],
+        frozenset("case filing number".split()),
+    ),
+    "date": (
+        [re.compile(r"\b\d{1,2}(?:st|nd|rd|th)?\s+(?:January|February|March|April|May|June|July|August|"
+                    r"September|October|November|December)\s+\d{4}\b")],
+        frozenset("dates date timeline incident occurrence filing".split()),
+    ),
+    "amount": (
+        [re.compile(r"\b(?:PKR|Rs\.?)\s*[\d,]+", re.IGNORECASE)],
+        frozenset("claims compensation damages amount relief".split()),
+    ),
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a small document set (one case's chunks)."""
+
+    def __init__(self, docs: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self._tfs = [Counter(tokenize(d)) for d in docs]
+        self._lens = [sum(tf.values()) for tf in self._tfs]
+        self._avg_len = (sum(self._lens) / len(self._lens)) if self._lens else 0.0
+        df = Counter(term for tf in self._tfs for term in tf)
+        n = len(docs)
+        self._idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def scores(self, query: str) -> list[float]:
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        out = []
+        for tf, length in zip(self._tfs, self._lens):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_len or 1.0))
+            out.append(sum(
+                self._idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if t in tf
+            ))
+        return out
+
+    def top(self, query: str, k: int) -> list[int]:
+        """Indices of the k best-scoring documents (zero-score documents excluded)."""
+        scored = [(s, i) for i, s in enumerate(self.scores(query)) if s > 0]
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        return [i for _, i in scored[:k]]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    name    TEXT NOT NULL,          -- collection name (one case)
+    idx     INTEGER NOT NULL,       -- chunk_index
+    length  INTEGER NOT NULL,
+    PRIMARY KEY (name, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    name    TEXT NOT NULL,
+    term    TEXT NOT NULL,
+    idx     INTEGER NOT NULL,
+    tf      INTEGER NOT NULL,
+    PRIMARY KEY (name, term, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats (
+    name    TEXT PRIMARY KEY,
+    n       INTEGER NOT NULL,
+    total   INTEGER NOT NULL        -- summed document length, for the average
+);
+"""
+
+
+class LexicalIndex:
+    """
+    BM25Index's scoring over postings kept in SQLite, keyed by collection name.
+    Chunks are added batch by batch as ingest streams them; top() reads only the
+    postings of the query's terms (and the collection's count and average length).
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1, self.b = k1, b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add(self, name: str, chunks: Iterable[tuple[int, str]]) -> None:
+        """Index (chunk_index, text) pairs under `name`."""
+        docs, postings = [], []
+        for idx, text in chunks:
+            tf = Counter(tokenize(text))
+            docs.append((name, idx, sum(tf.values())))
+            postings.extend((name, term, idx, count) for term, count in tf.items())
+        if not docs:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?)", docs)
+            self._conn.executemany("INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?)", postings)
+            self._conn.execute(
+                "INSERT INTO stats VALUES (?, ?, ?) ON CONFLICT (name) DO UPDATE "
+                "SET n = n + excluded.n, total = total + excluded.total",
+                (name, len(docs), sum(d[2] for d in docs)),
+            )
+
+    def drop(self, name: str) -> None:
+        with self._lock, self._conn:
+            for table in ("docs", "postings", "stats"):
+                self._conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+
+    def rename(self, name: str, new_name: str) -> None:
+        """
+        Move `name`'s postings to `new_name`, in one transaction: what `new_name` had is
+        first moved aside to `<new_name>_previous`, and dropped only once the move is done.
+        """
+        previous = f"{new_name}_previous"
+        with self._lock, self._conn:
+            for table in ("docs", "postings", "stats"):
+                self._conn.execute(f"DELETE FROM {table} WHERE name = ?", (previous,))
+                self._conn.execute(f"UPDATE {table} SET name = ? WHERE name = ?", (previous, new_name))
+                self._conn.execute(f"UPDATE {table} SET name = ? WHERE name = ?", (new_name, name))
+                self._conn.execute(f"DELETE FROM {table} WHERE name = ?", (previous,))
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT n FROM stats WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def top(self, name: str, query: str, k: int) -> list[int]:
+        """chunk_index of the k best-scoring chunks (zero-score chunks excluded), as BM25Index.top."""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            stats = self._conn.execute("SELECT n, total FROM stats WHERE name = ?", (name,)).fetchone()
+            rows = self._conn.execute(
+                f"SELECT p.term, p.idx, p.tf, d.length FROM postings p JOIN docs d ON d.name = p.name AND d.idx = p.idx "
+                f"WHERE p.name = ? AND p.term IN ({', '.join('?' * len(terms))})",
+                (name, *terms),
+            ).fetchall()
+        if not stats or not rows:
+            return []
+        n, avg_len = stats[0], (stats[1] / stats[0]) if stats[0] else 0.0
+        matches: dict[str, list[tuple[int, int, int]]] = defaultdict(list)
+        for term, idx, tf, length in rows:
+            matches[term].append((idx, tf, length))
+        scores: dict[int, float] = defaultdict(float)
+        for term in terms:
+            idf = math.log(1 + (n - len(matches[term]) + 0.5) / (len(matches[term]) + 0.5))
+            for idx, tf, length in matches[term]:
+                norm = self.k1 * (1 - self.b + self.b * length / (avg_len or 1.0))
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(((s, i) for i, s in scores.items() if s > 0), key=lambda t: (-t[0], t[1]))
+        return [i for _, i in ranked[:k]]
+
+    def vacuum(self) -> None:
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = 60) -> dict[int, float]:
+    """RRF: each list contributes 1 / (k + rank) per document. Order-only, so no score calibration."""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def entity_density(text: str, types: list[str] | None = None) -> int:
+    """Count legal identifiers in text (all types, or only `types`)."""
+    return sum(
+        len(p.findall(text))
+        for name, (patterns, _) in _LEGAL_ENTITIES.items() if types is None or name in types
+        for p in patterns
+    )
+
+
+def entity_types_for(query: str) -> list[str] | None:
+    """Entity types a query asks about, or None (all types) if it triggers none."""
+    terms = set(tokenize(query))
+    types = [name for name, (_, triggers) in _LEGAL_ENTITIES.items() if terms & triggers]
+    return types or None
+
+
+def rerank(query: str, docs: list[str], fused: list[float]) -> list[int]:
+    """
+    Order candidate docs (positions into `docs`) by a local relevance score:
+    0.3 · normalised fused rank score + 0.2 · query-term coverage
+    + 0.2 · density of the identifier types the query asks about
+    + 0.3 · density of legal identifiers of any type.
+    """
+    if not docs:
+        return []
+    top = max(fused) or 1.0
+    q_terms = set(tokenize(query))
+    types = entity_types_for(query)
+    scored = []
+    for i, (doc, base) in enumerate(zip(docs, fused)):
+        terms = set(tokenize(doc))
+        coverage = len(q_terms & terms) / len(q_terms) if q_terms else 0.0
+        asked = min(1.0, entity_density(doc, types) / 4)
+        substance = min(1.0, entity_density(doc) / 4)
+        scored.append((0.3 * base / top + 0.2 * coverage + 0.2 * asked + 0.3 * substance, i))
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    return [i for _, i in scored]
@@ -0,0 +1,292 @@
+"""
+Local pipeline instrumentation — works with LangSmith tracing off, no external SaaS.
+
+An in-process registry of counters, gauges and histograms:
+    jv_node_wall_seconds / jv_node_cpu_seconds   per node, per outcome
+    jv_ipfs_bytes_downloaded_total               per source (gateway / blockstore)
+    jv_pages_extracted_total                     per stage (guardrails / ingest)
+    jv_chunks_embedded_total
+    jv_embed_batch_seconds                       per embedding model (one observation per batch)
+    jv_llm_tokens_total                          direction = input / output
+    jv_node_retries_total                        transient failures handed to a RetryPolicy
+    jv_spool_bytes / jv_spool_evictions_total    document spool size per tier, quota evictions
+    jv_queue_depth / jv_queue_wait_seconds       events waiting in the oracle, wait per priority class
+
+Exposed by the oracle as Prometheus text (serve_metrics → GET /metrics, /metrics.json)
+and/or a periodic JSON file (start_json_dump).
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _label_str(key: tuple[tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in key) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: dict) -> tuple[tuple[str, str], ...]:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, value: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_label_str(k)} {v:g}" for k, v in sorted(self._values.items())]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {_label_str(k) or "_": v for k, v in self._values.items()}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, value: float = 1.0, **labels) -> None:
+        self.inc(-value, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # key → [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_str(key + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_str(key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_label_str(key)} {series[-1]}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                _label_str(k) or "_": {
+                    "count": s[-1],
+                    "sum": round(s[-2], 6),
+                    "avg": round(s[-2] / s[-1], 6) if s[-1] else 0.0,
+                }
+                for k, s in self._series.items()
+            }
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render_prometheus(self) -> str:
+        out = []
+        for metric in self._metrics.values():
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.render())
+        return "\n".join(out) + "\n"
+
+    def snapshot(self) -> dict:
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "metrics": {name: m.snapshot() for name, m in self._metrics.items()},
+        }
+
+
+REGISTRY = Registry()
+
+NODE_WALL = REGISTRY.histogram("jv_node_wall_seconds", "Wall-clock time per pipeline node execution")
+NODE_CPU = REGISTRY.histogram("jv_node_cpu_seconds", "Thread CPU time per pipeline node execution")
+BYTES_DOWNLOADED = REGISTRY.counter("jv_ipfs_bytes_downloaded_total", "Document bytes fetched from IPFS")
+PAGES_EXTRACTED = REGISTRY.counter("jv_pages_extracted_total", "PDF pages run through text extraction")
+CHUNKS_EMBEDDED = REGISTRY.counter("jv_chunks_embedded_total", "Chunks embedded and stored in ChromaDB")
+EMBED_BATCH_SECONDS = REGISTRY.histogram("jv_embed_batch_seconds", "Inference time per embedding batch")
+LLM_TOKENS = REGISTRY.counter("jv_llm_tokens_total", "Claude tokens by direction (input / output)")
+NODE_RETRIES = REGISTRY.counter("jv_node_retries_total", "Transient node failures handed to a retry policy")
+VECTOR_ARCHIVE_OPS = REGISTRY.counter("jv_vector_archive_total", "Cases moved out of (archive) or back into (restore) the live vector store")
+SPOOL_BYTES = REGISTRY.gauge("jv_spool_bytes", "Bytes held in the document spool by tier (disk / hot)")
+SPOOL_EVICTIONS = REGISTRY.counter("jv_spool_evictions_total", "Released documents deleted to keep the spool under quota")
+QUEUE_DEPTH = REGISTRY.gauge("jv_queue_depth", "Events waiting to be processed by the oracle")
+QUEUE_WAIT = REGISTRY.histogram(
+    "jv_queue_wait_seconds", "Time an event waited in the oracle's scheduler before it ran",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+CASES_FINISHED = REGISTRY.counter("jv_cases_total", "Pipeline runs by final status")
+
+
+# ---------------------------------------------------------------------------
+# Node spans
+# ---------------------------------------------------------------------------
+
+_span_ids = itertools.count(1)
+_local = threading.local()
+
+
+@dataclass
+class Span:
+    """One node execution. span_id correlates log records with the timing sample."""
+    node: str
+    case_id: int | None
+    span_id: str = field(default_factory=lambda: f"{os.getpid():x}-{next(_span_ids):x}")
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    outcome: str = "ok"
+
+
+def current_span() -> Span | None:
+    """The span of the node executing on this thread, if any."""
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def node_span(node: str, case_id: int | None = None) -> Iterator[Span]:
+    """Time a node execution (wall + thread CPU) and record it under its outcome."""
+    span = Span(node, case_id)
+    parent = current_span()
+    _local.span = span
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    try:
+        yield span
+    except BaseException:
+        span.outcome = "error"
+        raise
+    finally:
+        span.wall_s = time.perf_counter() - wall0
+        span.cpu_s = time.thread_time() - cpu0
+        NODE_WALL.observe(span.wall_s, node=node, outcome=span.outcome)
+        NODE_CPU.observe(span.cpu_s, node=node, outcome=span.outcome)
+        log.info("node %s %s", node, span.outcome, extra={
+            "duration_ms": round(1000 * span.wall_s, 2),
+            "cpu_ms": round(1000 * span.cpu_s, 2),
+            "outcome": span.outcome,
+        })
+        _local.span = parent
+
+
+def instrument_node(node: str, fn):
+    """Wrap a graph node function so every execution is recorded as a span."""
+    def wrapped(state):
+        with node_span(node, state.get("case_id")) as span:
+            update = fn(state)
+            if isinstance(update, dict) and update.get("status") == "REJECTED":
+                span.outcome = "rejected"
+            return update
+    wrapped.__name__ = getattr(fn, "__name__", node)
+    return wrapped
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+def serve_metrics(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> "ThreadingHTTPServer":
+    """Serve GET /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = json.dumps(registry.snapshot()).encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = registry.render_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_json_dump(path: str, interval_s: float = 30.0, registry: Registry = REGISTRY) -> threading.Event:
+    """Write registry.snapshot() to path every interval_s seconds. Set the returned event to stop."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_s):
+            tmp = f"{path}.tmp"
+            try:
+                with open(tmp, "w") as f:
+                    json.dump(registry.snapshot(), f, indent=2)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+    return stop
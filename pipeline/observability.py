@@ -9,8 +9,41 @@ LangGraph nodes trace automatically when these env vars are set:
 Call configure_tracing() once at oracle startup. That's it —
 every graph run, every retrieval call, every Claude completion
 will appear as a nested trace in LangSmith.
+
+Latency and resource metrics that work with tracing off live in
+pipeline/metrics.py (Prometheus text endpoint / JSON dump).
+
+configure_logging() sets up structured logs for the pipeline and oracle:
+one JSON object per record with case_id / node / span_id (taken from the
+active metrics span) and duration_ms where a step is timed. Records are
+handed to a QueueHandler; a background QueueListener does the formatting
+and the write, so a slow terminal or pipe never stalls a node.
+    LOG_LEVEL=INFO        DEBUG / INFO / WARNING / ERROR
+    LOG_FORMAT=json       json, or text for a human-readable console
 """
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import time
+
+from pipeline.metrics import current_span
+
+log = logging.getLogger(__name__)
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Context fields every record carries (None when not inside a node / case)
+_CONTEXT_FIELDS = ("case_id", "node", "span_id", "duration_ms")
+# Attributes present on every LogRecord — anything else came from extra={...}
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: logging.handlers.QueueListener | None = None
 
 
 def configure_tracing(project: str = "justice-vault") -> bool:
@@ -23,9 +56,112 @@ def configure_tracing(project: str = "justice-vault") -> bool:
     tracing_on = os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true"
 
     if not api_key or not tracing_on:
-        print("📊 LangSmith: tracing off (set LANGCHAIN_API_KEY + LANGCHAIN_TRACING_V2=true to enable)")
+        log.info("LangSmith tracing off (set LANGCHAIN_API_KEY + LANGCHAIN_TRACING_V2=true to enable)")
         return False
 
     os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT", project)
-    print(f"📊 LangSmith: tracing active → project '{os.environ['LANGCHAIN_PROJECT']}'")
+    log.info("LangSmith tracing active → project '%s'", os.environ["LANGCHAIN_PROJECT"])
     return True
+
+
+# ---------------------------------------------------------------------------
+# Structured logging
+# ---------------------------------------------------------------------------
+
+class SpanContextFilter(logging.Filter):
+    """
+    Stamp case_id / node / span_id from the current metrics span onto each record.
+    Runs on the calling thread (the span is thread-local); explicit extra= wins.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span()
+        for name in _CONTEXT_FIELDS:
+            if not hasattr(record, name):
+                setattr(record, name, getattr(span, name, None) if name != "duration_ms" else None)
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Merge args into the message and render any traceback on the calling thread
+    (arguments may be mutated later), but leave JSON/text formatting and the
+    write to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, context fields and any extra= keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and value is not None:
+                out[key] = value
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        ctx = " ".join(
+            f"{k}={getattr(record, k)}" for k in _CONTEXT_FIELDS if getattr(record, k, None) is not None
+        )
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:7s} {record.getMessage()}"
+        if ctx:
+            line += f"  [{ctx}]"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def configure_logging(level: str | int | None = None, fmt: str | None = None, stream=None) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a QueueHandler on the root logger and start the
+    background listener that formats and writes records to stream (default stderr).
+    Idempotent: calling again replaces the previous listener (e.g. to change level).
+    """
+    global _listener
+    stop_logging()
+
+    sink = logging.StreamHandler(stream or sys.stderr)
+    sink.setFormatter(_TextFormatter() if (fmt or LOG_FORMAT) == "text" else JsonFormatter())
+
+    handler = _QueueHandler(queue.SimpleQueue())
+    handler.addFilter(SpanContextFilter())
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level or LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(handler.queue, sink, respect_handler_level=False)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,30 +1,118 @@
 """
 RAG pipeline: chunk → embed → store in ChromaDB → retrieve → generate brief.
 Replaces the single-shot full-PDF Claude call with cited, retrieved answers.
+
+Chunks live in a per-case collection (brief retrieval) and are mirrored into a
+shared all_cases collection for cross-case search (search_all_cases).
+Documents are ingested as a stream: pages are extracted one at a time, chunked as they
+arrive (LegalChunker.split_pages) and embedded and stored INGEST_BATCH_CHUNKS at a time,
+so peak memory does not grow with the page count.
+Short filings skip retrieval: generate_direct_brief sends their full text (routing
+in pipeline/graph.py).
+
+Finished cases leave the live store: archive_case moves a case's collection into a compact
+file (pipeline/vector_archive.py) and the case is restored the next time anything opens
+its collection. Its all_cases rows stay, so cross-case search keeps finding validated
+cases without restoring them. compact_store (opt-in, for the pinned chromadb release
+only) reclaims the space Chroma leaves behind.
 """
+import functools
+import hashlib
+import logging
 import os
-import random
+import shutil
+import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from pipeline.chunking import PAGE_BREAK, Chunk, LegalChunker
+from pipeline.context import Passage, assemble_context, count_tokens
+from pipeline.embeddings import get_embedding_provider
+from pipeline.errors import TransientError, classify
+from pipeline.lexical import LexicalIndex, reciprocal_rank_fusion, rerank
+from pipeline.metrics import CHUNKS_EMBEDDED, LLM_TOKENS, PAGES_EXTRACTED, VECTOR_ARCHIVE_OPS
+from pipeline.vector_archive import CaseVectors, read_archive, write_archive
+
+# The SDKs (chromadb, anthropic, pypdf) load on first use, not at import
+if TYPE_CHECKING:
+    import anthropic
+    import chromadb
 
-import anthropic
-import chromadb
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from pypdf import PdfReader
 
-try:
-    from langsmith import traceable
-except ImportError:
-    def traceable(**_kw):
-        def _wrap(fn): return fn
-        return _wrap
+
+def traceable(**trace_kw):
+    """
+    langsmith.traceable, bound on first call instead of at import (langsmith costs ~0.7 s
+    to import). Untraced when LANGCHAIN_TRACING_V2 is not "true" or langsmith is missing.
+    """
+    def _wrap(fn):
+        bound = None
+
+        @functools.wraps(fn)
+        def _call(*args, **kwargs):
+            nonlocal bound
+            if bound is None:
+                bound = fn
+                if os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true":
+                    try:
+                        from langsmith import traceable as _langsmith_traceable
+                        bound = _langsmith_traceable(**trace_kw)(fn)
+                    except ImportError:
+                        pass
+            return bound(*args, **kwargs)
+        return _call
+    return _wrap
+
+log = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CHROMA_DIR = os.path.join(BASE_DIR, "chroma_db")
+# An embedded PersistentClient belongs to one process. Several oracle instances
+# (scripts/case_leases.py) share a Chroma server instead: CHROMA_HOST=host:port
+CHROMA_HOST = os.getenv("CHROMA_HOST", "")
+# Archived (finished) cases, one file each; must be shared by every instance using CHROMA_HOST
+VECTOR_ARCHIVE_DIR = os.getenv("VECTOR_ARCHIVE_DIR") or os.path.join(BASE_DIR, "vector_archive")
+VECTOR_ARCHIVE_DTYPE = os.getenv("VECTOR_ARCHIVE_DTYPE", "float16")
+# BM25 postings of every live case, written at ingest (pipeline/lexical.py); "" → inside CHROMA_DIR.
+# Shared by every instance using CHROMA_HOST, like VECTOR_ARCHIVE_DIR
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "")
 
 CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200
+# Chunks embedded and written per add(): bounds ingest memory and keeps every add
+# under the store's maximum batch size
+INGEST_BATCH_CHUNKS = int(os.getenv("INGEST_BATCH_CHUNKS", "256"))
+# Splits on court-document structure (headings, party blocks, numbered paragraphs)
+# and records page / offsets / section on every chunk — see pipeline/chunking.py
+CHUNKER = LegalChunker(chunk_size=CHUNK_SIZE)
 TOP_K = 5
-MAX_CONTEXT_CHUNKS = 12
+HYBRID_CANDIDATES = 8   # dense and lexical candidates per query before fusion
+# Brief context is bounded by tokens, not chunk count: overlapping neighbours are merged
+# and the budget is filled in relevance order (pipeline/context.py). The default is the
+# smallest budget that keeps the party / claims recall of a 12-chunk context in the
+# offline evals, at about 16% fewer prompt tokens
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2600"))
+BRIEF_MODEL = "claude-sonnet-4-6"
+BRIEF_MAX_TOKENS = 1024
+
+# Cross-case search: every case's chunks are mirrored (stored embeddings, no re-embedding)
+# into one shared collection, so "which other cases mention X" is a single ANN query.
+ALL_CASES_COLLECTION = "all_cases"
+CROSS_CASE_PAGE_SIZE = 10
+CROSS_CASE_BUDGET_MS = float(os.getenv("CROSS_CASE_BUDGET_MS", "2000"))
+# compact_store reads Chroma's on-disk schema; it was written and tested against this release line
+COMPACT_CHROMA_VERSION = "1.5."
+
+# None → the batched local provider (pipeline/embeddings.py: ONNX MiniLM on CPU, configured
+# by EMBED_* env vars). Offline runs (evals, benchmarks) swap in a local function.
+# rag embeds explicitly, so collections never carry (or download) an embedding function.
+EMBEDDING_FUNCTION: Callable[[list[str]], Sequence] | None = None
 
 BRIEF_PROMPT_TEMPLATE = """\
 You are an expert legal assistant. Based on the following retrieved excerpts from a legal evidence document, produce a formal Judicial Case Brief.
@@ -43,72 +131,153 @@ RETRIEVED DOCUMENT EXCERPTS:
 """
 
 _RETRIEVAL_QUERIES = [
-    "parties involved plaintiff defendant petitioner respondent",
+    "parties involved plaintiff defendant petitioner respondent appellant applicant complainant accused",
     "key claims allegations charges legal arguments",
     "dates timeline incident occurrence filing",
     "evidence facts circumstances background",
 ]
 
-_chroma_client: chromadb.PersistentClient | None = None
+_chroma_client: "chromadb.ClientAPI | None" = None
+_chroma_lock = threading.Lock()
 
 
-def _get_client() -> chromadb.PersistentClient:
+def _get_client() -> "chromadb.ClientAPI":
     global _chroma_client
     if _chroma_client is None:
-        os.makedirs(CHROMA_DIR, exist_ok=True)
-        _chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
+        # Concurrent first calls (eval workers, oracle threads) must share one client
+        with _chroma_lock:
+            if _chroma_client is None:
+                import chromadb
+
+                if CHROMA_HOST:
+                    host, _, port = CHROMA_HOST.partition(":")
+                    _chroma_client = chromadb.HttpClient(host=host, port=int(port or 8000))
+                else:
+                    os.makedirs(CHROMA_DIR, exist_ok=True)
+                    _chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
     return _chroma_client
 
 
-def _get_collection(case_id: int) -> chromadb.Collection:
+def _open_collection(case_id: int) -> "chromadb.Collection":
     return _get_client().get_or_create_collection(
         name=f"case_{case_id}",
         metadata={"hnsw:space": "cosine"},
     )
 
 
-def _extract_text(file_path: str) -> str:
-    reader = PdfReader(file_path)
-    return "\n".join(page.extract_text() or "" for page in reader.pages)
+def _get_collection(case_id: int) -> "chromadb.Collection":
+    """A case's collection; an archived case is restored first (a reopened case, a late query)."""
+    if os.path.exists(_archive_path(case_id)):
+        restore_case(case_id)
+    return _open_collection(case_id)
+
+
+_lexical: LexicalIndex | None = None
+
+
+def _lexical_index() -> LexicalIndex:
+    global _lexical
+    path = LEXICAL_INDEX_PATH or os.path.join(CHROMA_DIR, "lexical_index.sqlite")
+    if _lexical is None or _lexical.path != path:
+        with _chroma_lock:
+            if _lexical is None or _lexical.path != path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _lexical = LexicalIndex(path)
+    return _lexical
+
+
+def _get_all_cases_collection() -> "chromadb.Collection":
+    return _get_client().get_or_create_collection(
+        name=ALL_CASES_COLLECTION,
+        metadata={"hnsw:space": "cosine"},
+    )
+
+
+def _embedder() -> Callable[[list[str]], Sequence]:
+    return EMBEDDING_FUNCTION if EMBEDDING_FUNCTION is not None else get_embedding_provider()
+
+
+def _embed(texts: list[str]) -> list:
+    return list(_embedder()(texts))
+
+
+def _mirror_to_all_cases(case_id: int, collection: "chromadb.Collection", ingested_at: int | None = None) -> None:
+    """
+    Replace a case's rows in the shared collection with its current chunks and embeddings,
+    INGEST_BATCH_CHUNKS at a time. Rows are overwritten in place (chunk ids are stable) and
+    only the leftovers of a longer previous version are deleted, so the case never drops
+    out of cross-case search. ingested_at defaults to now (a restore passes the original
+    time, for since / until filters).
+    """
+    shared = _get_all_cases_collection()
+    now = int(time.time()) if ingested_at is None else ingested_at
+    count = collection.count()
+    for offset in range(0, count, INGEST_BATCH_CHUNKS):
+        page = collection.get(include=["documents", "embeddings", "metadatas"],
+                              limit=INGEST_BATCH_CHUNKS, offset=offset)
+        shared.upsert(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=[{**m, "case_id": case_id, "ingested_at": now} for m in page["metadatas"]],
+        )
+    shared.delete(where={"$and": [{"case_id": case_id}, {"chunk_index": {"$gte": count}}]})
+
+
+def iter_pages(file_path: str, stage: str = "ingest") -> Iterator[str]:
+    """
+    Text of a PDF's pages, extracted one at a time. The file is read as it goes (given a
+    path, pypdf loads it whole) and each page's parsed objects are dropped once its text
+    is out, so only the page index stays in memory. `stage` labels PAGES_EXTRACTED.
+    """
+    from pypdf import PdfReader
+
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            PAGES_EXTRACTED.inc(stage=stage)
+            yield page.extract_text() or ""
+            reader.resolved_objects.clear()
+
+
+def extract_text(file_path: str) -> str:
+    """Text of every page of a PDF, pages separated by PAGE_BREAK."""
+    return PAGE_BREAK.join(iter_pages(file_path))
 
 
 @traceable(name="ingest_document", run_type="tool")
-def ingest_document(file_path: str, case_id: int) -> int:
+def ingest_document(
+    file_path: str,
+    case_id: int,
+    text: str | None = None,
+    pages: Iterable[str] | None = None,
+    before_commit: Callable[[], None] | None = None,
+) -> int:
     """
     Chunk a PDF and store embeddings in ChromaDB.
     Returns the number of chunks stored.
-    Idempotent — clears any existing chunks for the same case_id first.
+    Idempotent — replaces any existing chunks for the same case_id.
+    Pages are read, chunked and stored as a stream; pass `text` when the caller has
+    already extracted it, or `pages` when it is already reading them (the guardrail scan).
+    before_commit runs once every chunk is staged: raising there keeps the previous
+    version of the case.
     """
-    print(f"📄 RAG: Extracting text from document...")
-    text = _extract_text(file_path)
-    if not text.strip():
-        raise ValueError(f"No extractable text in {file_path}")
+    started = time.perf_counter()
+    if text is not None:
+        chunks = CHUNKER.split(text)
+    else:
+        chunks = CHUNKER.split_pages(pages if pages is not None else iter_pages(file_path))
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-    chunks = splitter.split_text(text)
-    print(f"✂️  RAG: Split into {len(chunks)} chunks")
+    def check(stored: int) -> None:
+        if not stored:
+            raise ValueError(f"No extractable text in {file_path}")
+        if before_commit is not None:
+            before_commit()
 
-    collection = _get_collection(case_id)
-
-    # Clear stale data from a previous ingest of the same case
-    existing = collection.get()
-    if existing["ids"]:
-        collection.delete(ids=existing["ids"])
-
-    collection.add(
-        documents=chunks,
-        ids=[f"c{case_id}_chunk_{i}" for i in range(len(chunks))],
-        metadatas=[
-            {"case_id": case_id, "chunk_index": i, "source": os.path.basename(file_path)}
-            for i in range(len(chunks))
-        ],
-    )
-    print(f"💾 RAG: {len(chunks)} chunks stored in ChromaDB (case_{case_id})")
-    return len(chunks)
+    count = _store_chunks(case_id, chunks, {"source": os.path.basename(file_path)}, check)
+    log.info("RAG: %d chunks stored in ChromaDB (case_%s)", count, case_id,
+             extra={"chunks": count, "duration_ms": round(1000 * (time.perf_counter() - started), 2)})
+    return count
 
 
 @traceable(name="retrieve_chunks", run_type="retriever")
@@ -119,75 +288,579 @@ def retrieve_chunks(case_id: int, query: str, top_k: int = TOP_K) -> list[str]:
     if count == 0:
         return []
     results = collection.query(
-        query_texts=[query],
+        query_embeddings=_embed([query]),
         n_results=min(top_k, count),
     )
     return results["documents"][0]
 
 
+def _drop_collection(name: str) -> None:
+    try:
+        _get_client().delete_collection(name)
+    except Exception:       # not there: Chroma raises NotFoundError (ValueError before 1.0)
+        pass
+
+
+def _find_collection(name: str) -> "chromadb.Collection | None":
+    """A collection by name, or None; looked up directly rather than by listing the store."""
+    from chromadb.errors import NotFoundError
+
+    try:
+        return _get_client().get_collection(name)
+    except NotFoundError:
+        return None
+
+
+def _rename_collection(collection: "chromadb.Collection", name: str) -> None:
+    """
+    Rename a collection. A reader opening a case mid-swap creates it empty under the
+    target name; that empty collection is dropped and the rename retried.
+    """
+    for attempt in range(3):
+        try:
+            collection.modify(name=name)
+            return
+        except Exception:
+            taken = _find_collection(name)
+            if attempt == 2 or taken is None or taken.count():
+                raise
+            _drop_collection(name)
+
+
+def _store_chunks(case_id: int, chunks: Iterable[Chunk], extra_metadata: dict,
+                  before_commit: Callable[[int], None] | None = None) -> int:
+    """
+    Replace a case's stored chunks (and its shared-collection rows) with `chunks`,
+    embedding and adding INGEST_BATCH_CHUNKS at a time. Returns the chunks stored.
+
+    Chunks stream into a staging collection (and staging lexical postings). Once every
+    chunk is in and before_commit(stored) has not raised, the live collection is renamed
+    to case_N_previous, the staging one to case_N, and only then is the previous version
+    dropped; a failed rename puts the previous version back. Any failure drops the
+    staging copy and leaves the previous version of the case in place.
+
+    Memory: ingest itself holds one batch of chunks and embeddings and the chunker's open
+    block. Two terms still grow with the document: Chroma's in-memory HNSW indexes of the
+    case and all_cases (O(chunks), kept by the store, not by ingest) and pypdf's page index
+    (O(pages), a few KB per page). benchmarks/bench_ingest.py measures both.
+    """
+    live = _get_collection(case_id)
+    name, staging_name = live.name, f"{live.name}_staging"
+    lexical = _lexical_index()
+    _drop_collection(staging_name)      # left over from a crashed ingest
+    lexical.drop(staging_name)
+    staging = _get_client().create_collection(name=staging_name, metadata={"hnsw:space": "cosine"})
+
+    previous_name = f"{name}_previous"
+    _drop_collection(previous_name)
+
+    stored = 0
+    try:
+        numbered = enumerate(chunks)
+        while batch := list(islice(numbered, INGEST_BATCH_CHUNKS)):
+            documents = [chunk.text for _, chunk in batch]
+            metadatas = [{"case_id": case_id, "chunk_index": i, **chunk.metadata(), **extra_metadata}
+                         for i, chunk in batch]
+            staging.add(ids=[f"c{case_id}_chunk_{i}" for i, _ in batch], embeddings=_embed(documents),
+                        documents=documents, metadatas=metadatas)
+            lexical.add(staging_name, ((i, chunk.text) for i, chunk in batch))
+            CHUNKS_EMBEDDED.inc(len(batch))
+            stored += len(batch)
+        if before_commit is not None:
+            before_commit(stored)
+
+        _rename_collection(live, previous_name)
+        try:
+            _rename_collection(staging, name)
+        except BaseException:
+            _rename_collection(live, name)
+            raise
+        # One SQLite transaction: lexical readers see the old postings or the new ones
+        lexical.rename(staging_name, name)
+    except BaseException:
+        _drop_collection(staging_name)
+        lexical.drop(staging_name)
+        raise
+    _drop_collection(previous_name)
+    _mirror_to_all_cases(case_id, staging)
+    return stored
+
+
+def _ensure_lexical(collection: "chromadb.Collection") -> LexicalIndex:
+    """The lexical index, backfilled from the collection for a case stored before it existed."""
+    lexical = _lexical_index()
+    if lexical.count(collection.name) != collection.count():
+        lexical.drop(collection.name)
+        for offset in range(0, collection.count(), INGEST_BATCH_CHUNKS):
+            page = collection.get(include=["documents", "metadatas"], limit=INGEST_BATCH_CHUNKS, offset=offset)
+            lexical.add(collection.name, ((int(m["chunk_index"]), doc)
+                                          for doc, m in zip(page["documents"], page["metadatas"])))
+    return lexical
+
+
+@traceable(name="hybrid_retrieve", run_type="retriever")
+def hybrid_retrieve(case_id: int, queries: list[str], limit: int | None = None) -> list[tuple[int, str]]:
+    """
+    Dense (Chroma) + lexical (BM25) retrieval for several queries over one case.
+    Per query: both rankings are fused with RRF and reranked locally. The per-query
+    lists are then interleaved (best of each query first) and deduplicated, so every
+    query — parties, claims, dates, facts — gets context. Returns (chunk_index, text)
+    pairs, most relevant first, up to `limit`.
+    Reads only the candidates: HYBRID_CANDIDATES per query from each side, the lexical
+    ones from the postings written at ingest — never the whole case.
+    """
+    collection = _get_collection(case_id)
+    count = collection.count()
+    if count == 0:
+        return []
+    lexical = _ensure_lexical(collection)
+    k = min(HYBRID_CANDIDATES, count)
+    # One batched embedding + ANN call for all queries
+    dense = collection.query(query_embeddings=_embed(queries), n_results=k,
+                             include=["documents", "metadatas", "distances"])
+    docs: dict[int, str] = {}
+    dense_ranked: list[list[int]] = []
+    for texts, metas, dists in zip(dense["documents"], dense["metadatas"], dense["distances"]):
+        # Like BM25's zero scores, chunks with no similarity at all (cosine distance ≥ 1) are
+        # not candidates; equal distances (repeated boilerplate) tie-break on document order
+        hits = sorted((d, int(m["chunk_index"]), text) for d, m, text in zip(dists, metas, texts) if d < 1.0)
+        docs.update((i, text) for _, i, text in hits)
+        dense_ranked.append([i for _, i, _ in hits])
+    lexical_ranked = [lexical.top(collection.name, query, k) for query in queries]
+    missing = sorted({i for ranking in lexical_ranked for i in ranking} - docs.keys())
+    if missing:
+        fetched = collection.get(ids=[f"c{case_id}_chunk_{i}" for i in missing], include=["documents", "metadatas"])
+        docs.update((int(m["chunk_index"]), doc) for doc, m in zip(fetched["documents"], fetched["metadatas"]))
+
+    per_query: list[list[int]] = []
+    for query, dense_ids, lexical_ids in zip(queries, dense_ranked, lexical_ranked):
+        fused = reciprocal_rank_fusion([dense_ids, [i for i in lexical_ids if i in docs]])
+        candidates = sorted(fused, key=lambda i: (-fused[i], i))
+        order = rerank(query, [docs[i] for i in candidates], [fused[i] for i in candidates])
+        per_query.append([candidates[j] for j in order])
+
+    selected: list[int] = []
+    for rank in range(max(len(r) for r in per_query)):
+        for ranking in per_query:
+            if rank < len(ranking) and ranking[rank] not in selected:
+                selected.append(ranking[rank])
+    return [(i, docs[i]) for i in selected[:limit]]
+
+
+def _passage_sources(case_id: int, passages: list[Passage]) -> list[dict]:
+    """Page range and section of each numbered passage, from its chunks' metadata."""
+    wanted = {i for p in passages for i in (p.first, p.last)}
+    stored = _get_collection(case_id).get(ids=[f"c{case_id}_chunk_{i}" for i in sorted(wanted)], include=["metadatas"])
+    meta = {int(m.get("chunk_index", -1)): m for m in stored["metadatas"] if m}
+    sources = []
+    for ref, passage in enumerate(passages, start=1):
+        first, last = meta.get(passage.first, {}), meta.get(passage.last, {})
+        if "page" not in first:
+            continue   # ingested before chunks carried provenance
+        sources.append({"ref": ref, "page": first["page"], "page_end": last.get("page_end", first["page"]),
+                        "section": first.get("section", "")})
+    return sources
+
+
+def format_sources(sources: list[dict]) -> str:
+    """One-line citation key appended to a brief: "[1] p. 2 (FACTS OF THE CASE) · [2] pp. 3–4"."""
+    parts = []
+    for src in sources:
+        pages = f"p. {src['page']}" if src["page"] == src["page_end"] else f"pp. {src['page']}–{src['page_end']}"
+        section = f" ({src['section']})" if src["section"] else ""
+        parts.append(f"[{src['ref']}] {pages}{section}")
+    return "**Sources:** " + " · ".join(parts)
+
+
+def build_brief_context(case_id: int, budget_tokens: int | None = None) -> tuple[str, list[dict]]:
+    """
+    Multi-query hybrid retrieval → assembled brief prompt plus the page/section of
+    each numbered passage. Runs 4 targeted queries and fills a token budget with the
+    most relevant chunks, merging neighbours into single numbered passages.
+    """
+    started = time.perf_counter()
+    budget = CONTEXT_TOKEN_BUDGET if budget_tokens is None else budget_tokens
+    passages = assemble_context(hybrid_retrieve(case_id, _RETRIEVAL_QUERIES), budget)
+
+    numbered = "\n\n".join(f"[{i+1}] {passage.text}" for i, passage in enumerate(passages))
+    log.info("RAG: %d passages assembled across %d queries", len(passages), len(_RETRIEVAL_QUERIES),
+             extra={"chunks": len(passages), "context_tokens": count_tokens(numbered),
+                    "duration_ms": round(1000 * (time.perf_counter() - started), 2)})
+    return BRIEF_PROMPT_TEMPLATE.format(context=numbered), _passage_sources(case_id, passages) if passages else []
+
+
+def build_brief_prompt(case_id: int, budget_tokens: int | None = None) -> str:
+    return build_brief_context(case_id, budget_tokens)[0]
+
+
+def complete_brief(prompt: str, ai_client: "anthropic.Anthropic") -> str:
+    """
+    Send an assembled brief prompt to Claude. One call: a rate limit or server error is
+    raised as TransientError, and the analysis node's jittered RetryPolicy (then re-drive)
+    is the only retry layer.
+    """
+    started = time.perf_counter()
+    try:
+        response = ai_client.messages.create(
+            model=BRIEF_MODEL,
+            max_tokens=BRIEF_MAX_TOKENS,
+            messages=[{"role": "user", "content": prompt}],
+        )
+    except Exception as exc:
+        log.error("Claude error: %s", exc)
+        err = classify(exc, "Claude call failed")
+        if isinstance(err, TransientError):
+            raise err from exc
+        raise
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.inc(usage.input_tokens, direction="input")
+        LLM_TOKENS.inc(usage.output_tokens, direction="output")
+    log.info("RAG: brief generated with %s", BRIEF_MODEL, extra={
+        "duration_ms": round(1000 * (time.perf_counter() - started), 2),
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+    })
+    return response.content[0].text
+
+
 @traceable(name="generate_brief", run_type="chain")
-def generate_brief(case_id: int, ai_client: anthropic.Anthropic) -> str:
+def generate_brief(case_id: int, ai_client: "anthropic.Anthropic") -> str:
     """
     Multi-query retrieval → Claude brief generation.
-    Runs 4 targeted queries, deduplicates chunks, sends assembled context to Claude.
+    Runs 4 targeted queries, assembles a token-budgeted context, sends it to Claude,
+    and appends the page/section of every cited excerpt.
     """
-    print(f"🔍 RAG: Retrieving relevant chunks across {len(_RETRIEVAL_QUERIES)} queries...")
+    prompt, sources = build_brief_context(case_id)
+    brief = complete_brief(prompt, ai_client)
+    return f"{brief}\n\n{format_sources(sources)}" if sources else brief
 
-    seen: set[str] = set()
-    context_chunks: list[str] = []
-    for query in _RETRIEVAL_QUERIES:
-        for chunk in retrieve_chunks(case_id, query, top_k=3):
-            if chunk not in seen and len(context_chunks) < MAX_CONTEXT_CHUNKS:
-                seen.add(chunk)
-                context_chunks.append(chunk)
 
-    print(f"📚 RAG: {len(context_chunks)} unique chunks assembled for context")
+def build_direct_context(text: str) -> tuple[str, list[dict]]:
+    """
+    Brief prompt over a short filing's full text, without retrieval: every chunk in
+    document order becomes a numbered passage, so citations and the page/section key
+    work as they do for retrieved context.
+    """
+    chunks = CHUNKER.split(text)
+    numbered = "\n\n".join(f"[{i+1}] {chunk.text}" for i, chunk in enumerate(chunks))
+    sources = [{"ref": i + 1, "page": c.page, "page_end": c.page_end, "section": c.section}
+               for i, c in enumerate(chunks)]
+    return BRIEF_PROMPT_TEMPLATE.format(context=numbered), sources
 
-    numbered = "\n\n".join(f"[{i+1}] {chunk}" for i, chunk in enumerate(context_chunks))
-    prompt = BRIEF_PROMPT_TEMPLATE.format(context=numbered)
 
-    print(f"🤖 RAG: Generating brief with Claude...")
-    attempts, max_attempts = 0, 5
-    while attempts < max_attempts:
-        try:
-            response = ai_client.messages.create(
-                model="claude-sonnet-4-6",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            return response.content[0].text
-        except anthropic.RateLimitError:
-            attempts += 1
-            wait = (2 ** attempts) + random.random()
-            print(f"⏳ Rate limit. Retry {attempts}/{max_attempts} in {wait:.1f}s...")
-            time.sleep(wait)
-        except Exception as exc:
-            print(f"❌ Claude error: {exc}")
-            raise
+@traceable(name="generate_direct_brief", run_type="chain")
+def generate_direct_brief(text: str, ai_client: "anthropic.Anthropic") -> tuple[str, int]:
+    """
+    Claude brief over a short filing's full text (no embeddings, no vector queries).
+    Returns the brief and the number of passages it was given.
+    """
+    prompt, sources = build_direct_context(text)
+    log.info("RAG: direct brief over the full text", extra={"chunks": len(sources), "context_tokens": count_tokens(prompt)})
+    brief = complete_brief(prompt, ai_client)
+    return (f"{brief}\n\n{format_sources(sources)}" if sources else brief), len(sources)
+
 
-    return "❌ Error: Maximum retry attempts reached."
+def _source_fingerprint(text: str) -> str:
+    """Identifies the chunks a text produces — changes with the text, the chunking config or the embeddings."""
+    embedder = _embedder()
+    embeddings = getattr(embedder, "signature", type(embedder).__name__)
+    return hashlib.sha256(f"{CHUNKER.signature}:{embeddings}\n{text}".encode()).hexdigest()
 
 
-def ingest_text(text: str, case_id: int) -> int:
+def ingest_text(text: str, case_id: int, skip_if_unchanged: bool = False) -> int:
     """
     Chunk raw text and store in ChromaDB.
     Used by the eval runner so tests don't need real PDFs.
+    skip_if_unchanged reuses the stored chunks when the same text was already ingested
+    with the same chunking config.
     """
     if not text.strip():
         raise ValueError("Empty text provided to ingest_text")
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-    chunks = splitter.split_text(text)
-    collection = _get_collection(case_id)
-    existing = collection.get()
-    if existing["ids"]:
-        collection.delete(ids=existing["ids"])
-    collection.add(
-        documents=chunks,
-        ids=[f"c{case_id}_chunk_{i}" for i in range(len(chunks))],
-        metadatas=[{"case_id": case_id, "chunk_index": i} for i in range(len(chunks))],
+    fingerprint = _source_fingerprint(text)
+    if skip_if_unchanged:
+        collection = _get_collection(case_id)
+        stored = collection.get(limit=1, include=["metadatas"])
+        if stored["metadatas"] and stored["metadatas"][0].get("source_sha256") == fingerprint:
+            return collection.count()
+    return _store_chunks(case_id, CHUNKER.split(text), {"source_sha256": fingerprint})
+
+
+# ---------------------------------------------------------------------------
+# Cross-case search
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CaseHit:
+    case_id: int
+    chunk_index: int
+    text: str
+    score: float        # cosine similarity (1 − distance)
+    ingested_at: int
+
+
+@dataclass
+class CrossCaseResults:
+    hits: list[CaseHit] = field(default_factory=list)
+    page: int = 0
+    page_size: int = CROSS_CASE_PAGE_SIZE
+    has_more: bool = False
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+
+    def case_ids(self) -> list[int]:
+        """Distinct cases in rank order (best chunk first)."""
+        return list(dict.fromkeys(h.case_id for h in self.hits))
+
+
+_search_pool: ThreadPoolExecutor | None = None
+# Queries in flight, timed-out ones included (they run on): a search never queues behind them
+_SEARCH_WORKERS = 4
+_search_slots = threading.BoundedSemaphore(_SEARCH_WORKERS)
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    return int(value)
+
+
+def _where(case_ids, since, until) -> dict | None:
+    clauses = []
+    if case_ids:
+        clauses.append({"case_id": {"$in": [int(c) for c in case_ids]}})
+    if since is not None:
+        clauses.append({"ingested_at": {"$gte": _epoch(since)}})
+    if until is not None:
+        clauses.append({"ingested_at": {"$lte": _epoch(until)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+@traceable(name="search_all_cases", run_type="retriever")
+def search_all_cases(
+    query: str,
+    page: int = 0,
+    page_size: int = CROSS_CASE_PAGE_SIZE,
+    case_ids: list[int] | None = None,
+    since=None,
+    until=None,
+    budget_ms: float | None = None,
+) -> CrossCaseResults:
+    """
+    One semantic query over every ingested case.
+    Filters: case_ids (restrict to a case set), since / until (ingest time — epoch
+    seconds, ISO-8601 string or datetime). Results are paginated; a query that
+    exceeds budget_ms (default CROSS_CASE_BUDGET_MS, 0 = no limit) returns
+    timed_out=True with no hits. Abandoned queries keep their worker until Chroma returns;
+    with every worker taken a budgeted search returns timed_out at once rather than
+    queueing behind them.
+    """
+    global _search_pool
+    started = time.perf_counter()
+    collection = _get_all_cases_collection()
+    total = collection.count()
+    if total == 0 or page_size <= 0:
+        return CrossCaseResults(page=page, page_size=page_size)
+
+    # Fetch one extra row past this page to know whether another page exists
+    n_results = min((page + 1) * page_size + 1, total)
+    where = _where(case_ids, since, until)
+
+    def run():
+        try:
+            return collection.query(
+                query_embeddings=_embed([query]),
+                n_results=n_results,
+                where=where,
+                include=["documents", "metadatas", "distances"],
+            )
+        finally:
+            _search_slots.release()
+
+    if _search_pool is None:
+        with _chroma_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix="cross-case")
+    budget = CROSS_CASE_BUDGET_MS if budget_ms is None else budget_ms
+    if not _search_slots.acquire(blocking=not budget):
+        elapsed = round(1000 * (time.perf_counter() - started), 2)
+        log.warning("Cross-case search: every worker still busy with earlier queries", extra={"duration_ms": elapsed})
+        return CrossCaseResults(page=page, page_size=page_size, elapsed_ms=elapsed, timed_out=True)
+    try:
+        future = _search_pool.submit(run)
+    except BaseException:
+        _search_slots.release()
+        raise
+    try:
+        raw = future.result(timeout=budget / 1000 if budget else None)
+    except FutureTimeout:
+        elapsed = round(1000 * (time.perf_counter() - started), 2)
+        log.warning("Cross-case search exceeded %.0f ms budget", budget, extra={"duration_ms": elapsed})
+        return CrossCaseResults(page=page, page_size=page_size, elapsed_ms=elapsed, timed_out=True)
+
+    rows = list(zip(raw["documents"][0], raw["metadatas"][0], raw["distances"][0]))
+    start = page * page_size
+    hits = [
+        CaseHit(
+            case_id=int(meta["case_id"]),
+            chunk_index=int(meta.get("chunk_index", 0)),
+            text=doc,
+            score=round(1.0 - dist, 4),
+            ingested_at=int(meta.get("ingested_at", 0)),
+        )
+        for doc, meta, dist in rows[start:start + page_size]
+    ]
+    elapsed = round(1000 * (time.perf_counter() - started), 2)
+    log.debug("Cross-case search: %d hits (page %d)", len(hits), page, extra={"duration_ms": elapsed})
+    return CrossCaseResults(
+        hits=hits, page=page, page_size=page_size,
+        has_more=len(rows) > start + page_size, elapsed_ms=elapsed,
     )
-    return len(chunks)
+
+
+def live_case_ids() -> list[int]:
+    """Cases with a collection in the live store."""
+    case_ids = []
+    for col in _get_client().list_collections():
+        name = col if isinstance(col, str) else col.name
+        if name.startswith("case_") and name.removeprefix("case_").isdigit():
+            case_ids.append(int(name.removeprefix("case_")))
+    return sorted(case_ids)
+
+
+def reindex_all_cases() -> int:
+    """Backfill the shared collection from every per-case collection. Returns cases mirrored."""
+    case_ids = live_case_ids()
+    for case_id in case_ids:
+        _mirror_to_all_cases(case_id, _open_collection(case_id))
+    return len(case_ids)
+
+
+# ---------------------------------------------------------------------------
+# Vector store lifecycle: archive, restore, compact
+# ---------------------------------------------------------------------------
+
+_archive_lock = threading.Lock()
+
+
+def _archive_path(case_id: int) -> str:
+    return os.path.join(VECTOR_ARCHIVE_DIR, f"case_{case_id}.jvva")
+
+
+def archived_case_ids() -> list[int]:
+    if not os.path.isdir(VECTOR_ARCHIVE_DIR):
+        return []
+    return sorted(int(name[5:-5]) for name in os.listdir(VECTOR_ARCHIVE_DIR)
+                  if name.startswith("case_") and name.endswith(".jvva") and name[5:-5].isdigit())
+
+
+def archive_case(case_id: int) -> int:
+    """
+    Move a case's collection out of the live store into an archive file. Its all_cases
+    rows are kept: cross-case search covers archived cases without restoring them.
+    Returns the archive size in bytes; 0 if the case had no live vectors. The next
+    _get_collection(case_id) restores it. Callers hold the case lease.
+    """
+    with _archive_lock:
+        collection = _find_collection(f"case_{case_id}")
+        if collection is None:
+            return 0
+        client = _get_client()
+        stored = collection.get(include=["documents", "embeddings", "metadatas"])
+        shared = _get_all_cases_collection()
+        size = 0
+        if stored["ids"]:
+            first = shared.get(where={"case_id": case_id}, limit=1, include=["metadatas"])["metadatas"]
+            record = CaseVectors(
+                case_id=case_id, ids=list(stored["ids"]), documents=list(stored["documents"]),
+                metadatas=[dict(m or {}) for m in stored["metadatas"]],
+                embeddings=np.asarray(stored["embeddings"], dtype=np.float32),
+                ingested_at=int(first[0]["ingested_at"]) if first and "ingested_at" in first[0] else None,
+            )
+            os.makedirs(VECTOR_ARCHIVE_DIR, exist_ok=True)
+            size = write_archive(_archive_path(case_id), record, VECTOR_ARCHIVE_DTYPE)
+        # Only once the archive is on disk
+        client.delete_collection(f"case_{case_id}")
+        _lexical_index().drop(f"case_{case_id}")    # rebuilt from the restored collection on demand
+    VECTOR_ARCHIVE_OPS.inc(op="archive")
+    log.info("Archived case #%s vectors (%d chunks, %d bytes)", case_id, len(stored["ids"]), size,
+             extra={"case_id": case_id, "chunks": len(stored["ids"]), "bytes": size})
+    return size
+
+
+def drop_case(case_id: int) -> None:
+    """Remove a case from the vector store: its collection (live or archived), all_cases rows and lexical postings."""
+    with _archive_lock:
+        _drop_collection(f"case_{case_id}")
+        _get_all_cases_collection().delete(where={"case_id": case_id})
+        _lexical_index().drop(f"case_{case_id}")
+        if os.path.exists(_archive_path(case_id)):
+            os.unlink(_archive_path(case_id))
+
+
+def restore_case(case_id: int) -> int:
+    """Load an archived case back into the live store. Returns chunks restored (0: no archive)."""
+    started = time.perf_counter()
+    with _archive_lock:
+        path = _archive_path(case_id)
+        if not os.path.exists(path):
+            return 0        # restored by a concurrent caller
+        record = read_archive(path)
+        collection = _open_collection(case_id)
+        if record.ids:
+            collection.upsert(ids=record.ids, embeddings=record.embeddings, documents=record.documents,
+                              metadatas=record.metadatas)
+        # Archives written before the shared rows were kept on archive
+        if not _get_all_cases_collection().get(where={"case_id": case_id}, limit=1, include=[])["ids"]:
+            _mirror_to_all_cases(case_id, collection, record.ingested_at)
+        os.unlink(path)
+    VECTOR_ARCHIVE_OPS.inc(op="restore")
+    log.info("Restored case #%s vectors from archive", case_id, extra={
+        "case_id": case_id, "chunks": len(record.ids),
+        "duration_ms": round(1000 * (time.perf_counter() - started), 2)})
+    return len(record.ids)
+
+
+def store_bytes() -> int:
+    """Size of the embedded Chroma store on disk."""
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(CHROMA_DIR) for f in files)
+
+
+def compact_store() -> int:
+    """
+    Reclaim the space of deleted collections in the embedded store. Chroma leaves their
+    HNSW segment directories behind, keeps deleted documents in its full-text index until
+    it is merged, and never shrinks chroma.sqlite3. This removes every segment directory
+    no live segment refers to, optimizes the full-text index, then VACUUMs. Returns bytes
+    reclaimed.
+
+    It depends on Chroma's private on-disk schema, so it refuses (RuntimeError) on any
+    chromadb other than COMPACT_CHROMA_VERSION — the release requirements.txt pins and
+    tests/test_vector_archive.py covers. Opt-in only (archive_vectors.py --compact), and
+    only while no other process has CHROMA_DIR open.
+    """
+    import chromadb
+
+    if not chromadb.__version__.startswith(COMPACT_CHROMA_VERSION):
+        raise RuntimeError(f"compact_store supports chromadb {COMPACT_CHROMA_VERSION}x, "
+                           f"not {chromadb.__version__}: its on-disk layout may differ")
+    db = os.path.join(CHROMA_DIR, "chroma.sqlite3")
+    if CHROMA_HOST or not os.path.exists(db):
+        return 0
+    before = store_bytes()
+    conn = sqlite3.connect(db, timeout=30, isolation_level=None)
+    try:
+        live = {row[0] for row in conn.execute("SELECT id FROM segments")}
+        for name in os.listdir(CHROMA_DIR):
+            path = os.path.join(CHROMA_DIR, name)
+            if os.path.isdir(path) and len(name) == 36 and name.count("-") == 4 and name not in live:
+                shutil.rmtree(path)
+        conn.execute("INSERT INTO embedding_fulltext_search (embedding_fulltext_search) VALUES ('optimize')")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return before - store_bytes()
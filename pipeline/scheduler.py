@@ -0,0 +1,147 @@
+"""
+Scheduling of pending oracle events in front of the pipeline graph.
+
+The oracle used to handle events strictly in block order, so one 2,000-page bundle
+held up every two-page motion filed after it. CaseScheduler orders the queue by
+estimated cost instead:
+
+    cost        estimated pages of the filing (document size from the blockstore or
+                gateway Content-Length ÷ SCHED_BYTES_PER_PAGE); resuming a validated
+                case costs 0, an unknown size costs SCHED_DEFAULT_PAGES
+    priority    "urgent" (case IDs in SCHED_URGENT_CASES, or set_priority) goes ahead of
+                SCHED_URGENT_BOOST_PAGES worth of normal work
+    aging       every SCHED_AGING_S seconds a job waits counts as one page less, so a
+                large filing gains on a steady stream of small ones
+    deadline    a job that has waited SCHED_MAX_WAIT_S is overdue: overdue jobs run
+                before all others, oldest first. Aging alone let a bundle wait about
+                cost × SCHED_AGING_S — twice its FIFO wait in bench_scheduler.py (813 s
+                vs 398 s) — while the deadline keeps the longest wait at FIFO's.
+
+    score = cost − (urgent ? SCHED_URGENT_BOOST_PAGES : 0) − waited_s / SCHED_AGING_S
+
+The lowest score runs next (ties: arrival order), overdue jobs first. Events of one case stay in arrival
+order: only the oldest queued event of a case is eligible. SCHED_POLICY=fifo restores
+block order.
+
+Settings (env):
+    SCHED_POLICY               sjf | fifo (default sjf)
+    SCHED_AGING_S              seconds of waiting worth one page (default 0.5)
+    SCHED_MAX_WAIT_S           wait after which a job is overdue (default 60; 0 = off)
+    SCHED_BYTES_PER_PAGE       size → page estimate (default 50000)
+    SCHED_DEFAULT_PAGES        cost when the size is unknown (default 20)
+    SCHED_URGENT_CASES         comma-separated case IDs scheduled as urgent
+    SCHED_URGENT_BOOST_PAGES   head start of urgent jobs, in pages (default 10000)
+"""
+import itertools
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+SCHED_POLICY = os.getenv("SCHED_POLICY", "sjf")
+SCHED_AGING_S = float(os.getenv("SCHED_AGING_S", "0.5"))
+SCHED_MAX_WAIT_S = float(os.getenv("SCHED_MAX_WAIT_S", "60"))
+SCHED_BYTES_PER_PAGE = int(os.getenv("SCHED_BYTES_PER_PAGE", "50000"))
+SCHED_DEFAULT_PAGES = float(os.getenv("SCHED_DEFAULT_PAGES", "20"))
+SCHED_URGENT_CASES = frozenset(int(c) for c in os.getenv("SCHED_URGENT_CASES", "").split(",") if c.strip())
+SCHED_URGENT_BOOST_PAGES = float(os.getenv("SCHED_URGENT_BOOST_PAGES", "10000"))
+
+PRIORITIES = ("urgent", "normal")
+
+
+def estimate_pages(size_bytes: int | None) -> float:
+    """Page estimate for a filing of size_bytes (SCHED_DEFAULT_PAGES when unknown)."""
+    if size_bytes is None:
+        return SCHED_DEFAULT_PAGES
+    return max(1.0, math.ceil(size_bytes / SCHED_BYTES_PER_PAGE))
+
+
+@dataclass
+class Job:
+    seq: int
+    case_id: int
+    cost: float         # estimated pages
+    priority: str
+    enqueued_at: float
+    item: Any           # what the caller dispatches (the oracle's (kind, event) pair)
+
+
+class CaseScheduler:
+    """Shortest-job-first queue with aging, a wait deadline, priority classes and per-case FIFO."""
+
+    def __init__(
+        self,
+        policy: str = SCHED_POLICY,
+        aging_s: float = SCHED_AGING_S,
+        max_wait_s: float = SCHED_MAX_WAIT_S,
+        urgent_cases=SCHED_URGENT_CASES,
+        urgent_boost: float = SCHED_URGENT_BOOST_PAGES,
+    ):
+        if policy not in ("sjf", "fifo"):
+            raise ValueError(f"Unknown scheduling policy '{policy}' (expected sjf or fifo)")
+        self.policy = policy
+        self.aging_s = aging_s
+        self.max_wait_s = max_wait_s
+        self.urgent_boost = urgent_boost
+        self._urgent = set(urgent_cases)
+        self._jobs: list[Job] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def items(self) -> list:
+        """Queued items, in arrival order."""
+        with self._lock:
+            return [j.item for j in sorted(self._jobs, key=lambda j: j.seq)]
+
+    def set_priority(self, case_id: int, priority: str) -> None:
+        """Flag (or unflag) a case as urgent; applies to queued and future jobs."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+        with self._lock:
+            (self._urgent.add if priority == "urgent" else self._urgent.discard)(case_id)
+            for job in self._jobs:
+                if job.case_id == case_id:
+                    job.priority = priority
+
+    def add(self, case_id: int, item: Any, cost: float, now: float | None = None) -> Job:
+        with self._lock:
+            job = Job(next(self._seq), case_id, cost, "urgent" if case_id in self._urgent else "normal",
+                      time.monotonic() if now is None else now, item)
+            self._jobs.append(job)
+            return job
+
+    def requeue(self, job: Job) -> None:
+        """Put back a job that could not run yet; it keeps its place in line and its age."""
+        with self._lock:
+            self._jobs.append(job)
+
+    def score(self, job: Job, now: float) -> float:
+        if self.policy == "fifo":
+            return job.seq
+        if self.max_wait_s and now - job.enqueued_at >= self.max_wait_s:
+            return -math.inf        # overdue: ties fall back to arrival order
+        boost = self.urgent_boost if job.priority == "urgent" else 0.0
+        return job.cost - boost - (now - job.enqueued_at) / self.aging_s
+
+    def pop(self, now: float | None = None, skip_cases=()) -> Job | None:
+        """
+        Remove and return the job to run next, or None. Only each case's oldest job is
+        eligible; cases in skip_cases (e.g. leased by another oracle) are passed over.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            heads: dict[int, Job] = {}
+            for job in self._jobs:
+                if job.case_id not in heads or job.seq < heads[job.case_id].seq:
+                    heads[job.case_id] = job
+            eligible = [j for c, j in heads.items() if c not in skip_cases]
+            if not eligible:
+                return None
+            best = min(eligible, key=lambda j: (self.score(j, now), j.seq))
+            self._jobs.remove(best)
+            return best
@@ -0,0 +1,267 @@
+"""
+Managed spool for downloaded case documents (temp_legal_files/).
+
+RECEIVE used to write every download to case_<id>_<cid[:6]>.pdf and never delete it,
+so the directory grew without bound and two CIDs sharing a prefix could overwrite
+each other. DocumentSpool replaces that:
+
+    content-addressed  — files are named <sha256 of the bytes>.pdf, so the same document
+                         filed twice is stored once and different documents never collide
+    pinned in flight   — a case pins its document from RECEIVE until EMBEDDING is done
+                         (or the case is rejected); pinned files are never evicted
+    byte quota         — once a case releases its document it stays as a cache entry for
+                         re-drives, and the least recently used unpinned files are deleted
+                         whenever the spool exceeds its quota
+    hot tier           — optionally, in-flight documents are written to a tmpfs directory
+                         (SPOOL_HOT_DIR, e.g. /dev/shm/justicevault) while it has room, and
+                         moved to the disk spool when released
+
+Only files named <64 hex>.pdf are managed; anything else in the directory is left alone.
+Pins live in memory: after a restart every spooled file starts unpinned, and a resumed
+case whose document was evicted fetches it again (see graph._local_document).
+
+One process per spool directory: a spool holds an exclusive lock on <root>/.lock (and
+on its hot directory) for its lifetime, so the start-up scan that drops *.part files
+and the quota eviction only ever touch this process's own files. Oracle instances on
+one host share temp_legal_files/ through open_slot(), which claims the first free
+slot-<n>/ subdirectory (and the matching one under SPOOL_HOT_DIR); a restarted instance
+reuses a slot freed by an exited one, cache included. Quotas apply per slot.
+
+Settings (env):
+    SPOOL_QUOTA_MB      disk spool quota (default 2048)
+    SPOOL_HOT_DIR       tmpfs directory for in-flight documents ("" = off)
+    SPOOL_HOT_MB        hot tier quota (default 256)
+"""
+import fcntl
+import hashlib
+import itertools
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from pipeline.metrics import SPOOL_BYTES, SPOOL_EVICTIONS
+
+log = logging.getLogger(__name__)
+
+SPOOL_QUOTA_MB = float(os.getenv("SPOOL_QUOTA_MB", "2048"))
+SPOOL_HOT_DIR = os.getenv("SPOOL_HOT_DIR", "")
+SPOOL_HOT_MB = float(os.getenv("SPOOL_HOT_MB", "256"))
+
+_NAME = re.compile(r"^([0-9a-f]{64})\.pdf$")
+
+
+class SpoolInUse(RuntimeError):
+    """The spool directory is held by another live DocumentSpool (this or another process)."""
+
+
+def _claim(directory: str):
+    """Exclusive lock on directory/.lock, released when the process exits. Raises SpoolInUse."""
+    handle = open(os.path.join(directory, ".lock"), "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        raise SpoolInUse(f"Document spool {directory} is in use by another process") from None
+    return handle
+
+
+@dataclass
+class _Entry:
+    size: int
+    hot: bool
+    last_used: float
+    owners: set = field(default_factory=set)
+    ready: threading.Event = field(default_factory=threading.Event)   # set once the file is on disk
+
+
+class DocumentSpool:
+    """Thread-safe, content-addressed document store with pinning and LRU eviction."""
+
+    def __init__(
+        self,
+        root: str,
+        quota_bytes: int = int(SPOOL_QUOTA_MB * 1024 * 1024),
+        hot_dir: str = SPOOL_HOT_DIR,
+        hot_quota_bytes: int = int(SPOOL_HOT_MB * 1024 * 1024),
+    ):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.hot_dir = hot_dir or None
+        self.hot_quota_bytes = hot_quota_bytes if hot_dir else 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._over_quota = False
+        os.makedirs(root, exist_ok=True)
+        self._claims = [_claim(root)]
+        if self.hot_dir:
+            os.makedirs(self.hot_dir, exist_ok=True)
+            try:
+                self._claims.append(_claim(self.hot_dir))
+            except SpoolInUse:
+                self.close()
+                raise
+        self._scan()
+
+    @classmethod
+    def open_slot(cls, base: str, hot_base: str = SPOOL_HOT_DIR, **kwargs) -> "DocumentSpool":
+        """The spool in the first slot-<n>/ under base that no live process holds."""
+        for n in itertools.count():
+            hot_dir = os.path.join(hot_base, f"slot-{n}") if hot_base else ""
+            try:
+                return cls(os.path.join(base, f"slot-{n}"), hot_dir=hot_dir, **kwargs)
+            except SpoolInUse:
+                continue
+
+    def close(self) -> None:
+        """Give up the directory (another spool may claim it). Files are left in place."""
+        for handle in self._claims:
+            handle.close()
+        self._claims = []
+
+    # -- paths -----------------------------------------------------------------
+
+    def _path(self, digest: str, hot: bool) -> str:
+        return os.path.join(self.hot_dir if hot else self.root, f"{digest}.pdf")
+
+    @staticmethod
+    def digest_of(path: str) -> str | None:
+        match = _NAME.match(os.path.basename(path or ""))
+        return match.group(1) if match else None
+
+    # -- startup ---------------------------------------------------------------
+
+    def _scan(self) -> None:
+        """Index files left by this directory's previous holder; drop its partial writes; demote hot files."""
+        for directory, hot in ((self.root, False), (self.hot_dir, True)):
+            if not directory:
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if name.endswith(".part"):
+                    os.unlink(path)
+                    continue
+                match = _NAME.match(name)
+                if not match:
+                    continue
+                digest = match.group(1)
+                if hot:     # nothing is in flight at startup
+                    if digest in self._entries:
+                        os.unlink(path)
+                        continue
+                    shutil.move(path, self._path(digest, False))
+                    path = self._path(digest, False)
+                st = os.stat(path)
+                self._entries[digest] = entry = _Entry(st.st_size, False, st.st_mtime)
+                entry.ready.set()
+        with self._lock:
+            self._evict_locked()
+
+    # -- pin / release ---------------------------------------------------------
+
+    def put(self, content: bytes, owner) -> str:
+        """Store content (once per distinct content) pinned by owner; returns its path."""
+        digest = hashlib.sha256(content).hexdigest()
+        writer = False
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry:
+                entry.owners.add(owner)
+                entry.last_used = time.time()
+            else:
+                hot = bool(self.hot_dir) and self._bytes(hot=True) + len(content) <= self.hot_quota_bytes
+                # Reserved before writing: a concurrent put of the same bytes waits for this write
+                self._entries[digest] = entry = _Entry(len(content), hot, time.time(), {owner})
+                writer = True
+        if not writer:
+            entry.ready.wait()
+            with self._lock:
+                if self._entries.get(digest) is entry:
+                    return self._path(digest, entry.hot)
+            return self.put(content, owner)     # the other writer failed
+
+        path = self._path(digest, hot)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            with self._lock:
+                self._entries.pop(digest, None)
+            entry.ready.set()
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        entry.ready.set()
+        with self._lock:
+            self._evict_locked()
+        return path
+
+    def acquire(self, path: str, owner) -> str | None:
+        """Pin an already spooled document (e.g. when a case resumes). None if it is gone."""
+        digest = self.digest_of(path)
+        with self._lock:
+            entry = self._entries.get(digest) if digest else None
+            if entry is None or not entry.ready.is_set() or not os.path.exists(self._path(digest, entry.hot)):
+                return None
+            entry.owners.add(owner)
+            entry.last_used = time.time()
+            return self._path(digest, entry.hot)
+
+    def release(self, owner) -> None:
+        """Unpin everything owner holds. Released hot files move to disk; the quota is enforced."""
+        with self._lock:
+            demote = []
+            for digest, entry in self._entries.items():
+                if owner in entry.owners:
+                    entry.owners.discard(owner)
+                    entry.last_used = time.time()
+                    if entry.hot and not entry.owners:
+                        demote.append(digest)
+            for digest in demote:
+                shutil.move(self._path(digest, True), self._path(digest, False))
+                self._entries[digest].hot = False
+            self._evict_locked()
+
+    # -- quota -----------------------------------------------------------------
+
+    def _bytes(self, hot: bool) -> int:
+        return sum(e.size for e in self._entries.values() if e.hot == hot)
+
+    def _evict_locked(self) -> None:
+        disk = self._bytes(hot=False)
+        if disk > self.quota_bytes:
+            for digest, entry in sorted(self._entries.items(), key=lambda kv: kv[1].last_used):
+                if disk <= self.quota_bytes:
+                    break
+                if entry.owners or entry.hot:
+                    continue
+                try:
+                    os.unlink(self._path(digest, False))
+                except FileNotFoundError:
+                    pass
+                del self._entries[digest]
+                disk -= entry.size
+                SPOOL_EVICTIONS.inc()
+        over = disk > self.quota_bytes
+        if over and not self._over_quota:
+            log.warning("Document spool over quota with in-flight files only (%d > %d bytes)",
+                        disk, self.quota_bytes)
+        self._over_quota = over
+        SPOOL_BYTES.set(disk, tier="disk")
+        if self.hot_dir:
+            SPOOL_BYTES.set(self._bytes(hot=True), tier="hot")
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "disk_bytes": self._bytes(hot=False),
+                "hot_bytes": self._bytes(hot=True),
+                "pinned": sum(1 for e in self._entries.values() if e.owners),
+            }
@@ -0,0 +1,79 @@
+"""
+Compact on-disk archive of one case's vectors (see rag.archive_case / rag.restore_case).
+
+A finished case's Chroma collection costs far more than its vectors: float32 rows in
+chroma.sqlite3, an HNSW segment directory and full-text index entries. An archive
+keeps only what a restore needs, in one file per case:
+
+    magic     b"JVVA1\\n"
+    header    4-byte big-endian length + zlib-compressed JSON: case_id, ids, documents,
+              metadatas, dtype, dim, ingested_at (of the shared cross-case rows)
+    vectors   count × VectorCodec(dtype).bytes_per_vector(dim) bytes
+
+Writes go to a temporary file that is renamed into place, so a crash never leaves a
+truncated archive behind.
+"""
+import json
+import os
+import struct
+import uuid
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from pipeline.embeddings import VectorCodec
+
+_MAGIC = b"JVVA1\n"
+
+
+@dataclass
+class CaseVectors:
+    case_id: int
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    embeddings: np.ndarray          # (count, dim) float32
+    ingested_at: int | None = None
+
+
+def write_archive(path: str, record: CaseVectors, dtype: str = "float16") -> int:
+    """Write record to path. Returns the archive size in bytes."""
+    codec = VectorCodec(dtype)
+    embeddings = np.asarray(record.embeddings, dtype=np.float32).reshape(len(record.ids), -1)
+    header = zlib.compress(json.dumps({
+        "case_id": record.case_id, "ids": record.ids, "documents": record.documents,
+        "metadatas": record.metadatas, "dtype": dtype, "dim": embeddings.shape[1],
+        "ingested_at": record.ingested_at,
+    }).encode(), 9)
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.part"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC + struct.pack(">I", len(header)) + header)
+            f.write(b"".join(codec.encode(embeddings)) if len(embeddings) else b"")
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return os.path.getsize(path)
+
+
+def read_archive(path: str) -> CaseVectors:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a vector archive")
+    offset = len(_MAGIC) + 4
+    (length,) = struct.unpack(">I", data[len(_MAGIC):offset])
+    header = json.loads(zlib.decompress(data[offset:offset + length]))
+    codec = VectorCodec(header["dtype"])
+    width = codec.bytes_per_vector(header["dim"])
+    body = data[offset + length:]
+    blobs = [body[i:i + width] for i in range(0, len(body), width)]
+    if len(blobs) != len(header["ids"]):
+        raise ValueError(f"{path} is truncated ({len(blobs)} of {len(header['ids'])} vectors)")
+    return CaseVectors(
+        case_id=header["case_id"], ids=header["ids"], documents=header["documents"],
+        metadatas=header["metadatas"], embeddings=codec.decode(blobs), ingested_at=header["ingested_at"],
+    )
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Move finished cases out of the live vector store and compact it.
+
+A case whose pipeline thread is terminal (VALIDATED / REJECTED), or already pruned from
+the checkpoint store, gets its vectors written to VECTOR_ARCHIVE_DIR and its collection
+dropped, under the case lease. The next time anything opens that case's collection (a
+new filing, a query), it is restored. Its rows in the shared all_cases collection stay,
+so cross-case search still covers it. --compact then reclaims the space Chroma keeps
+after deletes.
+
+    python scripts/archive_vectors.py --terminal                 # every finished case
+    python scripts/archive_vectors.py --terminal --compact       # oracle stopped: also shrink the store
+    python scripts/archive_vectors.py --terminal --min-age-days 30
+    python scripts/archive_vectors.py --case 101 --case 205
+    python scripts/archive_vectors.py --restore 101
+    python scripts/archive_vectors.py --list
+
+Compaction rewrites the embedded store through Chroma's private schema, so it is opt-in
+(--compact), refuses any chromadb but the pinned release (rag.COMPACT_CHROMA_VERSION),
+and must run while the oracle is stopped (the oracle archives on its own hourly prune,
+without compacting).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pipeline.rag as rag
+from case_leases import LeaseStore
+from config import LEASE_DB_PATH
+
+_STARTUP_PROBE = """
+import sys, time
+import chromadb
+started = time.perf_counter()
+client = chromadb.PersistentClient(path=sys.argv[1])
+client.list_collections()
+shared = client.get_or_create_collection("all_cases")
+shared.query(query_embeddings=[[0.0] * int(sys.argv[2])], n_results=1) if shared.count() else None
+print(1000 * (time.perf_counter() - started))
+"""
+
+
+def startup_ms(chroma_dir: str, dim: int = 384) -> float:
+    """
+    Cold start of the embedded store in a fresh interpreter (the chromadb import excluded):
+    open, list collections, first cross-case query (loads the shared index).
+    """
+    out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, chroma_dir, str(dim)],
+                         check=True, capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def terminal_case_ids(min_age_s: float = 0) -> list[int]:
+    """Live cases whose pipeline thread is terminal (at least min_age_s old) or gone."""
+    from pipeline.checkpoint import TERMINAL_STATUSES, open_checkpointer, thread_statuses
+
+    statuses = thread_statuses(open_checkpointer())
+    finished = []
+    for case_id in rag.live_case_ids():
+        status, age = statuses.get(f"case_{case_id}", ("pruned", float("inf")))
+        if (status in TERMINAL_STATUSES and age >= min_age_s) or status == "pruned":
+            finished.append(case_id)
+    return finished
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1e6:.1f} MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive finished cases out of the live vector store.")
+    parser.add_argument("--terminal", action="store_true", help="archive every validated / rejected case")
+    parser.add_argument("--min-age-days", type=float, default=0, help="with --terminal: only cases finished this long ago")
+    parser.add_argument("--case", type=int, action="append", dest="case_ids", default=[], help="archive a case (repeatable)")
+    parser.add_argument("--restore", type=int, action="append", default=[], help="restore an archived case (repeatable)")
+    parser.add_argument("--list", action="store_true", help="print live and archived case counts")
+    parser.add_argument("--compact", action="store_true",
+                        help="reclaim store space afterwards (oracle stopped; pinned chromadb only)")
+    args = parser.parse_args()
+
+    if args.list:
+        archived = rag.archived_case_ids()
+        archive_bytes = sum(os.path.getsize(rag._archive_path(c)) for c in archived)
+        print(f"Live: {len(rag.live_case_ids())} case(s)")
+        print(f"Archived: {len(archived)} case(s), {_mb(archive_bytes)} in {rag.VECTOR_ARCHIVE_DIR}")
+        return
+    leases = LeaseStore(LEASE_DB_PATH, "archive_vectors")
+    for case_id in args.restore:
+        # An oracle holding the case restores it itself on first use
+        if leases.owner(case_id) is not None or not leases.acquire(case_id):
+            print(f"Case #{case_id}: an oracle is working on it, not restored")
+            continue
+        try:
+            print(f"♻️  Case #{case_id}: restored {rag.restore_case(case_id)} chunk(s)")
+        finally:
+            leases.release(case_id)
+    if args.restore and not (args.terminal or args.case_ids):
+        return
+    if not (args.terminal or args.case_ids):
+        parser.error("nothing to do: pass --terminal, --case, --restore or --list")
+
+    case_ids = set(args.case_ids)
+    if args.terminal:
+        case_ids.update(terminal_case_ids(args.min_age_days * 86400))
+
+    embedded = not rag.CHROMA_HOST
+    size_before = rag.store_bytes() if embedded else 0
+    startup_before = startup_ms(rag.CHROMA_DIR) if embedded else 0.0
+
+    started = time.perf_counter()
+    archive_bytes, busy = 0, []
+    for case_id in sorted(case_ids):
+        # Held for the whole archive, so no oracle reopens the case half-way
+        if leases.owner(case_id) is not None or not leases.acquire(case_id):
+            busy.append(case_id)
+            continue
+        try:
+            archive_bytes += rag.archive_case(case_id)
+        finally:
+            leases.release(case_id)
+    if busy:
+        print(f"Skipping {len(busy)} case(s) an oracle is working on: {', '.join(map(str, busy))}")
+    print(f"📦 Archived {len(case_ids) - len(busy)} case(s) into {_mb(archive_bytes)} "
+          f"in {time.perf_counter() - started:.1f}s")
+    if not embedded:
+        print("Compaction and size report skipped: the store is a Chroma server (CHROMA_HOST)")
+        return
+    if args.compact:
+        rag._chroma_client = None       # release the store's files before rewriting them
+        reclaimed = rag.compact_store()
+        print(f"🧹 Compaction reclaimed {_mb(reclaimed)}")
+    size_after = rag.store_bytes()
+    startup_after = startup_ms(rag.CHROMA_DIR)
+    print(f"Store: {_mb(size_before)} → {_mb(size_after)} (archive {_mb(archive_bytes)})")
+    print(f"Startup: {startup_before:.0f} ms → {startup_after:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
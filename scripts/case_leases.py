@@ -0,0 +1,153 @@
+"""
+Case leases for running several oracle instances side by side.
+
+Every instance reads the same contract events. Before handling one, it must hold the
+lease on the event's case_id in a shared SQLite file (LEASE_DB_PATH): case_id → owner,
+expires_at. A lease is taken when free or expired, renewed by a heartbeat thread while
+held, and released when the event is done. An instance that dies stops renewing; after
+LEASE_TTL_S its cases are taken over. Which events are already handled is recorded in
+the event ledger (scripts/event_ledger.py), so a takeover does not repeat finished work.
+
+A heartbeat that finds a lease taken over (this instance stalled past the TTL) marks the
+case lost; the oracle checks lost() between pipeline nodes and stops that run before it
+writes a feed entry, leaving the event to the new owner.
+
+Work spreads across instances on its own: a busy instance is not polling, so the next
+case goes to an idle one. Events of a case held elsewhere are deferred and retried
+each loop until they are done or their lease frees up.
+
+The file must be on a filesystem with working POSIX locks. Instances run on one host:
+they also share the SQLite checkpoint store (pipeline/checkpoint.py) and the document
+spool directory (pipeline/spool.py, one slot per process).
+
+    leases = LeaseStore(LEASE_DB_PATH, instance_id="oracle-a", ttl_s=60)
+    if leases.acquire(case_id):
+        try:
+            handle(event)
+        finally:
+            leases.release(case_id)
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    case_id     INTEGER PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    expires_at  REAL NOT NULL
+);
+"""
+
+log = logging.getLogger(__name__)
+
+
+class LeaseLost(RuntimeError):
+    """This instance's lease on a case expired and was taken over while it was working on it."""
+
+    def __init__(self, case_id: int):
+        super().__init__(f"Lease on case #{case_id} was taken over by another instance")
+        self.case_id = case_id
+
+
+def default_instance_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseStore:
+    def __init__(self, path: str, instance_id: str | None = None, ttl_s: float = 60.0):
+        self.path = path
+        self.instance_id = instance_id or default_instance_id()
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._held: set[int] = set()
+        self._lost: set[int] = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._stop = threading.Event()
+        self._heartbeat: threading.Thread | None = None
+
+    def close(self) -> None:
+        self.stop_heartbeat()
+        self._conn.close()
+
+    def acquire(self, case_id: int) -> bool:
+        """Take (or extend) the lease on case_id. False while another live instance holds it."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO leases (case_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (case_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (case_id, self.instance_id, now + self.ttl_s, now),
+            )
+            if cur.rowcount != 1:
+                return False
+            self._held.add(case_id)
+            self._lost.discard(case_id)
+            return True
+
+    def release(self, case_id: int) -> None:
+        with self._lock:
+            self._held.discard(case_id)
+            self._lost.discard(case_id)
+            self._conn.execute("DELETE FROM leases WHERE case_id = ? AND owner = ?", (case_id, self.instance_id))
+
+    def renew(self) -> list[int]:
+        """
+        Extend every lease this instance holds. Returns the cases it has lost (expired and
+        taken over); they stay flagged for lost() until re-acquired or released.
+        """
+        now = time.time()
+        lost = []
+        with self._lock:
+            for case_id in list(self._held):
+                cur = self._conn.execute(
+                    "UPDATE leases SET expires_at = ? WHERE case_id = ? AND owner = ?",
+                    (now + self.ttl_s, case_id, self.instance_id),
+                )
+                if cur.rowcount != 1:
+                    self._held.discard(case_id)
+                    self._lost.add(case_id)
+                    lost.append(case_id)
+        return lost
+
+    def lost(self, case_id: int) -> bool:
+        """True once a renewal found this instance's lease on case_id taken over (a cancel flag)."""
+        with self._lock:
+            return case_id in self._lost
+
+    def owner(self, case_id: int) -> str | None:
+        """Current live owner of a case, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner FROM leases WHERE case_id = ? AND expires_at >= ?", (case_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def start_heartbeat(self) -> None:
+        """Renew held leases every ttl/3 on a daemon thread."""
+        if self._heartbeat is not None:
+            return
+        self._stop.clear()
+
+        def beat():
+            while not self._stop.wait(self.ttl_s / 3):
+                for case_id in self.renew():
+                    log.warning("Lost the lease on case #%s — its run stops at the next pipeline node", case_id,
+                                extra={"case_id": case_id})
+
+        self._heartbeat = threading.Thread(target=beat, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=self.ttl_s)
+            self._heartbeat = None
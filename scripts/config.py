@@ -19,11 +19,19 @@ RPC_URL = "http://127.0.0.1:8545"
 
 
 IPFS_GATEWAY = "https://ipfs.io/ipfs/"
+# Created on first download (pipeline/graph.py), not at import
 TEMP_DIR = os.path.join(BASE_DIR, "temp_legal_files")
 
-# Ensure the temp directory exists
-if not os.path.exists(TEMP_DIR):
-    os.makedirs(TEMP_DIR)
-
 # Evidence feed for dashboard: Oracle writes integrity + AI summary here
-FEED_PATH = os.path.join(BASE_DIR, "evidence_feed.json")
\ No newline at end of file
+FEED_PATH = os.path.join(BASE_DIR, "evidence_feed.json")
+
+# Full-text + metadata search index over the feed (SQLite FTS5), kept current by the oracle
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH") or os.path.join(BASE_DIR, "evidence_index.sqlite")
+
+# Multi-instance oracle: case leases + handled-event log shared by every instance
+# (scripts/case_leases.py). Leases not renewed within LEASE_TTL_S are taken over.
+LEASE_DB_PATH = os.getenv("LEASE_DB_PATH") or os.path.join(BASE_DIR, "oracle_leases.sqlite")
+LEASE_TTL_S = float(os.getenv("LEASE_TTL_S", "60"))
+ORACLE_INSTANCE_ID = os.getenv("ORACLE_INSTANCE_ID", "")
+# Processed-events ledger (scripts/event_ledger.py): exactly-once event handling
+EVENT_LEDGER_PATH = os.getenv("EVENT_LEDGER_PATH") or os.path.join(BASE_DIR, "oracle_events.sqlite")
@@ -0,0 +1,135 @@
+"""
+Processed-events ledger: each contract event is handled exactly once, across restarts,
+overlapping block ranges, RPC retries and several oracle instances.
+
+Events are keyed by (txHash, logIndex) — event_key(). A row moves through:
+
+    started   begin() before the handler runs (the pipeline may be part-way through)
+    done      complete() once the handler's feed entry is written
+
+The feed entry is the commit point. handle_filed_event stamps it with the event key and
+FeedStore.append skips a key that is already in the feed, so:
+
+    crash before the feed write   row stays "started"; the replay re-runs the handler,
+                                  which resumes the case's checkpointed graph instead of
+                                  starting over (no second Claude call for finished nodes)
+    crash after the feed write    the replay finds the key in the feed, marks the row done
+                                  and runs nothing
+
+compact(through_block) folds done rows at or below a block into a single watermark, so
+the table stays small and the oracle can start scanning after it. Callers pass a block
+below every event still pending anywhere (the oracle uses its oldest queued event).
+
+    ledger = EventLedger(EVENT_LEDGER_PATH, feed_store)
+    if not ledger.is_done(key, block):
+        ledger.begin(key, case_id, block, owner)
+        handle(event)
+        ledger.complete(key)
+"""
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_key     TEXT PRIMARY KEY,
+    case_id       INTEGER NOT NULL,
+    block_number  INTEGER NOT NULL,
+    status        TEXT NOT NULL,          -- started | done
+    owner         TEXT NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_block ON events (block_number, status);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def event_key(event) -> str:
+    """Stable identity of a contract log: transaction hash + log index."""
+    tx = event["transactionHash"]
+    return f"{tx.hex() if hasattr(tx, 'hex') else tx}:{event['logIndex']}"
+
+
+class EventLedger:
+    def __init__(self, path: str, feed_store=None):
+        self.path = path
+        self.feed_store = feed_store        # consulted for "started" rows whose feed entry was written
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @property
+    def compacted_through(self) -> int:
+        """Every event at or below this block is done (rows folded away by compact)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_through'").fetchone()
+        return int(row[0]) if row else 0
+
+    def status(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM events WHERE event_key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, key: str, block: int | None = None) -> bool:
+        if block is not None and block <= self.compacted_through:
+            return True
+        status = self.status(key)
+        if status == "done":
+            return True
+        if status == "started" and self.feed_store is not None and self.feed_store.has_event(key):
+            self.complete(key)      # crashed between the feed write and complete()
+            return True
+        return False
+
+    def begin(self, key: str, case_id: int, block: int, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events VALUES (?, ?, ?, 'started', ?, ?) "
+                "ON CONFLICT (event_key) DO UPDATE SET owner = excluded.owner, updated_at = excluded.updated_at "
+                "WHERE events.status = 'started'",
+                (key, case_id, block, owner, time.time()),
+            )
+
+    def complete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET status = 'done', updated_at = ? WHERE event_key = ?", (time.time(), key)
+            )
+
+    def compact(self, through_block: int) -> int:
+        """Fold done rows at or below through_block into the watermark. Returns rows removed."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Never move the watermark past an event that has not finished
+                row = self._conn.execute(
+                    "SELECT MIN(block_number) FROM events WHERE status = 'started'"
+                ).fetchone()
+                if row[0] is not None:
+                    through_block = min(through_block, row[0] - 1)
+                current = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_through'").fetchone()
+                if current and int(current[0]) >= through_block:
+                    self._conn.execute("COMMIT")
+                    return 0
+                removed = self._conn.execute(
+                    "DELETE FROM events WHERE status = 'done' AND block_number <= ?", (through_block,)
+                ).rowcount
+                self._conn.execute(
+                    "INSERT INTO meta VALUES ('compacted_through', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (str(through_block),)
+                )
+                self._conn.execute("COMMIT")
+                return removed
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM events GROUP BY status").fetchall()
+        return dict(rows)
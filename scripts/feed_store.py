@@ -0,0 +1,131 @@
+"""
+Evidence feed access layer shared by the oracle (writer) and the Streamlit portal (reader).
+
+The feed is an append-only JSON list; a re-driven or resumed case appends a newer
+entry for the same (caseId, index) rather than editing the old one. FeedStore:
+    - parses the file at most once per change (cached on mtime_ns + size)
+    - indexes the latest entry per (caseId, index) → O(1) row lookups
+    - exposes a store version (= entry count) so callers can ask for
+      changes_since(version) and refresh only the rows that changed
+    - appends atomically (temp file + os.replace), so a reader never sees
+      a half-written feed
+    - serialises appends across processes with an flock on <feed>.lock, so
+      several oracle instances never drop each other's entries
+    - appends an entry stamped with an "event_key" at most once, which makes the
+      feed the commit point of the oracle's event ledger (scripts/event_ledger.py)
+"""
+import fcntl
+import json
+import os
+import threading
+
+
+class FeedStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: tuple[int, int] | None = None
+        self._entries: list[dict] = []
+        self._latest: dict[tuple[int, int], dict] = {}
+        self._event_keys: set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self) -> int:
+        """Re-parse the feed only if the file changed since the last read. Returns the version."""
+        stamp = self._file_stamp()
+        with self._lock:
+            if stamp == self._stamp:
+                return len(self._entries)
+            entries = []
+            if stamp is not None:
+                try:
+                    with open(self.path) as f:
+                        entries = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    # Keep serving the last good parse rather than blanking the portal
+                    return len(self._entries)
+            self._stamp = stamp
+            self._entries = entries
+            self._latest = {}
+            for entry in entries:
+                self._latest[_key(entry)] = entry
+            self._event_keys = {e["event_key"] for e in entries if e.get("event_key")}
+            return len(entries)
+
+    @property
+    def version(self) -> int:
+        return self.refresh()
+
+    def entries(self) -> list[dict]:
+        self.refresh()
+        return list(self._entries)
+
+    def get(self, case_id: int, index: int) -> dict | None:
+        """Latest feed entry for (caseId, index), or None."""
+        self.refresh()
+        return self._latest.get((case_id, index))
+
+    def for_case(self, case_id: int) -> dict[int, dict]:
+        """Latest entry per evidence index for one case."""
+        self.refresh()
+        return {idx: e for (cid, idx), e in self._latest.items() if cid == case_id}
+
+    def has_event(self, event_key: str) -> bool:
+        """True if an entry written for this contract event is in the feed."""
+        self.refresh()
+        return event_key in self._event_keys
+
+    def changes_since(self, version: int) -> tuple[int, list[tuple[int, int]]]:
+        """
+        (current version, (caseId, index) keys written after `version`).
+        A version ahead of the feed (file replaced or truncated) returns every key.
+        """
+        current = self.refresh()
+        with self._lock:
+            if version > current:
+                return current, list(self._latest)
+            return current, list(dict.fromkeys(_key(e) for e in self._entries[version:]))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, entry: dict) -> int:
+        """
+        Append one entry and atomically replace the feed file. Returns the new version.
+        An entry whose event_key is already in the feed is not appended again.
+        """
+        with self._lock, open(f"{self.path}.lock", "a") as lock:
+            # Read-modify-write under an exclusive lock: another oracle may have appended since our last read
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            feed = []
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        feed = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    feed = []
+            key = entry.get("event_key")
+            if key and any(e.get("event_key") == key for e in feed):
+                return len(feed)
+            feed.append(entry)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(feed, f, indent=2)
+            os.replace(tmp, self.path)
+            self._stamp = None  # force the next read to pick up the new file
+            return len(feed)
+
+
+def _key(entry: dict) -> tuple[int, int]:
+    return entry.get("caseId"), entry.get("index")
@@ -1,31 +1,145 @@
 #!/usr/bin/env python3
 """
-Compute SHA-256 hash of a file for JusticeVault submitEvidence.
-Usage: python scripts/hash_evidence.py <path-to-pdf>
-Output: 64-char hex (use as bytes32 in contract).
+Compute SHA-256 hashes of evidence files for JusticeVault submitEvidence.
+
+Single file (unchanged behaviour):
+    python scripts/hash_evidence.py <path-to-pdf>
+    Output: 64-char hex (use as bytes32 in contract).
+
+Discovery productions — many files and/or directories, hashed in parallel:
+    python scripts/hash_evidence.py productions/ extra.pdf --format csv -o manifest.csv --progress
+    Output: JSON (default) or CSV manifest of path → bytes32, ready for batch submission.
 """
-import hashlib
+import argparse
+import csv
+import fnmatch
+import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from oracle_utils import sha256_file
+
+
+def expand_paths(paths, pattern="*"):
+    """Expand directories recursively (sorted, deterministic); files are kept as given."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name) for name in sorted(names) if fnmatch.fnmatch(name, pattern)
+                )
+        else:
+            files.append(path)
+    return files
+
+
+class _Progress:
+    """Thread-safe byte counter that redraws a single stderr status line."""
+
+    def __init__(self, total_bytes, enabled):
+        self.total = max(total_bytes, 1)
+        self.done = 0
+        self.enabled = enabled
+        self.started = time.monotonic()
+        self._last_draw = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, n):
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if self.enabled and (now - self._last_draw >= 0.2 or self.done >= self.total):
+                self._last_draw = now
+                mb = self.done / 1e6
+                rate = mb / max(now - self.started, 1e-9)
+                print(f"\r{mb:,.0f}/{self.total / 1e6:,.0f} MB ({100 * self.done / self.total:.0f}%) · {rate:,.0f} MB/s",
+                      end="", file=sys.stderr, flush=True)
+
+
+def hash_files(files, workers=None, use_mmap=True, progress=False):
+    """
+    Hash files concurrently. hashlib releases the GIL, so threads scale across cores.
+    Returns manifest rows in input order: {path, bytes, sha256, bytes32} or {path, error}.
+    """
+    sizes = {}
+    for path in files:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    meter = _Progress(sum(sizes.values()), progress)
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    rows = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(sha256_file, path, use_mmap, meter.add): path for path in files}
+        for fut in as_completed(futures):
+            path = futures[fut]
+            try:
+                digest = fut.result()
+                rows[path] = {"path": path, "bytes": sizes[path], "sha256": digest, "bytes32": f"0x{digest}"}
+            except FileNotFoundError:
+                rows[path] = {"path": path, "error": "File not found"}
+            except Exception as e:
+                rows[path] = {"path": path, "error": str(e)}
+    if progress:
+        print(file=sys.stderr)
+    return [rows[path] for path in files]
+
+
+def write_manifest(rows, fmt, out):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=["path", "bytes", "bytes32", "error"], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, out, indent=2)
+        out.write("\n")
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/hash_evidence.py <path-to-pdf>", file=sys.stderr)
-        sys.exit(1)
-    path = sys.argv[1]
-    try:
-        h = hashlib.sha256()
-        with open(path, "rb") as f:
-            for block in iter(lambda: f.read(4096), b""):
-                h.update(block)
-        hex_digest = h.hexdigest()
-        print(hex_digest)
-        print(f"# For cast: 0x{hex_digest}", file=sys.stderr)
-    except FileNotFoundError:
-        print(f"File not found: {path}", file=sys.stderr)
+    parser = argparse.ArgumentParser(description="SHA-256 evidence files for JusticeVault submitEvidence.")
+    parser.add_argument("paths", nargs="+", help="files and/or directories (directories are walked recursively)")
+    parser.add_argument("--format", choices=["json", "csv"], help="manifest format (default: json; plain hex for one file)")
+    parser.add_argument("-o", "--output", help="write the manifest to this file instead of stdout")
+    parser.add_argument("--pattern", default="*", help="filename glob when walking directories (e.g. '*.pdf')")
+    parser.add_argument("--workers", type=int, help="hashing threads (default: CPU count + 4, max 32)")
+    parser.add_argument("--no-mmap", action="store_true", help="use buffered reads even for large files")
+    parser.add_argument("--progress", action="store_true", help="show bytes hashed and MB/s on stderr")
+    args = parser.parse_args()
+
+    files = expand_paths(args.paths, args.pattern)
+    if not files:
+        print("No files to hash.", file=sys.stderr)
         sys.exit(1)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
+
+    rows = hash_files(files, workers=args.workers, use_mmap=not args.no_mmap, progress=args.progress)
+    failed = [r for r in rows if "error" in r]
+
+    single = len(args.paths) == 1 and not os.path.isdir(args.paths[0]) and not args.format and not args.output
+    if single:
+        row = rows[0]
+        if failed:
+            print(f"{row['error']}: {row['path']}", file=sys.stderr)
+            sys.exit(1)
+        print(row["sha256"])
+        print(f"# For cast: {row['bytes32']}", file=sys.stderr)
+        return
+
+    if args.output:
+        with open(args.output, "w", newline="") as out:
+            write_manifest(rows, args.format or "json", out)
+        print(f"# Wrote {len(rows) - len(failed)} hashes to {args.output}", file=sys.stderr)
+    else:
+        write_manifest(rows, args.format or "json", sys.stdout)
+    for row in failed:
+        print(f"Error: {row['path']}: {row['error']}", file=sys.stderr)
+    if failed:
         sys.exit(1)
 
 
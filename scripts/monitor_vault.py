@@ -1,68 +1,130 @@
+import argparse
 import json
+import logging
 import os
 import sys
 import time
-import anthropic
-from web3 import Web3
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.graph import build_graph, PipelineState
-from pipeline.observability import configure_tracing
-from oracle_utils import verify_file_integrity
-from config import CONTRACT_ADDRESS, ABI_PATH, RPC_URL, ANTHROPIC_API_KEY, FEED_PATH
+from pipeline.metrics import CASES_FINISHED, QUEUE_DEPTH, QUEUE_WAIT, serve_metrics, start_json_dump
+from pipeline.scheduler import SCHED_URGENT_CASES, CaseScheduler, estimate_pages
+from pipeline.observability import configure_logging, configure_tracing
+from feed_store import FeedStore
+from search_index import SearchIndex
+from case_leases import LeaseLost, LeaseStore
+from event_ledger import EventLedger, event_key
+from config import (CONTRACT_ADDRESS, ABI_PATH, RPC_URL, ANTHROPIC_API_KEY, FEED_PATH, SEARCH_INDEX_PATH,
+                    LEASE_DB_PATH, LEASE_TTL_S, ORACLE_INSTANCE_ID, EVENT_LEDGER_PATH)
+
+if TYPE_CHECKING:
+    from pipeline.graph import PipelineState
+
+log = logging.getLogger("oracle")
+
 
 # ---------------------------------------------------------------------------
 # Clients & contract
 # ---------------------------------------------------------------------------
-configure_tracing()
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-ai_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
 
-with open(ABI_PATH) as f:
-    abi = json.load(f)["abi"]
-contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=abi)
+@dataclass
+class _Runtime:
+    w3: Any
+    contract: Any
+    checkpointer: Any
+    pipeline_graph: Any
+    feed_store: FeedStore
+    search_index: SearchIndex
+    leases: LeaseStore
+    ledger: EventLedger
+
+
+_runtime: _Runtime | None = None
+
+
+def runtime() -> _Runtime:
+    """
+    Build the Web3 client, contract, Claude client and compiled graph on first use.
+    Importing this module (tests, tooling) stays cheap; the heavy SDKs load here.
+    """
+    global _runtime
+    if _runtime is None:
+        import anthropic
+        from web3 import Web3
 
-# Compile the LangGraph pipeline once at startup
-pipeline_graph = build_graph(ai_client, verify_file_integrity)
+        from pipeline.checkpoint import open_checkpointer
+        from pipeline.graph import build_graph
+        from oracle_utils import verify_file_integrity
+
+        w3 = Web3(Web3.HTTPProvider(RPC_URL))
+        with open(ABI_PATH) as f:
+            abi = json.load(f)["abi"]
+        contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=abi)
+        # Compile the LangGraph pipeline once — checkpoints live on disk,
+        # so cases paused awaiting a judge survive oracle restarts
+        checkpointer = open_checkpointer()
+        # The analysis node's RetryPolicy is the only retry layer for Claude calls
+        ai_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+        feed_store = FeedStore(FEED_PATH)
+        _runtime = _Runtime(
+            w3=w3, contract=contract, checkpointer=checkpointer,
+            pipeline_graph=build_graph(ai_client, verify_file_integrity, checkpointer),
+            feed_store=feed_store, search_index=SearchIndex(SEARCH_INDEX_PATH),
+            leases=LeaseStore(LEASE_DB_PATH, ORACLE_INSTANCE_ID or None, LEASE_TTL_S),
+            ledger=EventLedger(EVENT_LEDGER_PATH, feed_store),
+        )
+    return _runtime
+
+
+# How often the main loop sweeps terminal threads out of the checkpoint store
+# (their cases' vectors move to the vector archive at the same time)
+_PRUNE_INTERVAL_S = 3600
+# How long the main loop waits for new blocks when it has nothing to run
+_POLL_S = float(os.getenv("ORACLE_POLL_S", "2"))
+
+# Local metrics: Prometheus text on METRICS_PORT (0 = off) and/or a periodic JSON dump
+_METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+_METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", "")
+_METRICS_JSON_INTERVAL_S = float(os.getenv("METRICS_JSON_INTERVAL_S", "30"))
 
 
 # ---------------------------------------------------------------------------
 # Feed writer
 # ---------------------------------------------------------------------------
 
-def _append_to_feed(state: PipelineState, evidence_index: int) -> None:
+def _append_to_feed(state: "PipelineState", evidence_index: int, event_key: str | None = None) -> None:
+    """
+    Write the feed entry (raises if the feed cannot be written: the event is then not
+    marked done and will be replayed). The search index is best-effort — sync() catches up.
+    """
+    entry = {
+        "caseId":             state["case_id"],
+        "index":              evidence_index,
+        "status":             state["status"],
+        "integrity_verified": state["integrity_verified"],
+        "ai_summary":         state["ai_brief"] or state.get("error", ""),
+        "pii_flags":          state["pii_flags"],
+        "chunk_count":        state["chunk_count"],
+        "timestamp_processed": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "file_hash_hex":      state["file_hash"].hex() if hasattr(state["file_hash"], "hex") else str(state["file_hash"]),
+        "ipfs_cid":           state["ipfs_cid"],
+    }
+    if event_key:
+        entry["event_key"] = event_key
+    rt = runtime()
+    version = rt.feed_store.append(entry)
     try:
-        entry = {
-            "caseId":             state["case_id"],
-            "index":              evidence_index,
-            "status":             state["status"],
-            "integrity_verified": state["integrity_verified"],
-            "ai_summary":         state["ai_brief"] or state.get("error", ""),
-            "pii_flags":          state["pii_flags"],
-            "chunk_count":        state["chunk_count"],
-            "timestamp_processed": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "file_hash_hex":      state["file_hash"].hex() if hasattr(state["file_hash"], "hex") else str(state["file_hash"]),
-            "ipfs_cid":           state["ipfs_cid"],
-        }
-        feed = []
-        if os.path.exists(FEED_PATH):
-            try:
-                with open(FEED_PATH) as f:
-                    feed = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                feed = []
-        feed.append(entry)
-        with open(FEED_PATH, "w") as f:
-            json.dump(feed, f, indent=2)
+        rt.search_index.add(entry, feed_version=version)
     except Exception as exc:
-        print(f"Warning: could not write feed: {exc}")
+        log.warning("Could not update search index: %s", exc, extra={"case_id": state.get("case_id")})
 
 
 def _get_evidence_index(case_id: int) -> int:
     index = 0
     try:
         while True:
-            contract.functions.caseRegistry(case_id, index).call()
+            runtime().contract.functions.caseRegistry(case_id, index).call()
             index += 1
     except Exception:
         return max(0, index - 1)
@@ -72,13 +134,28 @@ def _get_evidence_index(case_id: int) -> int:
 # Event handlers
 # ---------------------------------------------------------------------------
 
+def _run_case(pipeline_graph, graph_input, thread_cfg: dict, case_id: int) -> dict:
+    """
+    pipeline_graph.invoke(), node by node: if the lease heartbeat finds this instance's
+    lease on the case taken over, the run stops at the next node boundary (LeaseLost).
+    """
+    leases = runtime().leases
+    for _ in pipeline_graph.stream(graph_input, config=thread_cfg, stream_mode="updates"):
+        if leases.lost(case_id):
+            raise LeaseLost(case_id)
+    return pipeline_graph.get_state(thread_cfg).values
+
+
 def handle_filed_event(event) -> None:
     """EvidenceFiled — run the full pipeline through BRIEF_GENERATED, then pause."""
     case_id = event.args.caseId
     cid     = event.args.ipfsCid
-    print(f"\n--- 📂 EvidenceFiled: Case #{case_id} ---")
+    key     = event_key(event)
+    ctx = {"case_id": case_id}
+    log.info("EvidenceFiled: case #%s", case_id, extra=ctx)
+    started = time.perf_counter()
 
-    initial_state: PipelineState = {
+    initial_state: "PipelineState" = {
         "case_id":            case_id,
         "ipfs_cid":           cid,
         "file_hash":          event.args.fileHash,
@@ -90,72 +167,290 @@ def handle_filed_event(event) -> None:
         "chunk_count":        0,
         "ai_brief":           "",
         "error":              "",
+        "route":              "",
+        "event_key":          key,
     }
 
+    pipeline_graph = runtime().pipeline_graph
     thread_cfg = {"configurable": {"thread_id": f"case_{case_id}"}}
+    previous = pipeline_graph.get_state(thread_cfg)
+    # The same log delivered again — not the same document filed again, which is a new run
+    replay = previous.values.get("event_key") == key
     try:
-        # Graph runs to BRIEF_GENERATED then pauses (interrupt_before=["validate"])
-        result = pipeline_graph.invoke(initial_state, config=thread_cfg)
+        if replay and (not previous.next or "validate" in previous.next):
+            # A replayed event whose run already finished: write its outcome, run nothing
+            log.info("Replayed event — pipeline already ran for this filing", extra=ctx)
+            result = previous.values
+        elif replay:
+            # The oracle stopped mid-run: continue from the last checkpointed node
+            log.info("Replayed event — resuming at %s", ", ".join(previous.next), extra=ctx)
+            result = _run_case(pipeline_graph, None, thread_cfg, case_id)
+        else:
+            # Graph runs to BRIEF_GENERATED then pauses (interrupt_before=["validate"])
+            result = _run_case(pipeline_graph, initial_state, thread_cfg, case_id)
+    except LeaseLost:
+        raise
     except Exception as exc:
-        print(f"❌ Pipeline error: {exc}")
-        result = {**initial_state, "status": "REJECTED", "error": str(exc)}
+        # Retries exhausted — the failed node stays pending in the checkpoint,
+        # so the case can be re-driven without redoing earlier nodes.
+        log.error("Pipeline error: %s", exc, extra=ctx)
+        partial = pipeline_graph.get_state(thread_cfg).values or initial_state
+        result = {**initial_state, **partial, "status": "REJECTED",
+                  "error": f"{exc} (re-drive: python scripts/monitor_vault.py --redrive {case_id})"}
 
-    print(f"📝 Writing to feed (status: {result.get('status')})...")
-    _append_to_feed(result, _get_evidence_index(case_id))
-    print("✨ Feed updated.")
+    # The new owner writes this event's entry
+    if runtime().leases.lost(case_id):
+        raise LeaseLost(case_id)
+    CASES_FINISHED.inc(status=result.get("status", "UNKNOWN"))
+    _append_to_feed(result, _get_evidence_index(case_id), key)
+    log.info("Feed updated (status: %s)", result.get("status"),
+             extra={**ctx, "duration_ms": round(1000 * (time.perf_counter() - started), 2)})
 
 
 def handle_validated_event(event) -> None:
     """EvidenceValidated — resume the paused graph past the VALIDATE node."""
     case_id = event.args.caseId
-    print(f"\n⚖️  EvidenceValidated: Case #{case_id} — resuming pipeline graph...")
+    ctx = {"case_id": case_id}
+    log.info("EvidenceValidated: case #%s — resuming pipeline graph", case_id, extra=ctx)
 
+    pipeline_graph = runtime().pipeline_graph
     thread_cfg = {"configurable": {"thread_id": f"case_{case_id}"}}
+    snapshot = pipeline_graph.get_state(thread_cfg)
+    if "validate" not in snapshot.next:
+        log.warning("No paused pipeline for case #%s — nothing to resume", case_id, extra=ctx)
+        return
     try:
-        result = pipeline_graph.invoke(None, config=thread_cfg)
-        print(f"✅ Pipeline complete. Status: {result.get('status')}")
+        result = _run_case(pipeline_graph, None, thread_cfg, case_id)
+        CASES_FINISHED.inc(status=result.get("status", "UNKNOWN"))
+        log.info("Pipeline complete. Status: %s", result.get("status"), extra=ctx)
+    except LeaseLost:
+        raise
     except Exception as exc:
-        print(f"❌ Resume error for case #{case_id}: {exc}")
+        log.error("Resume error for case #%s: %s", case_id, exc, extra=ctx)
+
+
+def redrive_case(case_id: int) -> None:
+    """Resume a REJECTED case from its last successful checkpoint and refresh its feed entry."""
+    from pipeline.graph import redrive
+
+    leases = runtime().leases
+    if not leases.acquire(case_id):
+        log.error("Case #%s is being processed by oracle %s — not re-driving", case_id,
+                  leases.owner(case_id), extra={"case_id": case_id})
+        return
+    thread_cfg = {"configurable": {"thread_id": f"case_{case_id}"}}
+    leases.start_heartbeat()
+    try:
+        result = redrive(runtime().pipeline_graph, thread_cfg)
+        if leases.lost(case_id):
+            raise LeaseLost(case_id)
+    except Exception as exc:
+        log.error("Re-drive failed for case #%s: %s", case_id, exc, extra={"case_id": case_id})
+        return
+    finally:
+        leases.release(case_id)
+    try:
+        _append_to_feed(result, _get_evidence_index(case_id))
+    except Exception as exc:
+        log.warning("Could not write feed: %s", exc, extra={"case_id": case_id})
+    log.info("Re-drive finished (status: %s) — feed updated", result.get("status"), extra={"case_id": case_id})
+
+
+_HANDLERS = {"EvidenceFiled": handle_filed_event, "EvidenceValidated": handle_validated_event}
+
+
+def dispatch(events: list, leases: LeaseStore, ledger: EventLedger) -> list:
+    """
+    Handle (kind, event) pairs in order, each under its case lease and exactly once
+    (scripts/event_ledger.py). Events whose case is leased by another instance — and
+    later events of that case — are returned for retry, as is an event whose lease was
+    taken over mid-run (its handler stopped before writing the feed; see _run_case).
+    """
+    waiting, blocked = [], set()
+    for kind, event in events:
+        key, case_id, block = event_key(event), event.args.caseId, event["blockNumber"]
+        if ledger.is_done(key, block):
+            continue
+        if case_id in blocked or not leases.acquire(case_id):
+            waiting.append((kind, event))
+            blocked.add(case_id)
+            continue
+        try:
+            # Re-checked under the lease: the previous owner may have finished it meanwhile
+            if ledger.is_done(key, block):
+                continue
+            log.debug("%s in block %s", kind, block)
+            ledger.begin(key, case_id, block, leases.instance_id)
+            _HANDLERS[kind](event)
+            ledger.complete(key)
+        except LeaseLost:
+            log.warning("Case #%s was taken over by %s mid-run — stopped without writing its feed entry",
+                        case_id, leases.owner(case_id), extra={"case_id": case_id})
+            waiting.append((kind, event))
+            blocked.add(case_id)
+        finally:
+            leases.release(case_id)
+    return waiting
+
+
+def event_costs(items: list) -> list[float]:
+    """
+    Scheduler cost in estimated pages of each (kind, event). Resuming a validated case is
+    nearly free; filings are sized by one concurrent, deadline-bounded batch of probes.
+    """
+    from pipeline.graph import document_sizes
+
+    cids = [event.args.ipfsCid for kind, event in items if kind == "EvidenceFiled"]
+    try:
+        sizes = document_sizes(cids) if cids else {}
+    except Exception as exc:
+        log.debug("Size probes failed: %s", exc)
+        sizes = {}
+    return [estimate_pages(sizes.get(event.args.ipfsCid)) if kind == "EvidenceFiled" else 0.0
+            for kind, event in items]
+
+
+def run_next(scheduler: CaseScheduler, leases: LeaseStore, ledger: EventLedger, skip: set[int]) -> bool:
+    """
+    Dispatch the scheduler's next job. A job whose case is leased by another instance
+    goes back in the queue and its case is skipped until the caller clears `skip`.
+    Returns False when no job was eligible.
+    """
+    job = scheduler.pop(skip_cases=skip)
+    if job is None:
+        return False
+    QUEUE_WAIT.observe(time.monotonic() - job.enqueued_at, priority=job.priority)
+    try:
+        waiting = dispatch([job.item], leases, ledger)
+    except Exception:
+        scheduler.requeue(job)
+        raise
+    if waiting:
+        scheduler.requeue(job)
+        skip.add(job.case_id)
+    QUEUE_DEPTH.set(len(scheduler))
+    return True
 
 
 # ---------------------------------------------------------------------------
 # Main loop
 # ---------------------------------------------------------------------------
 
-def log_loop() -> None:
-    print("🚀 JusticeVault Oracle: Active (LangGraph pipeline mode)...")
+def start_metrics() -> None:
+    if _METRICS_PORT:
+        try:
+            serve_metrics(_METRICS_PORT)
+            log.info("Metrics: http://127.0.0.1:%d/metrics", _METRICS_PORT)
+        except OSError as exc:
+            log.warning("Metrics endpoint disabled: %s", exc)
+    if _METRICS_JSON_PATH:
+        start_json_dump(_METRICS_JSON_PATH, _METRICS_JSON_INTERVAL_S)
+        log.info("Metrics: JSON snapshot every %.0fs → %s", _METRICS_JSON_INTERVAL_S, _METRICS_JSON_PATH)
+
+
+def archive_finished_cases(thread_ids: list[str], leases: LeaseStore) -> int:
+    """
+    Move the vectors of pruned (terminal) case threads to the vector archive; a case
+    reopened later is restored on first use. Each case is archived under its lease, so
+    no instance can reopen it mid-archive; cases leased elsewhere are left alone.
+    Best-effort: a failure is logged and retried by scripts/archive_vectors.py.
+    """
+    from pipeline.rag import archive_case
+
+    archived = 0
+    for thread_id in thread_ids:
+        if not thread_id.startswith("case_") or not thread_id.removeprefix("case_").isdigit():
+            continue
+        case_id = int(thread_id.removeprefix("case_"))
+        # owner() first: acquire() would also succeed on a case this instance is handling
+        if leases.owner(case_id) is not None or not leases.acquire(case_id):
+            continue
+        try:
+            archived += archive_case(case_id) > 0
+        except Exception as exc:
+            log.warning("Could not archive vectors of case #%s: %s", case_id, exc, extra={"case_id": case_id})
+        finally:
+            leases.release(case_id)
+    return archived
+
+
+def log_loop(urgent_cases: set[int] = frozenset()) -> None:
+    from pipeline.checkpoint import prune_terminal_threads
+
+    start_metrics()
+    rt = runtime()
+    rt.leases.start_heartbeat()
+    log.info("JusticeVault Oracle: active (LangGraph pipeline mode, instance %s)", rt.leases.instance_id)
+    indexed = rt.search_index.sync(rt.feed_store)
+    if indexed:
+        log.info("Search index: caught up %d feed entries", indexed)
     try:
-        last_block = 0
-        print(f"📊 Listening from block {last_block}")
+        # Blocks at or below the ledger's compaction watermark hold only finished events
+        last_block = rt.ledger.compacted_through
+        log.info("Listening from block %d", last_block)
     except Exception as exc:
-        print(f"❌ Connection error — is Anvil running at {RPC_URL}? ({exc})")
+        log.error("Event ledger unreadable at %s (%s)", EVENT_LEDGER_PATH, exc)
         return
 
+    last_prune = 0.0
+    # Pending events run shortest-first with aging (pipeline/scheduler.py), not in block order
+    scheduler = CaseScheduler(urgent_cases=SCHED_URGENT_CASES | set(urgent_cases))
+    skip: set[int] = set()     # cases leased by another instance, retried after the next idle poll
     while True:
         try:
-            current_block = w3.eth.block_number
+            if time.time() - last_prune >= _PRUNE_INTERVAL_S:
+                pruned = prune_terminal_threads(rt.checkpointer)
+                if pruned:
+                    log.info("Pruned %d terminal pipeline thread(s) from checkpoint store", len(pruned))
+                    archived = archive_finished_cases(pruned, rt.leases)
+                    if archived:
+                        log.info("Archived vectors of %d finished case(s)", archived)
+                # Everything below the oldest event still queued here has been handled by some instance
+                oldest = min((event["blockNumber"] for _, event in scheduler.items()), default=last_block + 1)
+                compacted = rt.ledger.compact(oldest - 1)
+                if compacted:
+                    log.info("Compacted %d event ledger record(s) through block %d", compacted, oldest - 1)
+                last_prune = time.time()
+
+            current_block = rt.w3.eth.block_number
             if current_block > last_block:
                 from_b, to_b = last_block + 1, current_block
 
-                for event in contract.events.EvidenceFiled.get_logs(from_block=from_b, to_block=to_b):
-                    print(f"📦 EvidenceFiled in block {event['blockNumber']}")
-                    handle_filed_event(event)
-
-                for event in contract.events.EvidenceValidated.get_logs(from_block=from_b, to_block=to_b):
-                    print(f"⚖️  EvidenceValidated in block {event['blockNumber']}")
-                    handle_validated_event(event)
-
+                filed = rt.contract.events.EvidenceFiled.get_logs(from_block=from_b, to_block=to_b)
+                validated = rt.contract.events.EvidenceValidated.get_logs(from_block=from_b, to_block=to_b)
+                # Overlapping ranges, restarts and RPC retries deliver events again
+                fresh = [(kind, event) for kind, events in (("EvidenceFiled", filed), ("EvidenceValidated", validated))
+                         for event in events if not rt.ledger.is_done(event_key(event), event["blockNumber"])]
+                for item, cost in zip(fresh, event_costs(fresh)):
+                    scheduler.add(item[1].args.caseId, item, cost)
+                QUEUE_DEPTH.set(len(scheduler))
                 last_block = current_block
 
-            time.sleep(2)
+            # One job per iteration, so filings that arrive meanwhile compete for the next slot
+            if run_next(scheduler, rt.leases, rt.ledger, skip):
+                continue
+            skip.clear()
+            time.sleep(_POLL_S)
 
         except Exception as exc:
             if "upgrade" in str(exc).lower():
                 time.sleep(1)
                 continue
-            print(f"⚠️  Loop warning: {exc}")
+            log.warning("Loop warning: %s", exc)
             time.sleep(5)
 
 
 if __name__ == "__main__":
-    log_loop()
+    parser = argparse.ArgumentParser(description="JusticeVault oracle")
+    parser.add_argument("--redrive", type=int, metavar="CASE_ID",
+                        help="resume a rejected case from its last successful checkpoint, then exit")
+    parser.add_argument("--urgent", default="", metavar="CASE_IDS",
+                        help="comma-separated case IDs to schedule ahead of other work (adds to SCHED_URGENT_CASES)")
+    args = parser.parse_args()
+    # Structured JSON logs via a background queue listener (LOG_LEVEL / LOG_FORMAT)
+    configure_logging()
+    configure_tracing()
+    if args.redrive is not None:
+        redrive_case(args.redrive)
+    else:
+        log_loop({int(c) for c in args.urgent.split(",") if c.strip()})
@@ -3,24 +3,128 @@ Pure Oracle utilities: file integrity verification (no Web3 or AI deps).
 Used by the Oracle (monitor) and testable by Pytest without a live chain.
 """
 import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
 
+# 1 MiB reads amortise syscall + Python overhead; the old 4 KB loop was CPU-bound on the interpreter
+HASH_BUFFER_SIZE = 1024 * 1024
+# Files at least this large are hashed through mmap (no copy into Python buffers)
+MMAP_MIN_BYTES = 16 * 1024 * 1024
+# Max number of (file identity → digest) entries kept by the verification cache
+DIGEST_CACHE_SIZE = 1024
 
-def verify_file_integrity(file_path, expected_hash_hex):
+
+def sha256_file(file_path, use_mmap=True, on_progress=None):
+    """
+    Return the SHA-256 hex digest of a file.
+    Large files are hashed through mmap, smaller ones with 1 MiB readinto() blocks.
+    hashlib releases the GIL on large updates, so calls parallelise across threads.
+
+    :param on_progress: Optional callable receiving the number of bytes just hashed.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    step = HASH_BUFFER_SIZE * 8
+                    for offset in range(0, size, step):
+                        block = view[offset:offset + step]
+                        sha256_hash.update(block)
+                        block.release()
+                        if on_progress:
+                            on_progress(min(step, size - offset))
+                finally:
+                    view.release()
+        else:
+            buf = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                sha256_hash.update(view[:n])
+                if on_progress:
+                    on_progress(n)
+    return sha256_hash.hexdigest()
+
+
+def _file_identity(file_path):
+    """
+    Everything that changes when a file's bytes can have changed: path, size, mtime, inode.
+    st_dev and st_ctime_ns are included too — ctime cannot be reset by utime(), so an
+    in-place rewrite that restores size and mtime still invalidates the entry.
+    """
+    st = os.stat(file_path)
+    return (os.path.realpath(file_path), st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev, st.st_ctime_ns)
+
+
+class _DigestCache:
+    """Thread-safe LRU of file identity → SHA-256 hex digest."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+            return digest
+
+    def put(self, key, digest):
+        with self._lock:
+            self._entries[key] = digest
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_digest_cache = _DigestCache(DIGEST_CACHE_SIZE)
+
+
+def cached_sha256_file(file_path):
+    """
+    sha256_file() memoized on the file's identity (see _file_identity).
+    The identity is taken before and after hashing; a file modified mid-hash is never cached.
+    """
+    before = _file_identity(file_path)
+    digest = _digest_cache.get(before)
+    if digest is not None:
+        return digest
+    digest = sha256_file(file_path)
+    if _file_identity(file_path) == before:
+        _digest_cache.put(before, digest)
+    return digest
+
+
+def clear_digest_cache():
+    """Drop every memoized digest (e.g. after restoring files from backup)."""
+    _digest_cache.clear()
+
+
+def verify_file_integrity(file_path, expected_hash_hex, use_cache=True):
     """
     Verify that the file at file_path has SHA-256 hash matching expected_hash_hex.
     First Principles: Don't trust the IPFS gateway — verify the digital fingerprint.
 
     :param file_path: Path to the file.
     :param expected_hash_hex: Expected hash as bytes32 (HexBytes/bytes) or hex string (with or without 0x).
+    :param use_cache: Reuse the digest while the file's (path, size, mtime, inode) identity is unchanged.
     :return: True if the file's SHA-256 matches, False otherwise or on error.
     """
-    sha256_hash = hashlib.sha256()
     try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-
-        actual_hash = sha256_hash.hexdigest()
+        actual_hash = cached_sha256_file(file_path) if use_cache else sha256_file(file_path)
 
         if isinstance(expected_hash_hex, bytes):
             clean_expected = expected_hash_hex.hex()
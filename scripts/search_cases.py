@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Semantic search across every ingested case — "which other cases mention this respondent?"
+
+    python scripts/search_cases.py "Crescent Textiles wrongful termination"
+    python scripts/search_cases.py "Section 489-F cheque dishonour" --since 2026-01-01 --page 1
+    python scripts/search_cases.py "NADRA record" --case 101 --case 205 --json
+    python scripts/search_cases.py --reindex      # backfill from existing per-case collections
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.rag import CROSS_CASE_PAGE_SIZE, reindex_all_cases, search_all_cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Semantic search across all JusticeVault cases.")
+    parser.add_argument("query", nargs="?", help="what to look for (party, statute, fact pattern...)")
+    parser.add_argument("--case", type=int, action="append", dest="case_ids", help="restrict to case IDs (repeatable)")
+    parser.add_argument("--since", help="ingested on/after (ISO-8601 date or datetime)")
+    parser.add_argument("--until", help="ingested on/before (ISO-8601 date or datetime)")
+    parser.add_argument("--page", type=int, default=0)
+    parser.add_argument("--page-size", type=int, default=CROSS_CASE_PAGE_SIZE)
+    parser.add_argument("--budget-ms", type=float, help="latency budget (default: CROSS_CASE_BUDGET_MS)")
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    parser.add_argument("--reindex", action="store_true", help="mirror all per-case collections into the shared index")
+    args = parser.parse_args()
+
+    if args.reindex:
+        started = time.perf_counter()
+        count = reindex_all_cases()
+        print(f"🔁 Mirrored {count} case collection(s) in {time.perf_counter() - started:.1f}s")
+        if not args.query:
+            return
+    if not args.query:
+        parser.error("query is required unless --reindex is given")
+
+    results = search_all_cases(
+        args.query, page=args.page, page_size=args.page_size, case_ids=args.case_ids,
+        since=args.since, until=args.until, budget_ms=args.budget_ms,
+    )
+    if args.json:
+        print(json.dumps(asdict(results), indent=2))
+        return
+    if results.timed_out:
+        print(f"⏱  Search exceeded its latency budget ({results.elapsed_ms:.0f} ms) — narrow the filters or raise --budget-ms")
+        sys.exit(2)
+    if not results.hits:
+        print("No matching chunks.")
+        return
+    print(f"🔍 {len(results.case_ids())} case(s) on page {results.page} ({results.elapsed_ms:.0f} ms)\n")
+    for hit in results.hits:
+        excerpt = " ".join(hit.text.split())[:160]
+        print(f"  Case #{hit.case_id:<6} chunk {hit.chunk_index:<3} score {hit.score:.3f}  {excerpt}")
+    if results.has_more:
+        print(f"\n  More results: --page {results.page + 1}")
+
+
+if __name__ == "__main__":
+    main()
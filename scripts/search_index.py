@@ -0,0 +1,279 @@
+"""
+Case-level search over the evidence feed — SQLite FTS5, no server.
+
+One row per (caseId, index), holding the latest feed entry:
+    evidence       metadata columns (status, integrity, CID, hash, timestamps) with B-tree indexes
+    evidence_fts   full-text over brief, parties, PII flags, status, CID and hash (prefix-indexed)
+
+The oracle upserts each entry as _append_to_feed writes it; SearchIndex.sync()
+catches up from the feed (e.g. after the index file is deleted) using the feed
+store's version, so both writers converge on the same rows.
+
+    idx = SearchIndex(SEARCH_INDEX_PATH)
+    idx.search("respondent wrongful termination", status="BRIEF_GENERATED", limit=20)
+"""
+import json
+import re
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    id                  INTEGER PRIMARY KEY,
+    case_id             INTEGER NOT NULL,
+    idx                 INTEGER NOT NULL,
+    status              TEXT,
+    integrity_verified  INTEGER,
+    pii_flags           TEXT,
+    chunk_count         INTEGER,
+    ipfs_cid            TEXT,
+    file_hash_hex       TEXT,
+    processed_at        TEXT,
+    UNIQUE (case_id, idx)
+);
+CREATE INDEX IF NOT EXISTS evidence_status ON evidence (status, processed_at);
+CREATE INDEX IF NOT EXISTS evidence_processed ON evidence (processed_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5 (
+    brief, parties, pii_flags, status, ipfs_cid, file_hash_hex,
+    tokenize = 'unicode61', prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# BM25 scores every matching row before the LIMIT applies. Terms that match more
+# rows than this (a common surname, "petitioner") are returned newest-first instead,
+# which FTS5 serves straight from its rowid order.
+RANK_MAX_MATCHES = 2_000
+_BM25 = "bm25(evidence_fts, 4.0, 6.0, 2.0, 1.0, 1.0, 1.0)"  # brief, parties weighted highest
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PARTIES = re.compile(r"\*\*Parties Involved:?\*\*:?(.*?)(?:\n\s*\*\*|\Z)", re.IGNORECASE | re.DOTALL)
+
+
+def extract_parties(brief: str) -> str:
+    """The 'Parties Involved' section of a generated brief (empty if absent)."""
+    match = _PARTIES.search(brief or "")
+    return match.group(1).strip() if match else ""
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match (AND), the last
+    word as a prefix so the box works while typing. Quotes and operators are dropped.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return ""
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def make_snippet(brief: str, text: str, width: int = 16) -> str:
+    """A window of ~width words around the first query match, matches in [brackets]."""
+    words = (brief or "").split()
+    terms = [t.lower() for t in _TOKEN.findall(text)]
+    if not words or not terms:
+        return ""
+
+    def hit(word: str) -> bool:
+        w = word.lower()
+        return any(w.strip("*:-.,;()").startswith(t) for t in terms)
+
+    first = next((i for i, w in enumerate(words) if hit(w)), 0)
+    start = max(0, first - width // 4)
+    window = [f"[{w}]" if hit(w) else w for w in words[start:start + width]]
+    return ("…" if start else "") + " ".join(window) + ("…" if start + width < len(words) else "")
+
+
+class SearchIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        # WAL: the portal keeps reading while the oracle writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _upsert(self, entry: dict) -> None:
+        summary = entry.get("ai_summary") or ""
+        pii = " ".join(entry.get("pii_flags") or [])
+        row = (
+            entry.get("status"), int(bool(entry.get("integrity_verified"))), pii,
+            entry.get("chunk_count") or 0, entry.get("ipfs_cid") or "",
+            entry.get("file_hash_hex") or "", entry.get("timestamp_processed") or "",
+        )
+        cur = self._conn.execute(
+            "SELECT id FROM evidence WHERE case_id = ? AND idx = ?", (entry.get("caseId"), entry.get("index"))
+        )
+        found = cur.fetchone()
+        if found:
+            rowid = found[0]
+            self._conn.execute(
+                "UPDATE evidence SET status=?, integrity_verified=?, pii_flags=?, chunk_count=?, "
+                "ipfs_cid=?, file_hash_hex=?, processed_at=? WHERE id=?", row + (rowid,),
+            )
+            self._conn.execute("DELETE FROM evidence_fts WHERE rowid = ?", (rowid,))
+        else:
+            rowid = self._conn.execute(
+                "INSERT INTO evidence (case_id, idx, status, integrity_verified, pii_flags, chunk_count, "
+                "ipfs_cid, file_hash_hex, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry.get("caseId"), entry.get("index")) + row,
+            ).lastrowid
+        self._conn.execute(
+            "INSERT INTO evidence_fts (rowid, brief, parties, pii_flags, status, ipfs_cid, file_hash_hex) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (rowid, summary, extract_parties(summary), pii, entry.get("status") or "", row[4], row[5]),
+        )
+
+    def add(self, entry: dict, feed_version: int | None = None) -> None:
+        """Index (or replace) one feed entry; record the feed version it corresponds to."""
+        self.add_many([entry], feed_version)
+
+    def add_many(self, entries: list[dict], feed_version: int | None = None) -> None:
+        with self._lock, self._conn:
+            for entry in entries:
+                self._upsert(entry)
+            if feed_version is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('feed_version', ?)", (str(feed_version),)
+                )
+
+    def feed_version(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'feed_version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def sync(self, feed_store) -> int:
+        """Index feed entries written since the last indexed version. Returns how many were indexed."""
+        indexed = self.feed_version()
+        current = feed_store.refresh()
+        if current == indexed:
+            return 0
+        entries = feed_store.entries()
+        # Feed replaced or truncated → rebuild from scratch
+        start = indexed if indexed <= current else 0
+        self.add_many(entries[start:], current)
+        return len(entries) - start
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        text: str = "",
+        status: str | list[str] | None = None,
+        case_ids: list[int] | None = None,
+        integrity: bool | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Full-text + metadata search. Text hits are ranked by BM25 (brief and parties
+        weighted highest) unless the text matches more than RANK_MAX_MATCHES rows;
+        without text, newest first. since/until compare ISO-8601 timestamp_processed strings.
+        """
+        where, params = [], []
+        query = fts_query(text)
+        if query:
+            # The FTS match is the leading filter; metadata filters apply to its rowids
+            with self._lock:
+                matches = self._conn.execute(
+                    "SELECT COUNT(*) FROM evidence_fts WHERE evidence_fts MATCH ?", (query,)
+                ).fetchone()[0]
+            if matches <= RANK_MAX_MATCHES:
+                sql, order = f"SELECT e.*, {_BM25} AS score ", "score"
+            else:
+                sql, order = "SELECT e.*, 0.0 AS score ", "evidence_fts.rowid DESC"
+            sql += "FROM evidence_fts JOIN evidence e ON e.id = evidence_fts.rowid "
+            where.append("evidence_fts MATCH ?")
+            params.append(query)
+        else:
+            sql = "SELECT e.*, 0.0 AS score FROM evidence e "
+            order = "e.processed_at DESC"
+        if status:
+            statuses = [status] if isinstance(status, str) else list(status)
+            where.append(f"e.status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if case_ids:
+            where.append(f"e.case_id IN ({','.join('?' * len(case_ids))})")
+            params.extend(case_ids)
+        if integrity is not None:
+            where.append("e.integrity_verified = ?")
+            params.append(int(integrity))
+        if since:
+            where.append("e.processed_at >= ?")
+            params.append(since)
+        if until:
+            where.append("e.processed_at <= ?")
+            params.append(until)
+        if where:
+            sql += "WHERE " + " AND ".join(where) + " "
+        sql += f"ORDER BY {order} LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            snippets = {}
+            if query and rows:
+                # Highlight only the page being returned. A rowid lookup without MATCH is a
+                # B-tree probe; snippet() with MATCH would re-run the full-text query per row.
+                ids = [r["id"] for r in rows]
+                briefs = self._conn.execute(
+                    f"SELECT rowid, brief FROM evidence_fts WHERE rowid IN ({','.join('?' * len(ids))})", ids
+                ).fetchall()
+                snippets = {rowid: make_snippet(brief, text) for rowid, brief in briefs}
+        return [
+            {
+                "caseId": r["case_id"],
+                "index": r["idx"],
+                "status": r["status"],
+                "integrity_verified": bool(r["integrity_verified"]),
+                "pii_flags": r["pii_flags"].split() if r["pii_flags"] else [],
+                "ipfs_cid": r["ipfs_cid"],
+                "file_hash_hex": r["file_hash_hex"],
+                "timestamp_processed": r["processed_at"],
+                "score": round(-r["score"], 4),
+                "snippet": snippets.get(r["id"], ""),
+            }
+            for r in rows
+        ]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+
+def main() -> None:
+    import argparse
+    from config import FEED_PATH, SEARCH_INDEX_PATH
+    from feed_store import FeedStore
+
+    parser = argparse.ArgumentParser(description="Search briefs and evidence metadata across all cases.")
+    parser.add_argument("query", nargs="?", default="", help="free text (parties, claims, CIDs, PII types...)")
+    parser.add_argument("--status", action="append", help="filter by status (repeatable)")
+    parser.add_argument("--case", type=int, action="append", dest="case_ids", help="restrict to case IDs (repeatable)")
+    parser.add_argument("--since", help="ISO-8601 lower bound on timestamp_processed")
+    parser.add_argument("--until", help="ISO-8601 upper bound on timestamp_processed")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    index = SearchIndex(SEARCH_INDEX_PATH)
+    index.sync(FeedStore(FEED_PATH))
+    hits = index.search(args.query, status=args.status, case_ids=args.case_ids,
+                        since=args.since, until=args.until, limit=args.limit)
+    print(json.dumps(hits, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Run from project root: streamlit run scripts/streamlit_app.py
 """
 import json
 import os
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -11,8 +12,9 @@ from pathlib import Path
 import streamlit as st
 from web3 import Web3
 
-# Ensure we can import config (run from project root)
+# Ensure we can import config (run from project root) and the pipeline package
 sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from config import (
     ABI_PATH,
     BASE_DIR,
@@ -20,7 +22,13 @@ from config import (
     FEED_PATH,
     IPFS_GATEWAY,
     RPC_URL,
+    SEARCH_INDEX_PATH,
 )
+from feed_store import FeedStore
+from search_index import SearchIndex
+
+# How often the Judge portal polls the feed for new oracle results (0 = off)
+FEED_REFRESH_S = float(os.getenv("FEED_REFRESH_S", "5"))
 
 # --- Page config & layout ---
 st.set_page_config(page_title="JusticeVault", page_icon="⚖️", layout="wide")
@@ -62,14 +70,10 @@ def get_chain_label():
     return "Disconnected"
 
 
-def load_feed():
-    if not os.path.exists(FEED_PATH):
-        return []
-    try:
-        with open(FEED_PATH) as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
+@st.cache_resource
+def get_feed_store():
+    # One store per server process: the feed is parsed once per file change, not per rerun
+    return FeedStore(FEED_PATH)
 
 
 def get_evidence_list(contract, case_id):
@@ -86,13 +90,46 @@ def get_evidence_list(contract, case_id):
     return evidence_list
 
 
+@st.cache_resource
+def get_search_index():
+    return SearchIndex(SEARCH_INDEX_PATH)
+
+
 def feed_entry(case_id, index):
     """Get latest feed entry for (caseId, index)."""
-    feed = load_feed()
-    for e in reversed(feed):
-        if e.get("caseId") == case_id and e.get("index") == index:
-            return e
-    return None
+    return get_feed_store().get(case_id, index)
+
+
+_SOURCE_REF = re.compile(r"\[(\d+)\] (pp?)\. (\d+)")
+
+
+def link_sources(summary, ipfs_cid):
+    """Turn the brief's "**Sources:**" key into links that open the filing at the cited page."""
+    head, sep, sources = summary.rpartition("**Sources:**")
+    if not sep or not ipfs_cid:
+        return summary
+    linked = _SOURCE_REF.sub(
+        lambda m: f"<a href='{IPFS_GATEWAY}{ipfs_cid}#page={m.group(3)}' target='_blank'>{m.group(0)}</a>", sources
+    )
+    return f"{head}{sep}{linked}"
+
+
+def _watch_feed(case_id):
+    """
+    Poll the feed cheaply (one stat per tick) and rerun the page only when an
+    entry for the case on screen has changed since the last render.
+    """
+    store = get_feed_store()
+    seen = st.session_state.get("feed_version", 0)
+    version, changed = store.changes_since(seen)
+    st.session_state["feed_version"] = version
+    if any(cid == case_id for cid, _ in changed):
+        st.rerun()
+
+
+# st.fragment needs Streamlit ≥ 1.37; older versions refresh on interaction only
+if FEED_REFRESH_S > 0 and hasattr(st, "fragment"):
+    _watch_feed = st.fragment(run_every=FEED_REFRESH_S)(_watch_feed)
 
 
 # --- Role switcher ---
@@ -168,6 +205,79 @@ elif role == "Judge":
     st.header("🏛 Judicial Portal: Review Pending Evidence")
     st.caption("Evidence feed with integrity status and AI brief. Validate after review.")
 
+    # Cross-case search (briefs, parties, PII flags, status, CIDs) — no case ID needed
+    search_index = get_search_index()
+    search_index.sync(get_feed_store())
+    scol1, scol2 = st.columns([3, 1])
+    with scol1:
+        search_text = st.text_input(
+            "🔎 Search all cases",
+            placeholder="party, claim, statute, CID, PII type…",
+            key="judge_search",
+        )
+    with scol2:
+        search_status = st.multiselect(
+            "Status", ["BRIEF_GENERATED", "VALIDATED", "REJECTED"], key="judge_search_status"
+        )
+    if search_text.strip() or search_status:
+        hits = search_index.search(search_text, status=search_status or None, limit=25)
+        if hits:
+            st.dataframe(
+                [
+                    {
+                        "Case": h["caseId"],
+                        "Evidence #": h["index"],
+                        "Status": h["status"],
+                        "Integrity": "✅" if h["integrity_verified"] else "⚠️",
+                        "PII": ", ".join(h["pii_flags"]),
+                        "Match": h["snippet"],
+                        "Processed": h["timestamp_processed"],
+                    }
+                    for h in hits
+                ],
+                hide_index=True,
+            )
+            st.caption("Enter a case ID below to review it.")
+        else:
+            st.info("No matching evidence.")
+
+    # Semantic search over document chunks of every case (shared ChromaDB collection)
+    with st.expander("🧭 Related cases — search document text across all cases"):
+        related_query = st.text_input(
+            "Describe a party, statute or fact pattern",
+            placeholder="e.g. respondent Crescent Textiles, Section 489-F",
+            key="related_query",
+        )
+        rcol1, rcol2, rcol3 = st.columns([2, 1, 1])
+        with rcol1:
+            related_cases = st.text_input("Limit to case IDs (comma-separated)", key="related_cases")
+        with rcol2:
+            related_since = st.date_input("Ingested since", value=None, key="related_since")
+        with rcol3:
+            related_page = st.number_input("Page", min_value=0, value=0, step=1, key="related_page")
+        if related_query.strip():
+            from pipeline.rag import search_all_cases  # heavy (ChromaDB) — only when the panel is used
+
+            case_filter = [int(c) for c in related_cases.replace(" ", "").split(",") if c.isdigit()]
+            results = search_all_cases(
+                related_query,
+                page=int(related_page),
+                case_ids=case_filter or None,
+                since=datetime.combine(related_since, datetime.min.time()) if related_since else None,
+            )
+            if results.timed_out:
+                st.warning("Search exceeded its latency budget — narrow the case set or date range.")
+            elif not results.hits:
+                st.info("No matching document text in other cases.")
+            else:
+                st.caption(
+                    f"{len(results.case_ids())} case(s) · {results.elapsed_ms:.0f} ms"
+                    + (" · more on the next page" if results.has_more else "")
+                )
+                for hit in results.hits:
+                    st.markdown(f"**Case #{hit.case_id}** · chunk {hit.chunk_index} · similarity {hit.score:.2f}")
+                    st.caption(" ".join(hit.text.split())[:300])
+
     # Case selector
     case_id_input = st.number_input(
         "Case ID to review",
@@ -191,7 +301,8 @@ elif role == "Judge":
         else:
             st.subheader("Evidence History")
             st.caption(f"All evidence filed for Case #{case_id_input} — review and validate below.")
-            feed = load_feed()
+            st.session_state["feed_version"] = get_feed_store().refresh()
+            _watch_feed(case_id_input)
 
             for idx, ev in enumerate(evidence_list):
                 case_id, file_hash, ipfs_cid, lawyer, timestamp, isValidated = ev
@@ -226,7 +337,8 @@ elif role == "Judge":
                     # Case Brief card (highlight style)
                     if ai_summary:
                         st.markdown("**Case Brief**")
-                        st.markdown(f"<div class='case-brief-box'>{ai_summary.replace(chr(10), '<br>')}</div>", unsafe_allow_html=True)
+                        brief_html = link_sources(ai_summary, ipfs_cid).replace(chr(10), '<br>')
+                        st.markdown(f"<div class='case-brief-box'>{brief_html}</div>", unsafe_allow_html=True)
                     else:
                         st.caption("_No Case Brief yet (Oracle may still be processing)._")
 
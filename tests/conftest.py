@@ -7,11 +7,12 @@ from pathlib import Path
 
 import pytest
 
-# Add scripts to path so we can import oracle_utils
+# Add scripts to path so we can import oracle_utils; root for the pipeline package
 ROOT = Path(__file__).resolve().parent.parent
 SCRIPTS = ROOT / "scripts"
-if str(SCRIPTS) not in sys.path:
-    sys.path.insert(0, str(SCRIPTS))
+for _p in (SCRIPTS, ROOT):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
 
 
 @pytest.fixture
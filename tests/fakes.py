@@ -0,0 +1,202 @@
+"""
+Offline stand-ins for external services, shared by evals and benchmarks.
+
+HashingEmbeddingFunction replaces Chroma's default ONNX MiniLM model (which is
+downloaded on first use) with feature-hashed token counts, so retrieval runs with
+no network. It is lexical, not semantic — fine for plumbing, not for quality claims.
+
+FakeAnthropic mimics the slice of anthropic.Anthropic the pipeline uses
+(client.messages.create → response.content[0].text / response.usage). It writes a
+deterministic, correctly-structured brief by pulling party lines, claim sentences and
+dates straight out of the prompt's retrieved excerpts — enough to exercise retrieval
+and scoring end-to-end with no network. Its scores measure retrieval coverage, not
+model quality.
+
+pad_filing() buries an excerpt's paragraphs among pages of procedural boilerplate,
+giving retrieval evals realistic distractor chunks (court filings are mostly annexures).
+
+FakeEvent stands in for a contract log in oracle dispatch / scheduling tests.
+"""
+import hashlib
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+_PARTY_LINE = re.compile(
+    r"^\s*(?:Petitioner|Respondent|Plaintiff|Defendant|Complainant|Accused|Appellant|Applicant|"
+    r"Claimant|Employer|Employee|Prosecution)s?\b.*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_CLAIM_WORDS = re.compile(
+    r"\b(?:contends?|claims?|alleges?|alleged|seeks?|sought|violat\w*|charged|breach\w*|"
+    r"liable|prays?|demands?|denies|accused|compensation|damages)\b",
+    re.IGNORECASE,
+)
+_DATE = re.compile(
+    r"\b\d{1,2}(?:st|nd|rd|th)?\s+(?:January|February|March|April|May|June|July|August|"
+    r"September|October|November|December)\s+\d{4}\b"
+)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Procedural boilerplate: no party-role lines, claim verbs or full dates, so it only
+# adds retrieval noise and never supplies the answers being scored
+_FILLER = [
+    "The office report regarding service of notices has been perused and placed on the file.",
+    "Certified copies of the annexed documents are attached herewith for ready reference of this Honourable Court.",
+    "The learned counsel appearing on behalf of the parties were heard at some length on the question of adjournment.",
+    "Index of annexures: the documents are paginated serially and each page bears the stamp of the copying branch.",
+    "The court fee has been affixed in accordance with the schedule and the vakalatnama is duly executed.",
+    "The matter was fixed for arguments on the application for condonation of delay and remained part heard.",
+    "It is respectfully submitted that the record of the lower forum be summoned for perusal.",
+    "The translation of the vernacular documents has been verified by the official translator of the district courts.",
+    "Process fee was deposited and notices were issued through ordinary mode as well as registered post.",
+    "The reader of the court is directed to place the file before the learned presiding officer after the vacation.",
+    "An attested photocopy of the identity document is annexed for the limited purpose of identification.",
+    "The list of witnesses is to be filed within the time allowed under the applicable rules of procedure.",
+]
+
+
+def pad_filing(text: str, pages: int, seed: int = 0, page_chars: int = 3000) -> str:
+    """
+    Spread the excerpt's paragraphs evenly through `pages` pages of boilerplate
+    (the case caption stays first). pages=0 returns the text unchanged.
+    """
+    if pages <= 0:
+        return text
+    rng = random.Random(seed)
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    filler_blocks = []
+    for _ in range(pages):
+        block = []
+        while sum(len(b) for b in block) < page_chars:
+            block.append(rng.choice(_FILLER))
+        filler_blocks.append(" ".join(block))
+    out = [paragraphs[0]]
+    rest = paragraphs[1:]
+    for i, block in enumerate(filler_blocks):
+        out.append(block)
+        share = rest[i * len(rest) // pages:(i + 1) * len(rest) // pages]
+        out.extend(share)
+    return "\n\n".join(out)
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Deterministic bag-of-words embeddings via feature hashing (L2-normalised)."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = []
+        for text in input:
+            vec = [0.0] * self.dim
+            for token in _TOKEN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                vec[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "justicevault-hashing"
+
+    def get_config(self) -> dict[str, Any]:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(dim=config.get("dim", 384))
+
+
+def _excerpts(prompt: str) -> str:
+    marker = "RETRIEVED DOCUMENT EXCERPTS:"
+    return prompt.split(marker, 1)[1] if marker in prompt else prompt
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for fake usage accounting."""
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class _Text:
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class _Usage:
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class _Message:
+    content: list[_Text]
+    usage: _Usage
+    model: str
+    stop_reason: str = "end_turn"
+
+
+class _Messages:
+    def __init__(self, client: "FakeAnthropic"):
+        self._client = client
+
+    def create(self, model: str, max_tokens: int, messages: list[dict], **_kw) -> _Message:
+        prompt = "".join(m["content"] for m in messages if isinstance(m.get("content"), str))
+        if self._client.latency_s:
+            time.sleep(self._client.latency_s)
+        self._client.calls += 1
+        brief = self._client.write_brief(prompt)
+        return _Message([_Text(brief)], _Usage(approx_tokens(prompt), approx_tokens(brief)), model)
+
+
+class FakeAnthropic:
+    """Deterministic, offline replacement for anthropic.Anthropic (messages.create only)."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+        self.messages = _Messages(self)
+
+    @staticmethod
+    def write_brief(prompt: str) -> str:
+        text = _excerpts(prompt)
+        parties = list(dict.fromkeys(m.group(0).strip() for m in _PARTY_LINE.finditer(text)))
+        sentences = [s.strip() for s in _SENTENCE.split(re.sub(r"\s+", " ", text)) if s.strip()]
+        claims = [s for s in sentences if _CLAIM_WORDS.search(s)]
+        dates = list(dict.fromkeys(_DATE.findall(text)))
+        summary = sentences[:2]
+
+        def bullets(items: list[str], empty: str) -> str:
+            return "\n".join(f"- {item}" for item in items) if items else f"- {empty}"
+
+        return (
+            f"**Parties Involved:**\n{bullets(parties, 'Not stated in the excerpts')}\n\n"
+            f"**Key Claims:**\n{bullets(claims[:6], 'Not stated in the excerpts')}\n\n"
+            f"**Date of Incident / Relevance:**\n{bullets(dates, 'No dates in the excerpts')}\n\n"
+            f"**Summary:**\n{bullets(summary, 'No content retrieved')}"
+        )
+
+
+class FakeEvent(dict):
+    """
+    Just enough of a web3 contract log for the oracle's dispatch path: args.caseId /
+    args.ipfsCid / args.fileHash plus the fields that identify a log (transactionHash, logIndex).
+    """
+
+    def __init__(self, case_id: int, log_index: int, ipfs_cid: str = "", block_number: int = 1,
+                 file_hash: bytes = b"\0" * 32):
+        super().__init__(transactionHash=f"0x{log_index:064x}", logIndex=log_index, blockNumber=block_number)
+        self.args = SimpleNamespace(caseId=case_id, ipfsCid=ipfs_cid, fileHash=file_hash)
@@ -1,38 +1,73 @@
 """
-LangSmith evaluation runner for JusticeVault RAG pipeline.
+Evaluation runner for JusticeVault RAG pipeline.
 
-Uploads eval_dataset.json to LangSmith, runs the brief-generation pipeline
-against each of the 10 test cases, and scores on three dimensions:
+Runs the brief-generation pipeline against each of the 10 test cases in
+eval_dataset.json and scores on three dimensions:
   - party_recall       : expected party names found in brief
   - claims_recall      : expected claim keywords found in brief
   - structure_compliance: all 4 required section headers present
 
+Two modes:
+  LangSmith (default) — uploads the dataset to LangSmith and runs evaluate() there.
+  Local (--local)     — reads eval_dataset.json directly, runs cases through a worker
+                        pool, skips re-ingest of unchanged excerpts, caches generations
+                        by prompt hash and writes scored results to a JSON report.
+                        --offline (fake client + hashing embeddings in a separate
+                        Chroma store) needs no network or API keys at all.
+
 Usage:
     export LANGCHAIN_API_KEY=ls__...
     export LANGCHAIN_TRACING_V2=true
     export ANTHROPIC_API_KEY=sk-ant-...
     python tests/run_evals.py
+
+    python tests/run_evals.py --local --workers 8                # Claude, cached
+    python tests/run_evals.py --local --offline                  # no network at all
+    python tests/run_evals.py --local --offline --pad-pages 10   # excerpts buried in boilerplate
+    python tests/run_evals.py --local --offline --direct-tokens 0   # retrieval for every case
+
+Cases whose text is at most --direct-tokens (default: the pipeline's DIRECT_BRIEF_TOKENS)
+are briefed on their full text, as the pipeline's fast path does; the report records
+each case's route so scores can be compared with --direct-tokens 0.
 """
+import argparse
+import hashlib
 import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import anthropic
-from langsmith import Client, evaluate
 
-from pipeline.rag import ingest_text, generate_brief
+from pipeline.context import count_tokens
+from pipeline.embeddings import EmbeddingProvider
+from pipeline.graph import DIRECT_BRIEF_TOKENS
+import pipeline.rag as rag
+from pipeline.rag import (BRIEF_MODEL, build_brief_prompt, build_direct_context, complete_brief, ingest_text,
+                          generate_brief)
 from pipeline.observability import configure_tracing
-
-configure_tracing(project="justice-vault-evals")
+from tests.fakes import FakeAnthropic, HashingEmbeddingFunction, pad_filing
 
 DATASET_PATH = os.path.join(os.path.dirname(__file__), "eval_dataset.json")
 DATASET_NAME = "JusticeVault-Legal-Brief-Evals-v1"
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".eval_cache")
+REPORT_PATH = os.path.join(os.path.dirname(__file__), "eval_report.json")
 # High case_id offset so eval cases don't collide with real oracle ingests
 _EVAL_ID_OFFSET = 90_000
 
-ai_client = anthropic.Anthropic()
+_ai_client: anthropic.Anthropic | None = None
+
+
+def _get_ai_client() -> anthropic.Anthropic:
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = anthropic.Anthropic()
+    return _ai_client
 
 _REQUIRED_HEADERS = [
     "**Parties Involved:**",
@@ -84,7 +119,7 @@ def run_pipeline(inputs: dict) -> dict:
     """
     case_id = _EVAL_ID_OFFSET + inputs["id"]
     ingest_text(inputs["document_excerpt"], case_id)
-    brief = generate_brief(case_id, ai_client)
+    brief = generate_brief(case_id, _get_ai_client())
     return {"brief": brief}
 
 
@@ -92,7 +127,7 @@ def run_pipeline(inputs: dict) -> dict:
 # Dataset setup
 # ---------------------------------------------------------------------------
 
-def _ensure_dataset(client: Client, cases: list[dict]) -> str:
+def _ensure_dataset(client, cases: list[dict]) -> str:
     existing = {d.name for d in client.list_datasets()}
     if DATASET_NAME in existing:
         print(f"ℹ️  Using existing LangSmith dataset '{DATASET_NAME}'")
@@ -124,19 +159,218 @@ def _ensure_dataset(client: Client, cases: list[dict]) -> str:
     return DATASET_NAME
 
 
+# ---------------------------------------------------------------------------
+# Local mode
+# ---------------------------------------------------------------------------
+
+_EVALUATORS = [party_recall, claims_recall, structure_compliance]
+
+
+class GenerationCache:
+    """On-disk brief cache keyed by sha256(client, model, prompt)."""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+        if enabled:
+            os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(client_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{client_name}\n{BRIEF_MODEL}\n{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        try:
+            with open(os.path.join(self.root, f"{key}.json")) as f:
+                return json.load(f)["brief"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, key: str, brief: str) -> None:
+        if not self.enabled:
+            return
+        path = os.path.join(self.root, f"{key}.json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"brief": brief, "model": BRIEF_MODEL, "created": time.time()}, f)
+        os.replace(tmp, path)
+
+
+def make_client(name: str, latency_s: float = 0.0):
+    """Pluggable model client: 'anthropic' (real Claude) or 'fake' (offline, deterministic)."""
+    if name == "fake":
+        return FakeAnthropic(latency_s=latency_s)
+    if name == "anthropic":
+        return _get_ai_client()
+    raise ValueError(f"Unknown eval client '{name}' (expected 'anthropic' or 'fake')")
+
+
+def run_case_local(case: dict, client, client_name: str, cache: GenerationCache, pad_pages: int = 0,
+                   direct_tokens: int = DIRECT_BRIEF_TOKENS) -> dict:
+    """Ingest (unless unchanged) → retrieve → generate (unless cached) → score one case."""
+    started = time.perf_counter()
+    case_id = _EVAL_ID_OFFSET + case["id"]
+    document = pad_filing(case["document_excerpt"], pad_pages, seed=case["id"])
+    route = "direct" if direct_tokens and count_tokens(document) <= direct_tokens else "rag"
+    if route == "direct":
+        prompt, sources = build_direct_context(document)
+        chunk_count = len(sources)
+    else:
+        chunk_count = ingest_text(document, case_id, skip_if_unchanged=True)
+        prompt = build_brief_prompt(case_id)
+
+    key = GenerationCache.key(client_name, prompt)
+    brief = cache.get(key)
+    cached = brief is not None
+    if not cached:
+        brief = complete_brief(prompt, client)
+        cache.put(key, brief)
+
+    run = SimpleNamespace(outputs={"brief": brief})
+    example = SimpleNamespace(outputs={
+        "expected_parties":        case["expected_parties"],
+        "expected_claim_keywords": case["expected_claim_keywords"],
+    })
+    scores = {}
+    for evaluator in _EVALUATORS:
+        result = evaluator(run, example)
+        scores[result["key"]] = result["score"]
+    return {
+        "id":           case["id"],
+        "description":  case["description"],
+        "scores":       scores,
+        "cached":       cached,
+        "route":        route,
+        "chunk_count":  chunk_count,
+        "prompt_chars": len(prompt),
+        "prompt_tokens": count_tokens(prompt),
+        "elapsed_s":    round(time.perf_counter() - started, 3),
+        "brief":        brief,
+    }
+
+
+def run_local(
+    cases: list[dict],
+    client_name: str = "anthropic",
+    workers: int = 4,
+    use_cache: bool = True,
+    report_path: str = REPORT_PATH,
+    latency_s: float = 0.0,
+    pad_pages: int = 0,
+    direct_tokens: int = DIRECT_BRIEF_TOKENS,
+) -> dict:
+    """Run every case through a worker pool and write a scored JSON report."""
+    client = make_client(client_name, latency_s)
+    cache = GenerationCache(CACHE_DIR, enabled=use_cache)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda case: run_case_local(case, client, client_name, cache, pad_pages,
+                                                                direct_tokens), cases))
+    elapsed = time.perf_counter() - started
+
+    aggregate = {
+        evaluator.__name__: round(sum(r["scores"][evaluator.__name__] for r in results) / len(results), 3)
+        for evaluator in _EVALUATORS
+    } if results else {}
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "client":       client_name,
+        "model":        BRIEF_MODEL,
+        "workers":      workers,
+        "pad_pages":    pad_pages,
+        "direct_tokens": direct_tokens,
+        "direct_cases": sum(r["route"] == "direct" for r in results),
+        "avg_prompt_chars": round(sum(r["prompt_chars"] for r in results) / len(results)) if results else 0,
+        "avg_prompt_tokens": round(sum(r["prompt_tokens"] for r in results) / len(results)) if results else 0,
+        "elapsed_s":    round(elapsed, 3),
+        "cache_hits":   sum(r["cached"] for r in results),
+        "aggregate":    aggregate,
+        "cases":        results,
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def use_offline_embeddings() -> None:
+    """Swap in hashing embeddings, in their own Chroma store so they never mix with real ones."""
+    rag.EMBEDDING_FUNCTION = EmbeddingProvider(HashingEmbeddingFunction(), cache_path="")
+    rag.CHROMA_DIR = os.path.join(CACHE_DIR, "chroma_hashing")
+
+
+def main_local(args: argparse.Namespace, cases: list[dict]) -> None:
+    if args.offline:
+        args.client = "fake"
+        args.embeddings = "hashing"
+    if args.embeddings == "hashing":
+        use_offline_embeddings()
+    if args.cases:
+        wanted = {int(i) for i in args.cases.split(",")}
+        cases = [c for c in cases if c["id"] in wanted]
+    print(f"\n🧪 Local evaluation: {len(cases)} cases, client={args.client}, "
+          f"embeddings={args.embeddings}, workers={args.workers}\n")
+    report = run_local(
+        cases,
+        client_name=args.client,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        report_path=args.report,
+        latency_s=args.fake_latency,
+        pad_pages=args.pad_pages,
+        direct_tokens=args.direct_tokens,
+    )
+    print(f"\n📊 Evaluation complete in {report['elapsed_s']:.1f}s "
+          f"({report['cache_hits']}/{len(cases)} generations from cache)")
+    for metric, avg in report["aggregate"].items():
+        print(f"   {metric:25s}: {avg:.2f} (n={len(cases)})")
+    print(f"   {'avg prompt chars':25s}: {report['avg_prompt_chars']:,}")
+    print(f"   {'avg prompt tokens':25s}: {report['avg_prompt_tokens']:,} (local estimate)")
+    print(f"   {'full-text (direct) cases':25s}: {report['direct_cases']}/{len(cases)} "
+          f"(≤ {args.direct_tokens:,} tokens)")
+    print(f"   Report: {args.report}")
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="JusticeVault brief-generation evals")
+    parser.add_argument("--local", action="store_true", help="run locally instead of through LangSmith")
+    parser.add_argument("--client", choices=["anthropic", "fake"], default="anthropic",
+                        help="model client for --local (fake = offline, deterministic)")
+    parser.add_argument("--embeddings", choices=["default", "hashing"], default="default",
+                        help="embedding function for --local (hashing = offline, lexical)")
+    parser.add_argument("--offline", action="store_true", help="shorthand for --client fake --embeddings hashing")
+    parser.add_argument("--workers", type=int, default=4, help="parallel cases for --local")
+    parser.add_argument("--cases", help="comma-separated case ids to run (default: all)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and don't write the generation cache")
+    parser.add_argument("--report", default=REPORT_PATH, help="JSON report path for --local")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="seconds per fake model call")
+    parser.add_argument("--pad-pages", type=int, default=0,
+                        help="bury each excerpt among N pages of procedural boilerplate (retrieval stress)")
+    parser.add_argument("--direct-tokens", type=int, default=DIRECT_BRIEF_TOKENS,
+                        help="brief cases this short on their full text, like the pipeline (0 = always retrieve)")
+    args = parser.parse_args()
+
+    with open(DATASET_PATH) as f:
+        cases = json.load(f)
+
+    if args.local:
+        main_local(args, cases)
+        return
+
     api_key = os.getenv("LANGCHAIN_API_KEY", "")
     if not api_key:
-        print("❌ LANGCHAIN_API_KEY not set — cannot run LangSmith evaluations.")
+        print("❌ LANGCHAIN_API_KEY not set — cannot run LangSmith evaluations (use --local to run offline).")
         sys.exit(1)
 
-    with open(DATASET_PATH) as f:
-        cases = json.load(f)
+    from langsmith import Client, evaluate
 
+    configure_tracing(project="justice-vault-evals")
     client = Client()
     dataset_name = _ensure_dataset(client, cases)
 
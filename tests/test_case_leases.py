@@ -0,0 +1,72 @@
+"""Pytest for multi-instance oracle coordination: case leases, takeover, exactly-once dispatch."""
+import threading
+import time
+
+import monitor_vault
+from case_leases import LeaseStore
+from event_ledger import EventLedger
+from fakes import FakeEvent
+
+
+def test_lease_is_exclusive_until_it_expires(tmp_path):
+    db = str(tmp_path / "leases.sqlite")
+    a = LeaseStore(db, "a", ttl_s=0.2)
+    b = LeaseStore(db, "b", ttl_s=0.2)
+    assert a.acquire(7) and a.acquire(7)        # re-acquiring your own lease extends it
+    assert not b.acquire(7) and b.owner(7) == "a"
+
+    time.sleep(0.3)                             # a stopped renewing (crashed)
+    assert b.acquire(7) and b.owner(7) == "b"
+    assert a.renew() == [7]                     # a learns it lost the case
+    b.release(7)
+    assert a.acquire(7)
+
+
+def test_instances_split_events_without_duplicates(tmp_path, monkeypatch):
+    """Two instances dispatching the same event stream handle each event exactly once."""
+    db, ledger_db = str(tmp_path / "leases.sqlite"), str(tmp_path / "events.sqlite")
+    handled, lock = [], threading.Lock()
+
+    def handle(event):
+        time.sleep(0.02)
+        with lock:
+            handled.append((threading.current_thread().name, event["logIndex"]))
+
+    monkeypatch.setattr(monitor_vault, "_HANDLERS", {"EvidenceFiled": handle, "EvidenceValidated": handle})
+    events = [("EvidenceFiled", FakeEvent(case_id=i % 10, log_index=i)) for i in range(40)]
+
+    def instance(name):
+        leases, ledger = LeaseStore(db, name), EventLedger(ledger_db)
+        pending = list(events)
+        while pending:
+            pending = monitor_vault.dispatch(pending, leases, ledger)
+
+    workers = [threading.Thread(target=instance, args=(n,), name=n) for n in ("a", "b")]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert sorted(i for _, i in handled) == list(range(40))
+    assert {name for name, _ in handled} == {"a", "b"}
+    # Events of one case keep their order even when they were handled by different instances
+    for case_id in range(10):
+        assert [i for _, i in handled if i % 10 == case_id] == sorted(i for _, i in handled if i % 10 == case_id)
+
+
+def test_dead_instance_cases_are_taken_over(tmp_path, monkeypatch):
+    db = str(tmp_path / "leases.sqlite")
+    LeaseStore(db, "crashed", ttl_s=0.2).acquire(3)
+    handled = []
+    monkeypatch.setattr(monitor_vault, "_HANDLERS", {"EvidenceFiled": lambda e: handled.append(e["logIndex"])})
+    survivor, ledger = LeaseStore(db, "survivor", ttl_s=0.2), EventLedger(str(tmp_path / "events.sqlite"))
+    events = [("EvidenceFiled", FakeEvent(3, 0)), ("EvidenceFiled", FakeEvent(3, 1)), ("EvidenceFiled", FakeEvent(4, 2))]
+
+    waiting = monitor_vault.dispatch(events, survivor, ledger)
+    assert handled == [2] and len(waiting) == 2      # case 3 is still leased by the crashed instance
+
+    time.sleep(0.3)
+    assert monitor_vault.dispatch(waiting, survivor, ledger) == []
+    assert handled == [2, 0, 1]
+    restarted = EventLedger(str(tmp_path / "events.sqlite"))
+    assert monitor_vault.dispatch(events, survivor, restarted) == [] and handled == [2, 0, 1]   # restart: nothing re-runs
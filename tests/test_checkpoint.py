@@ -0,0 +1,61 @@
+"""Pytest for the durable pipeline checkpointer: restart survival + retention pruning."""
+from datetime import datetime, timedelta, timezone
+from typing import TypedDict
+
+from langgraph.graph import StateGraph, END
+
+from pipeline.checkpoint import CompressedSerializer, open_checkpointer, prune_terminal_threads
+
+
+class _State(TypedDict):
+    status: str
+    ai_brief: str
+
+
+def _graph(saver):
+    builder = StateGraph(_State)
+    builder.add_node("brief_generated", lambda s: {"status": "BRIEF_GENERATED", "ai_brief": "x" * 2000})
+    builder.add_node("validate", lambda s: {"status": "VALIDATED"})
+    builder.set_entry_point("brief_generated")
+    builder.add_edge("brief_generated", "validate")
+    builder.add_edge("validate", END)
+    return builder.compile(checkpointer=saver, interrupt_before=["validate"])
+
+
+def _cfg(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_paused_thread_survives_restart(tmp_path):
+    """A case paused before VALIDATE can be resumed by a fresh process."""
+    db = str(tmp_path / "checkpoints.sqlite")
+    _graph(open_checkpointer(db)).invoke({"status": "RECEIVED", "ai_brief": ""}, _cfg("case_1"))
+
+    restarted = _graph(open_checkpointer(db))
+    assert restarted.get_state(_cfg("case_1")).next == ("validate",)
+    assert restarted.invoke(None, _cfg("case_1"))["status"] == "VALIDATED"
+
+
+def test_compressed_serializer_roundtrip():
+    """Large payloads are compressed; small ones pass through unchanged."""
+    serde = CompressedSerializer()
+    big = {"ai_brief": "Petitioner " * 500}
+    type_, data = serde.dumps_typed(big)
+    assert type_.startswith("zlib+") and len(data) < 1000
+    assert serde.loads_typed((type_, data)) == big
+    assert not serde.dumps_typed({"status": "RECEIVED"})[0].startswith("zlib+")
+
+
+def test_prune_only_terminal_threads_past_retention(tmp_path):
+    """Terminal threads older than retention are pruned; paused threads are kept."""
+    saver = open_checkpointer(str(tmp_path / "checkpoints.sqlite"))
+    graph = _graph(saver)
+    graph.invoke({"status": "RECEIVED", "ai_brief": ""}, _cfg("paused"))
+    graph.invoke({"status": "RECEIVED", "ai_brief": ""}, _cfg("done"))
+    graph.invoke(None, _cfg("done"))
+
+    assert prune_terminal_threads(saver, retention_s=3600) == []
+    later = datetime.now(timezone.utc) + timedelta(hours=2)
+    assert prune_terminal_threads(saver, retention_s=3600, now=later) == ["done"]
+    assert saver.get_tuple(_cfg("done")) is None
+    assert graph.get_state(_cfg("paused")).next == ("validate",)
@@ -0,0 +1,126 @@
+"""Pytest for the structure-aware legal chunker and brief provenance."""
+import pytest
+
+import pipeline.rag as rag
+from fakes import FakeAnthropic, HashingEmbeddingFunction
+from pipeline.chunking import PAGE_BREAK, LegalChunker
+
+FILING = (
+    "IN THE COURT OF CIVIL JUDGE, LAHORE\nCase No. CV-2024-1142\n\n"
+    "Petitioner: Mr. Tariq Mahmood, Resident of House No. 14,\nModel Town, Lahore.\n"
+    "Respondent: Mrs. Saima Akhtar, Owner of the said premises.\n\f"
+    "FACTS OF THE CASE:\n"
+    "1. The Petitioner rented the premises on 1st March 2022 at PKR 45,000 per month.\n"
+    "2. On 15th January 2024 the Respondent evicted the Petitioner without a court order.\n\f"
+    "PRAYER:\n" + "The Petitioner seeks compensation for damages. " * 12
+)
+
+
+def test_chunks_follow_structure_and_record_provenance():
+    chunks = LegalChunker(chunk_size=300, min_section_chars=100).split(FILING)
+    assert all(FILING[c.start:c.end] == c.text for c in chunks)
+    caption, facts, *prayer = chunks
+    assert caption.section.startswith("IN THE COURT") and "Respondent: Mrs. Saima Akhtar" in caption.text
+    assert caption.page == 1 and caption.page_end == 1
+    assert facts.section == "FACTS OF THE CASE" and facts.text.startswith("FACTS OF THE CASE:")
+    assert facts.page == 2 and "2. On 15th January" in facts.text
+    assert len(prayer) == 2 and all(c.section == "PRAYER" and c.page == 3 for c in prayer)
+    assert all(len(c.text) <= 300 for c in prayer) and prayer[1].text.endswith("damages.")
+
+
+def test_page_stream_chunks_like_the_whole_text():
+    """split_pages carries open chunks and sections across pages and matches split() exactly."""
+    pages = FILING.split(PAGE_BREAK) + ["ANNEXURE A\n" + "Receipt of rent paid in cash. " * 30, "", "3. Continued."] * 3
+    for size, min_section in ((300, 100), (120, 0), (1000, 200)):
+        chunker = LegalChunker(chunk_size=size, min_section_chars=min_section)
+        assert list(chunker.split_pages(iter(pages))) == chunker.split(PAGE_BREAK.join(pages))
+
+
+def test_ingest_streams_pages_in_bounded_batches(tmp_path, monkeypatch):
+    """A document is read page by page and stored INGEST_BATCH_CHUNKS at a time, never whole."""
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(rag, "_chroma_client", None)
+    monkeypatch.setattr(rag, "EMBEDDING_FUNCTION", HashingEmbeddingFunction())
+    monkeypatch.setattr(rag, "CHUNKER", LegalChunker(chunk_size=300, min_section_chars=100))
+    monkeypatch.setattr(rag, "INGEST_BATCH_CHUNKS", 4)
+    page = "FACTS OF THE CASE:\n" + "\n".join(f"{i}. The Respondent withheld wages for month {i}." for i in range(1, 21))
+    read = []
+
+    def pages(path):
+        for n in range(50):
+            read.append(n)
+            yield page
+    batches = []
+    monkeypatch.setattr(rag, "iter_pages", pages)
+    monkeypatch.setattr(rag, "_embed", lambda texts: batches.append((len(read), len(texts))) or
+                        list(HashingEmbeddingFunction()(texts)))
+
+    count = rag.ingest_document("bundle.pdf", 702)
+    assert count == len(rag.CHUNKER.split(PAGE_BREAK.join([page] * 50)))
+    assert max(n for _, n in batches) == 4 and batches[0][0] < 10      # embedding starts after a few pages
+    stored = rag._get_collection(702).get(include=["metadatas"])
+    assert {m["page"] for m in stored["metadatas"]} == set(range(1, 51))
+    assert len(rag._get_all_cases_collection().get(where={"case_id": 702})["ids"]) == count
+
+    # Re-ingest replaces the case, in the live and the shared collection
+    assert rag.ingest_document("bundle.pdf", 702, text=page) == len(rag.CHUNKER.split(page))
+    assert len(rag._get_all_cases_collection().get(where={"case_id": 702})["ids"]) == rag._get_collection(702).count()
+
+    # A re-ingest failing part-way leaves the previous version whole, and no staging copy
+    short = rag._get_collection(702).get(include=["documents"])["documents"]
+
+    def failing(texts):
+        if len(batches) > 2:
+            raise RuntimeError("embedding backend went away")
+        batches.append((len(read), len(texts)))
+        return list(HashingEmbeddingFunction()(texts))
+    monkeypatch.setattr(rag, "_embed", failing)
+    with pytest.raises(RuntimeError):
+        rag.ingest_document("bundle.pdf", 702)
+    assert rag._get_collection(702).get(include=["documents"])["documents"] == short
+    assert len(rag._get_all_cases_collection().get(where={"case_id": 702})["ids"]) == len(short)
+    assert rag._lexical_index().count("case_702") == len(short)
+    names = {c if isinstance(c, str) else c.name for c in rag._get_client().list_collections()}
+    assert "case_702_staging" not in names and rag._lexical_index().count("case_702_staging") == 0
+
+    # So does a swap that cannot rename the staging copy in, or a caller refusing the commit
+    monkeypatch.setattr(rag, "_embed", lambda texts: list(HashingEmbeddingFunction()(texts)))
+    rename = rag._rename_collection
+
+    def stuck(collection, name):
+        if collection.name.endswith("_staging"):
+            raise RuntimeError("rename failed")
+        rename(collection, name)
+    monkeypatch.setattr(rag, "_rename_collection", stuck)
+    with pytest.raises(RuntimeError):
+        rag.ingest_document("bundle.pdf", 702, text="FACTS OF THE CASE:\n1. Replaced.")
+    monkeypatch.setattr(rag, "_rename_collection", rename)
+    with pytest.raises(ValueError):
+        rag.ingest_document("bundle.pdf", 702, text="FACTS OF THE CASE:\n1. Replaced.",
+                            before_commit=lambda: (_ for _ in ()).throw(ValueError("flagged")))
+    assert rag._get_collection(702).get(include=["documents"])["documents"] == short
+    assert rag._lexical_index().count("case_702") == len(short)
+    names = {c if isinstance(c, str) else c.name for c in rag._get_client().list_collections()}
+    assert names == {"case_702", rag.ALL_CASES_COLLECTION}
+
+
+def test_brief_cites_pages_of_its_excerpts(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(rag, "_chroma_client", None)
+    monkeypatch.setattr(rag, "EMBEDDING_FUNCTION", HashingEmbeddingFunction())
+    monkeypatch.setattr(rag, "CHUNKER", LegalChunker(chunk_size=300, min_section_chars=100))
+    assert rag.ingest_text(FILING, 701) == 4
+
+    stored = rag._get_collection(701).get(include=["metadatas"])
+    assert {m["page"] for m in stored["metadatas"]} == {1, 2, 3}
+
+    # The whole filing fits the budget, so its adjacent chunks merge into one passage
+    brief = rag.generate_brief(701, FakeAnthropic())
+    assert brief.endswith("**Sources:** [1] pp. 1–3 (IN THE COURT OF CIVIL JUDGE, LAHORE)")
+    assert rag.format_sources([{"ref": 2, "page": 4, "page_end": 4, "section": ""}]) == "**Sources:** [2] p. 4"
+
+    # Fast path: the full text, one numbered passage per chunk, same citation key
+    direct, passages = rag.generate_direct_brief(FILING, FakeAnthropic())
+    assert passages == 4 and "Tariq Mahmood" in direct
+    assert direct.endswith("**Sources:** [1] p. 1 (IN THE COURT OF CIVIL JUDGE, LAHORE) · [2] p. 2 (FACTS OF THE CASE) "
+                           "· [3] p. 3 (PRAYER) · [4] p. 3 (PRAYER)")
@@ -0,0 +1,28 @@
+"""Pytest for token-budgeted context assembly: overlap merging, budget filling, relevance order."""
+from pipeline.context import assemble_context, count_tokens, merge_overlap
+
+CHUNKS = {
+    0: "The petitioner Ayesha Siddiqui was employed by Crescent Textiles Ltd. since 2015.",
+    1: "Crescent Textiles Ltd. since 2015. Her services were terminated on 3 March 2024.",
+    2: "The hearing was adjourned twice at the request of counsel for the respondent.",
+    5: "She claims reinstatement and back benefits under the Industrial Relations Act 2012.",
+}
+
+
+def test_merge_overlap_drops_shared_text():
+    merged = merge_overlap(CHUNKS[0], CHUNKS[1])
+    assert merged.count("Crescent Textiles") == 1 and merged.endswith("3 March 2024.")
+    assert merge_overlap("alpha", "beta") == "alpha beta"
+
+
+def test_assemble_fills_budget_by_relevance_and_merges_neighbours():
+    ranked = [(5, CHUNKS[5]), (0, CHUNKS[0]), (1, CHUNKS[1]), (2, CHUNKS[2])]
+    tight = count_tokens(CHUNKS[5]) + count_tokens(CHUNKS[0]) + 10
+    assert [p.text for p in assemble_context(ranked, tight)] == [CHUNKS[0], CHUNKS[5]]
+
+    roomy = assemble_context(ranked, 10_000)
+    assert [(p.first, p.last) for p in roomy] == [(0, 2), (5, 5)]
+    assert roomy[0].text.startswith("The petitioner") and "adjourned" in roomy[0].text
+    assert sum(count_tokens(p.text) for p in roomy) < sum(count_tokens(c) for c in CHUNKS.values())
+
+    assert assemble_context(ranked, 5) == []
@@ -0,0 +1,83 @@
+"""Pytest for cross-case semantic search: shared collection mirroring, filters, pagination, budget."""
+import threading
+import time
+
+import pytest
+
+import pipeline.rag as rag
+from fakes import HashingEmbeddingFunction
+
+
+@pytest.fixture
+def chroma(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(rag, "_chroma_client", None)
+    monkeypatch.setattr(rag, "EMBEDDING_FUNCTION", HashingEmbeddingFunction())
+    rag.ingest_text("Respondent Crescent Textiles terminated the petitioner without notice.", 501)
+    rag.ingest_text("The accused issued a cheque that was dishonoured under Section 489-F.", 502)
+    rag.ingest_text("Crescent Textiles failed to pay overtime wages to the complainant.", 503)
+    yield
+
+
+def test_one_query_spans_all_cases(chroma):
+    """A single query finds every case mentioning a party; case_ids restricts the case set."""
+    results = rag.search_all_cases("Crescent Textiles", page_size=2)
+    assert set(results.case_ids()) == {501, 503}
+    assert results.has_more and not results.timed_out
+
+    restricted = rag.search_all_cases("Crescent Textiles", case_ids=[503, 502])
+    assert restricted.hits[0].case_id == 503
+    assert {h.case_id for h in restricted.hits} <= {502, 503}
+
+    assert rag.search_all_cases("Crescent Textiles", since="2999-01-01").hits == []
+
+
+def test_reingest_replaces_shared_rows_and_pages(chroma):
+    """Re-ingesting a case replaces its rows in the shared collection; pages do not overlap."""
+    rag.ingest_text("Dispute over a land lease in Lahore.", 501)
+    top = rag.search_all_cases("Crescent Textiles", page_size=1)
+    assert top.hits[0].case_id == 503
+
+    first, second = (rag.search_all_cases("case", page=p, page_size=2) for p in (0, 1))
+    ids = [(h.case_id, h.chunk_index) for h in first.hits + second.hits]
+    assert len(ids) == len(set(ids)) == 3 and not second.has_more
+
+
+def test_budget_exceeded_returns_timed_out(chroma, monkeypatch):
+    """A query slower than the latency budget comes back flagged, not hung."""
+    slow = rag._get_all_cases_collection()
+    real_query = slow.query
+
+    def sleepy(*a, **kw):
+        time.sleep(0.3)
+        return real_query(*a, **kw)
+
+    monkeypatch.setattr(rag, "_get_all_cases_collection", lambda: slow)
+    monkeypatch.setattr(slow, "query", sleepy)
+    result = rag.search_all_cases("Crescent", budget_ms=50)
+    assert result.timed_out and result.hits == []
+
+
+def test_abandoned_queries_do_not_queue_later_searches(chroma, monkeypatch):
+    """With every worker held by timed-out queries, a new search is turned away at once."""
+    slow = rag._get_all_cases_collection()
+    real_query, release = slow.query, threading.Event()
+
+    def stuck(*a, **kw):
+        release.wait(5)
+        return real_query(*a, **kw)
+
+    monkeypatch.setattr(rag, "_get_all_cases_collection", lambda: slow)
+    monkeypatch.setattr(slow, "query", stuck)
+    for _ in range(rag._SEARCH_WORKERS):
+        assert rag.search_all_cases("Crescent", budget_ms=20).timed_out
+    started = time.perf_counter()
+    assert rag.search_all_cases("Crescent", budget_ms=1000).timed_out
+    assert time.perf_counter() - started < 0.5
+
+    release.set()
+    monkeypatch.setattr(slow, "query", real_query)
+    deadline = time.perf_counter() + 5
+    while rag._search_slots._value < rag._SEARCH_WORKERS and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert rag.search_all_cases("Crescent", budget_ms=1000).hits
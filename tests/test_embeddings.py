@@ -0,0 +1,55 @@
+"""Pytest for the embedding provider: batching, quantized codecs, cache."""
+import threading
+
+import numpy as np
+import pytest
+
+from fakes import HashingEmbeddingFunction
+from pipeline.embeddings import EmbeddingProvider, VectorCodec
+
+TEXTS = [f"Section {i} of the Contract Act 1872 was breached by respondent {i % 7}." for i in range(50)]
+
+
+class CountingBackend:
+    name = "counting"
+
+    def __init__(self):
+        self.inner = HashingEmbeddingFunction(dim=64)
+        self.batches: list[int] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.batches.append(len(texts))
+        return self.inner(texts)
+
+
+@pytest.mark.parametrize("dtype,max_error", [("float32", 0.0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_codec_round_trip_and_size(dtype, max_error):
+    vectors = np.asarray(HashingEmbeddingFunction(dim=64)(TEXTS), dtype=np.float32)
+    codec = VectorCodec(dtype)
+    blobs = codec.encode(vectors)
+    assert all(len(b) == codec.bytes_per_vector(64) for b in blobs)
+    assert np.abs(codec.decode(blobs) - vectors).max() <= max_error
+    with pytest.raises(ValueError):
+        VectorCodec("bfloat16")
+
+
+def test_provider_batches_and_caches(tmp_path):
+    backend = CountingBackend()
+    provider = EmbeddingProvider(backend, batch_size=8, threads=3, cache_dtype="int8",
+                                 cache_path=str(tmp_path / "cache.sqlite"))
+    first = provider(TEXTS)
+    assert sorted(backend.batches) == sorted([8] * 6 + [2])
+    # Fresh vectors reach the vector store unquantized
+    exact = np.asarray(backend.inner(TEXTS), dtype=np.float32)
+    assert all(np.array_equal(a, b) for a, b in zip(first, exact))
+
+    # A cache hit skips inference and serves the vector at cache precision
+    again = provider(TEXTS[:10] + ["a brand new chunk"])
+    assert backend.batches[-1] == 1
+    errors = [np.abs(a - b).max() for a, b in zip(first[:10], again[:10])]
+    assert 0 < max(errors) <= 1e-2
+    stats = provider.stats()
+    assert stats["embedded"] == 51 and stats["cache_hits"] == 10 and stats["chunks_per_s"] > 0
+    assert provider.signature == "counting"
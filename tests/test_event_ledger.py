@@ -0,0 +1,146 @@
+"""Pytest for the processed-events ledger: crash replay without duplicate work, compaction."""
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import RetryPolicy
+
+import monitor_vault
+import pipeline.graph as graph
+from case_leases import LeaseStore
+from event_ledger import EventLedger, event_key
+from fakes import FakeEvent
+from feed_store import FeedStore
+from pipeline.errors import is_transient
+from pipeline.ipfs import FetchResult
+from pipeline.spool import DocumentSpool
+from search_index import SearchIndex
+
+
+class _Crash(BaseException):
+    """The oracle process dying mid-handler (not an error the pipeline would catch)."""
+
+
+class _Fetcher:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def fetch(self, cid, expected_hash):
+        self.calls["download"] += 1
+        return FetchResult(b"%PDF-1.4 test", "stub", True, 0.0)
+
+
+@pytest.fixture
+def oracle(monkeypatch, tmp_path):
+    """An oracle runtime over the real graph with stubbed IPFS / RAG / Claude; counts calls per node."""
+    calls = {"download": 0, "ingest": 0, "brief": 0, "crash_at": None}
+
+    def brief(case_id, client):
+        calls["brief"] += 1
+        if calls.pop("crash_at", None) == "brief":
+            raise _Crash()
+        calls.pop("during_brief", lambda: None)()
+        return "**Parties Involved:** A v. B"
+
+    monkeypatch.setattr(graph, "_spool", DocumentSpool(str(tmp_path / "spool")))
+    monkeypatch.setattr(graph, "_fetcher", _Fetcher(calls))
+    monkeypatch.setattr(graph, "DIRECT_BRIEF_TOKENS", 0)                # every filing takes the retrieval path
+    monkeypatch.setattr(graph, "iter_pages", lambda path: iter(["Petitioner: A. Respondent: B."]))
+    monkeypatch.setattr(graph, "ingest_document",
+                        lambda path, case_id, text=None, pages=None, before_commit=None:
+                        calls.update(ingest=calls["ingest"] + 1) or 3)
+    monkeypatch.setattr(graph, "generate_brief", brief)
+    fast = RetryPolicy(initial_interval=0.0, jitter=False, max_attempts=1, retry_on=is_transient)
+    monkeypatch.setattr(graph, "_RETRY_POLICIES", {"receive": fast, "embedding": fast, "analysis": fast})
+    monkeypatch.setattr(monitor_vault, "_get_evidence_index", lambda case_id: 0)
+
+    feed = FeedStore(str(tmp_path / "evidence_feed.json"))
+    checkpointer = MemorySaver()
+    rt = monitor_vault._Runtime(
+        w3=None, contract=None, checkpointer=checkpointer,
+        pipeline_graph=graph.build_graph(None, lambda path, h: True, checkpointer),
+        feed_store=feed, search_index=SearchIndex(str(tmp_path / "search.sqlite")),
+        leases=LeaseStore(str(tmp_path / "leases.sqlite"), "oracle"),
+        ledger=EventLedger(str(tmp_path / "events.sqlite"), feed),
+    )
+    monkeypatch.setattr(monitor_vault, "_runtime", rt)
+    return rt, calls
+
+
+def _restart(rt, tmp_path):
+    """A fresh ledger connection, as after a process restart (the checkpointer survives)."""
+    rt.ledger = EventLedger(str(tmp_path / "events.sqlite"), rt.feed_store)
+
+
+def test_replay_after_crash_past_the_feed_write_runs_nothing(oracle, tmp_path):
+    rt, calls = oracle
+    event = FakeEvent(7, 0, ipfs_cid="QmTest")
+    rt.ledger.begin(event_key(event), 7, 1, "oracle")
+    monitor_vault.handle_filed_event(event)           # feed written; process dies before complete()
+    assert rt.ledger.status(event_key(event)) == "started"
+
+    _restart(rt, tmp_path)
+    assert monitor_vault.dispatch([("EvidenceFiled", event)], rt.leases, rt.ledger) == []
+    assert calls == {"download": 1, "ingest": 1, "brief": 1}
+    assert len(rt.feed_store.entries()) == 1 and rt.ledger.status(event_key(event)) == "done"
+
+
+def test_replay_after_crash_mid_pipeline_resumes_at_the_failed_node(oracle, tmp_path):
+    rt, calls = oracle
+    event = FakeEvent(7, 0, ipfs_cid="QmTest")
+    calls["crash_at"] = "brief"
+    with pytest.raises(_Crash):
+        monitor_vault.dispatch([("EvidenceFiled", event)], rt.leases, rt.ledger)
+    rt.leases.release(7)
+    assert rt.feed_store.entries() == []
+
+    _restart(rt, tmp_path)
+    assert monitor_vault.dispatch([("EvidenceFiled", event)], rt.leases, rt.ledger) == []
+    # RECEIVE and EMBEDDING are not redone; only the interrupted ANALYSIS call repeats
+    assert calls == {"download": 1, "ingest": 1, "brief": 2}
+    [entry] = rt.feed_store.entries()
+    assert entry["status"] == "BRIEF_GENERATED" and entry["event_key"] == event_key(event)
+
+    # Delivered once more (overlapping block range): nothing runs, nothing is appended
+    monitor_vault.dispatch([("EvidenceFiled", event)], rt.leases, rt.ledger)
+    assert calls["brief"] == 2 and len(rt.feed_store.entries()) == 1
+
+
+def test_identical_refiling_is_a_new_run(oracle):
+    """Replay is decided by the event's ledger key: the same document filed again runs again."""
+    rt, calls = oracle
+    first, refiled = FakeEvent(7, 0, ipfs_cid="QmTest"), FakeEvent(7, 1, ipfs_cid="QmTest")
+    assert monitor_vault.dispatch([("EvidenceFiled", first), ("EvidenceFiled", refiled)], rt.leases, rt.ledger) == []
+    assert calls == {"download": 2, "ingest": 2, "brief": 2}
+    assert [e["event_key"] for e in rt.feed_store.entries()] == [event_key(first), event_key(refiled)]
+
+
+def test_lease_taken_over_mid_run_stops_before_the_feed_write(oracle, tmp_path):
+    rt, calls = oracle
+    event = FakeEvent(7, 0, ipfs_cid="QmTest")
+
+    def stall_past_ttl():
+        # This instance stalls, its lease expires and another instance takes the case over
+        rt.leases._conn.execute("UPDATE leases SET owner = 'other', expires_at = expires_at + 60 WHERE case_id = 7")
+        assert rt.leases.renew() == [7]             # what the heartbeat thread does
+
+    calls["during_brief"] = stall_past_ttl
+    assert monitor_vault.dispatch([("EvidenceFiled", event)], rt.leases, rt.ledger) == [("EvidenceFiled", event)]
+    assert rt.feed_store.entries() == [] and rt.ledger.status(event_key(event)) == "started"
+    assert rt.leases.owner(7) == "other"            # the new owner's lease is left in place
+
+
+def test_compaction_stops_below_unfinished_events(tmp_path):
+    ledger = EventLedger(str(tmp_path / "events.sqlite"))
+    for block in (10, 11, 12, 13):
+        ledger.begin(f"0x{block}:0", 1, block, "a")
+        if block != 12:
+            ledger.complete(f"0x{block}:0")
+
+    assert ledger.compact(20) == 2                    # 10, 11 folded; 12 still running
+    assert ledger.compacted_through == 11
+    assert ledger.is_done("0x10:0", 10) and ledger.is_done("0x13:0", 13) and not ledger.is_done("0x12:0", 12)
+    assert ledger.counts() == {"started": 1, "done": 1}
+
+    ledger.complete("0x12:0")
+    assert ledger.compact(20) == 2 and ledger.compacted_through == 20
+    assert ledger.compact(15) == 0 and ledger.compacted_through == 20     # the watermark never moves back
+    assert ledger.is_done("never-seen:0", 19)
@@ -0,0 +1,70 @@
+"""Pytest for the evidence feed store: mtime-cached reads, (caseId, index) lookups, change queries."""
+import json
+
+from feed_store import FeedStore
+
+
+def _entry(case_id, index, status):
+    return {"caseId": case_id, "index": index, "status": status}
+
+
+def test_reads_once_per_change_and_indexes_latest(tmp_path, monkeypatch):
+    """The feed is parsed only when the file changes; a newer entry for a key shadows the old one."""
+    path = tmp_path / "evidence_feed.json"
+    store = FeedStore(str(path))
+    assert store.get(101, 0) is None and store.version == 0
+
+    store.append(_entry(101, 0, "REJECTED"))
+    store.append(_entry(102, 0, "BRIEF_GENERATED"))
+    store.append(_entry(101, 0, "BRIEF_GENERATED"))
+
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(json, "load", lambda f: loads.append(1) or real_load(f))
+    for _ in range(5):
+        assert store.get(101, 0)["status"] == "BRIEF_GENERATED"
+        assert store.get(102, 0)["status"] == "BRIEF_GENERATED"
+    assert len(loads) == 1
+    assert list(store.for_case(101)) == [0]
+
+
+def test_changes_since_returns_only_new_keys(tmp_path):
+    """changes_since(v) lists keys appended after version v; a stale future version resyncs everything."""
+    store = FeedStore(str(tmp_path / "evidence_feed.json"))
+    store.append(_entry(1, 0, "BRIEF_GENERATED"))
+    version = store.version
+
+    store.append(_entry(2, 0, "BRIEF_GENERATED"))
+    store.append(_entry(2, 1, "REJECTED"))
+    current, changed = store.changes_since(version)
+    assert current == 3 and changed == [(2, 0), (2, 1)]
+    assert store.changes_since(current) == (3, [])
+    assert sorted(store.changes_since(99)[1]) == [(1, 0), (2, 0), (2, 1)]
+
+
+def _append_many(path, worker, count):
+    store = FeedStore(path)
+    for i in range(count):
+        store.append(_entry(worker, i, "BRIEF_GENERATED"))
+
+
+def test_appends_from_several_processes_are_all_kept(tmp_path):
+    """Concurrent oracle instances append through the feed lock; no entry is lost."""
+    import multiprocessing
+
+    path = str(tmp_path / "evidence_feed.json")
+    procs = [multiprocessing.get_context("fork").Process(target=_append_many, args=(path, w, 25)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert FeedStore(path).version == 100
+
+
+def test_entry_for_an_event_already_in_the_feed_is_not_appended(tmp_path):
+    store = FeedStore(str(tmp_path / "evidence_feed.json"))
+    assert not store.has_event("0xabc:0")
+    assert store.append({**_entry(101, 0, "BRIEF_GENERATED"), "event_key": "0xabc:0"}) == 1
+    assert store.append({**_entry(101, 0, "BRIEF_GENERATED"), "event_key": "0xabc:0"}) == 1
+    assert store.append(_entry(101, 0, "VALIDATED")) == 2      # entries without a key always append
+    assert store.has_event("0xabc:0") and store.version == 2
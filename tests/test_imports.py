@@ -0,0 +1,25 @@
+"""Entry points must not pull heavy SDKs in at import time (see benchmarks/bench_imports.py)."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "scripts"
+
+_HEAVY = ("anthropic", "chromadb", "langgraph", "langsmith", "pypdf", "web3")
+
+
+def _loaded_after_import(module: str) -> list[str]:
+    probe = (
+        f"import json, sys; sys.path[:0] = [{str(SCRIPTS)!r}, {str(ROOT)!r}]; import {module}; "
+        f"print(json.dumps([m for m in {_HEAVY!r} if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_entry_points_import_without_heavy_sdks():
+    for module in ("oracle_utils", "hash_evidence", "monitor_vault", "pipeline.guardrails",
+                   "pipeline.errors", "pipeline.graph", "pipeline.rag"):
+        assert _loaded_after_import(module) == [], module
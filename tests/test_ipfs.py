@@ -0,0 +1,127 @@
+"""Pytest for the hedged multi-gateway IPFS fetcher (local HTTP gateways, no network)."""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pipeline.errors import TransientError
+from pipeline.ipfs import IPFSFetcher, LocalBlockstore
+
+DOC = b"%PDF-1.4 genuine filing"
+DOC_HASH = hashlib.sha256(DOC).hexdigest()
+
+
+def _gateway(body: bytes, delay_s: float = 0.0, status: int = 200):
+    """Start a local gateway that answers every CID with body after delay_s."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay_s)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self):
+            time.sleep(delay_s)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/ipfs/"
+
+
+@pytest.fixture
+def gateways():
+    servers = []
+
+    def start(*args, **kwargs):
+        server, url = _gateway(*args, **kwargs)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_hedged_request_beats_slow_gateway(gateways):
+    """A slow primary triggers a hedge; the fast gateway's verified bytes win."""
+    slow, fast = gateways(DOC, delay_s=2.0), gateways(DOC)
+    fetcher = IPFSFetcher([slow, fast], timeout_s=5, hedge_after_s=0.1)
+    fetcher._stats[fast].ewma_latency_s = 5.0  # force the slow gateway to be asked first
+
+    result = fetcher.fetch("QmCase", DOC_HASH)
+    assert result.verified and result.source == fast
+    assert result.attempts == [slow, fast]
+    assert result.elapsed_s < 1.5
+
+
+def test_tampered_gateway_never_wins(gateways):
+    """A fast gateway serving wrong bytes loses to a slower correct one and is penalised."""
+    evil, honest = gateways(b"forged"), gateways(DOC, delay_s=0.2)
+    fetcher = IPFSFetcher([evil, honest], timeout_s=5, hedge_after_s=0.05)
+    fetcher._stats[honest].ewma_latency_s = 5.0
+
+    result = fetcher.fetch("QmCase", "0x" + DOC_HASH)
+    assert result.verified and result.content == DOC
+    assert fetcher.ranked()[0].url == honest
+
+
+def test_all_gateways_mismatch_returns_unverified(gateways):
+    """If every answer is wrong, the bytes are still returned so the integrity check flags tamper."""
+    fetcher = IPFSFetcher([gateways(b"forged")], timeout_s=5)
+    result = fetcher.fetch("QmCase", bytes.fromhex(DOC_HASH))
+    assert result.verified is False and result.content == b"forged"
+
+
+def test_blockstore_fallback_and_offline_failure(tmp_path, gateways):
+    """The local blockstore serves documents when gateways are down; otherwise TransientError."""
+    down = gateways(b"", status=503)
+    store = LocalBlockstore(str(tmp_path))
+    fetcher = IPFSFetcher([down], timeout_s=2, blockstore=store)
+
+    with pytest.raises(TransientError):
+        fetcher.fetch("QmCase", DOC_HASH)
+
+    store.put("QmCase", DOC)
+    result = fetcher.fetch("QmCase", DOC_HASH)
+    assert result.verified and result.source == "blockstore"
+
+
+def test_content_length_without_download(tmp_path, gateways):
+    """The scheduler's size probe: blockstore size first, else a gateway HEAD; None if all fail."""
+    down, up = gateways(b"", status=503), gateways(DOC)
+    assert IPFSFetcher([down], timeout_s=2).content_length("QmCase") is None
+    assert IPFSFetcher([down, up], timeout_s=2).content_length("QmCase") == len(DOC)
+
+    store = LocalBlockstore(str(tmp_path))
+    store.put("QmLocal", b"x" * 123)
+    assert IPFSFetcher([down], timeout_s=2, blockstore=store).content_length("QmLocal") == 123
+
+
+def test_size_probes_run_concurrently_under_one_deadline(gateways):
+    """A batch of CIDs costs one deadline, not a timeout per gateway per CID; sizes are cached."""
+    slow, fast = gateways(DOC, delay_s=1.0), gateways(DOC)
+    fetcher = IPFSFetcher([slow, fast], timeout_s=5)
+    fetcher._stats[fast].ewma_latency_s = 5.0       # the slow gateway ranks first
+
+    started = time.monotonic()
+    sizes = fetcher.content_lengths([f"QmCase{i}" for i in range(6)], deadline_s=0.5)
+    assert sizes == {f"QmCase{i}": len(DOC) for i in range(6)}
+    assert time.monotonic() - started < 0.5
+
+    stalled = IPFSFetcher([gateways(DOC, delay_s=1.0)], timeout_s=5)
+    started = time.monotonic()
+    assert stalled.content_lengths(["QmA", "QmB"], deadline_s=0.2) == {"QmA": None, "QmB": None}
+    assert time.monotonic() - started < 0.5
+    time.sleep(1.0)                                 # the late answers still fill the cache
+    started = time.monotonic()
+    assert stalled.content_lengths(["QmA", "QmB"], deadline_s=0.2) == {"QmA": len(DOC), "QmB": len(DOC)}
+    assert time.monotonic() - started < 0.1
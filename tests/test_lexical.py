@@ -0,0 +1,58 @@
+"""Pytest for hybrid retrieval: BM25, reciprocal rank fusion and the local reranker."""
+import pytest
+
+import pipeline.rag as rag
+from fakes import HashingEmbeddingFunction, pad_filing
+from pipeline.lexical import BM25Index, LexicalIndex, entity_types_for, reciprocal_rank_fusion, rerank
+
+DOCS = [
+    "The hearing was adjourned and the record was placed before the bench.",
+    "Eviction sought under Section 15 of the Punjab Rented Premises Act 2009.",
+    "Respondent: Mr. Tariq Mehmood, tenant of the premises since 2019.",
+]
+
+
+def test_bm25_and_fusion_rank_exact_identifiers():
+    """An exact statute reference wins lexically; RRF rewards agreement between rankings."""
+    index = BM25Index(DOCS)
+    assert index.top("Section 15 Rented Premises Act", 3)[0] == 1
+    assert index.top("zzz unknown", 3) == []
+
+    fused = reciprocal_rank_fusion([[2, 1, 0], [1, 0]])
+    assert max(fused, key=fused.get) == 1 and fused[0] > fused[2]
+
+
+def test_lexical_index_matches_in_memory_bm25(tmp_path):
+    """Postings written in batches score exactly like BM25Index over the same chunks."""
+    index = LexicalIndex(str(tmp_path / "lexical.sqlite"))
+    index.add("case_1", enumerate(DOCS[:2]))
+    index.add("case_1", [(2, DOCS[2])])
+    index.add("case_2", [(0, DOCS[0])])
+    memory = BM25Index(DOCS)
+    for query in ("Section 15 Rented Premises Act", "respondent tenant premises", "record bench hearing"):
+        assert index.top("case_1", query, 3) == memory.top(query, 3)
+    assert index.count("case_1") == 3 and index.top("case_1", "zzz unknown", 3) == []
+    index.drop("case_1")
+    assert index.count("case_1") == 0 and index.count("case_2") == 1
+
+
+def test_rerank_prefers_entities_the_query_asks_for():
+    """Equal fused scores: a parties query lifts the party block, a claims query the statute."""
+    assert entity_types_for("the parties involved") == ["party"]
+    assert entity_types_for("background") is None
+    flat = [1.0, 1.0, 1.0]
+    assert rerank("who are the parties", DOCS, flat)[0] == 2
+    assert rerank("legal claims and statute", DOCS, flat)[0] == 1
+
+
+def test_hybrid_retrieve_respects_limit_and_finds_parties(tmp_path, monkeypatch):
+    """Padded filing: hybrid context stays within the limit and keeps the party block."""
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(rag, "_chroma_client", None)
+    monkeypatch.setattr(rag, "EMBEDDING_FUNCTION", HashingEmbeddingFunction())
+    rag.ingest_text(pad_filing(" ".join(DOCS[1:]), pages=4), 601)
+
+    ranked = rag.hybrid_retrieve(601, rag._RETRIEVAL_QUERIES, limit=4)
+    indices = [i for i, _ in ranked]
+    assert 0 < len(ranked) <= 4 and len(set(indices)) == len(indices)
+    assert any("Tariq Mehmood" in text for _, text in ranked)
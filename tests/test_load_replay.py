@@ -0,0 +1,44 @@
+"""Pytest for the load replay's bookkeeping: arrival schedule, feed matching, saturation points."""
+import random
+
+from benchmarks.load_replay import FeedCursor, _Filing, arrivals, saturation_points
+
+
+def test_arrivals_poisson_rate_plus_bursts():
+    times = arrivals(2.0, 600, burst=0, burst_every=0, rng=random.Random(7))
+    assert times == sorted(times) and all(0 < t < 600 for t in times)
+    assert 1080 < len(times) < 1320                 # ~ rate × duration
+
+    bursty = arrivals(2.0, 600, burst=5, burst_every=100, rng=random.Random(7))
+    assert len(bursty) == len(times) + 30 and sum(t in (100, 200, 300, 400, 500, 600) for t in bursty) == 30
+    assert arrivals(0, 60, burst=3, burst_every=30, rng=random.Random(7)) == [30, 30, 30, 60, 60, 60]
+
+
+def test_feed_entry_ahead_of_its_receipt_is_matched_later():
+    filing = _Filing(100_001, "bafyslow", b"\0" * 32, due=0.0)
+    by_key = {}
+    cursor = FeedCursor()
+    entries = [{"event_key": "0xaa:0", "status": "BRIEF_GENERATED", "index": 0}]
+    assert cursor.take(entries, by_key) == []        # the oracle wrote it before submit() saw the receipt
+
+    by_key["0xaa:0"] = filing
+    entries.append({"event_key": "0xbb:0", "status": "REJECTED", "index": 1})
+    assert cursor.take(entries, by_key) == [(entries[0], filing)]
+    assert cursor.take(entries, by_key) == []
+    assert cursor.unmatched == [entries[1]]
+
+
+def test_saturation_points_per_instance_count():
+    steps = [
+        {"instances": 1, "rate": 2.0, "saturated": True},
+        {"instances": 1, "rate": 0.5, "saturated": False},
+        {"instances": 1, "rate": 1.0, "saturated": False},
+        {"instances": 1, "rate": 4.0, "saturated": False},     # a lucky run past saturation does not count
+        {"instances": 2, "rate": 0.5, "saturated": False},
+        {"instances": 4, "rate": 0.5, "saturated": True},
+    ]
+    assert saturation_points(steps) == {
+        1: {"sustained_rate": 1.0, "saturated_at": 2.0},
+        2: {"sustained_rate": 0.5, "saturated_at": None},
+        4: {"sustained_rate": None, "saturated_at": 0.5},
+    }
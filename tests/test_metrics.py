@@ -0,0 +1,54 @@
+"""Pytest for local pipeline instrumentation: spans, exposition formats, HTTP endpoint."""
+import json
+import urllib.request
+
+from pipeline.metrics import Registry, instrument_node, node_span, serve_metrics, NODE_WALL
+
+
+def test_registry_renders_prometheus_text():
+    """Counters, gauges and histograms render in Prometheus exposition format."""
+    reg = Registry()
+    reg.counter("jv_test_bytes_total", "bytes").inc(512, source="gateway")
+    reg.gauge("jv_test_queue_depth", "depth").set(3)
+    hist = reg.histogram("jv_test_seconds", "latency", buckets=(0.1, 1.0))
+    hist.observe(0.05, node="receive")
+    hist.observe(0.5, node="receive")
+
+    text = reg.render_prometheus()
+    assert '# TYPE jv_test_bytes_total counter' in text
+    assert 'jv_test_bytes_total{source="gateway"} 512' in text
+    assert 'jv_test_queue_depth 3' in text
+    assert 'jv_test_seconds_bucket{node="receive",le="0.1"} 1' in text
+    assert 'jv_test_seconds_bucket{node="receive",le="+Inf"} 2' in text
+    assert reg.snapshot()["metrics"]["jv_test_seconds"]['{node="receive"}']["count"] == 2
+
+
+def test_instrument_node_records_outcomes():
+    """Node spans are recorded per outcome; REJECTED updates count as 'rejected'."""
+    ok = instrument_node("unit_ok", lambda s: {"status": "EMBEDDING"})
+    rejected = instrument_node("unit_rej", lambda s: {"status": "REJECTED"})
+    ok({"case_id": 1})
+    rejected({"case_id": 1})
+    snap = NODE_WALL.snapshot()
+    assert snap['{node="unit_ok",outcome="ok"}']["count"] == 1
+    assert snap['{node="unit_rej",outcome="rejected"}']["count"] == 1
+
+    try:
+        with node_span("unit_err"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert NODE_WALL.snapshot()['{node="unit_err",outcome="error"}']["count"] == 1
+
+
+def test_metrics_endpoint_serves_text_and_json():
+    reg = Registry()
+    reg.counter("jv_test_total", "test").inc()
+    server = serve_metrics(0, registry=reg)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert "jv_test_total 1" in urllib.request.urlopen(f"{base}/metrics").read().decode()
+        payload = json.loads(urllib.request.urlopen(f"{base}/metrics.json").read())
+        assert payload["metrics"]["jv_test_total"] == {"_": 1.0}
+    finally:
+        server.shutdown()
@@ -0,0 +1,36 @@
+"""Pytest for structured logging: JSON records, span correlation, background listener."""
+import io
+import json
+import logging
+
+from pipeline.metrics import node_span
+from pipeline.observability import configure_logging, stop_logging
+
+
+def test_json_records_carry_span_context():
+    """Records inside a node span are stamped with its case_id / node / span_id; the span close logs duration_ms."""
+    out = io.StringIO()
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    configure_logging(level="DEBUG", fmt="json", stream=out)
+    try:
+        log = logging.getLogger("pipeline.test")
+        with node_span("embedding", case_id=42) as span:
+            log.info("stored %d chunks", 7, extra={"chunks": 7})
+        log.warning("outside any node", extra={"case_id": 9})
+    finally:
+        stop_logging()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    stored = next(r for r in records if r["msg"] == "stored 7 chunks")
+    assert stored["case_id"] == 42 and stored["node"] == "embedding" and stored["chunks"] == 7
+    assert stored["span_id"] == span.span_id and stored["level"] == "INFO"
+
+    finished = next(r for r in records if r["logger"] == "pipeline.metrics")
+    assert finished["span_id"] == span.span_id and finished["outcome"] == "ok"
+    assert finished["duration_ms"] >= 0
+
+    outside = next(r for r in records if r["msg"] == "outside any node")
+    assert outside["case_id"] == 9 and "node" not in outside
@@ -1,6 +1,11 @@
 """Pytest for Oracle logic: file integrity verification (Zero Trust)."""
+import hashlib
+import os
+
 import pytest
 
+import oracle_utils
+from hash_evidence import expand_paths, hash_files
 from oracle_utils import verify_file_integrity
 
 
@@ -26,3 +31,86 @@ def test_verify_file_integrity_expected_as_bytes(temp_pdf, expected_hash_hex):
     """Expected hash can be passed as bytes (e.g. from contract)."""
     hash_bytes = bytes.fromhex(expected_hash_hex)
     assert verify_file_integrity(temp_pdf, hash_bytes) is True
+
+
+def test_sha256_file_mmap_and_buffered_agree(tmp_path, monkeypatch):
+    """mmap and buffered paths produce the same digest as hashlib."""
+    data = os.urandom(3 * oracle_utils.HASH_BUFFER_SIZE + 17)
+    path = tmp_path / "exhibit.pdf"
+    path.write_bytes(data)
+    seen = []
+    monkeypatch.setattr(oracle_utils, "MMAP_MIN_BYTES", 1)
+    assert oracle_utils.sha256_file(path, on_progress=seen.append) == hashlib.sha256(data).hexdigest()
+    assert sum(seen) == len(data)
+    assert oracle_utils.sha256_file(path, use_mmap=False) == hashlib.sha256(data).hexdigest()
+
+
+def test_hash_files_manifest(tmp_path):
+    """Directories expand recursively; missing files are reported, not fatal."""
+    (tmp_path / "vol1").mkdir()
+    (tmp_path / "vol1" / "a.pdf").write_bytes(b"a")
+    (tmp_path / "b.pdf").write_bytes(b"b")
+    files = expand_paths([str(tmp_path)], "*.pdf") + [str(tmp_path / "missing.pdf")]
+    rows = hash_files(files, workers=4)
+    assert [os.path.basename(r["path"]) for r in rows] == ["b.pdf", "a.pdf", "missing.pdf"]
+    assert rows[1]["bytes32"] == "0xca978112ca1bbdcafac231b39a23dc4da786eff8147c4e72b9807785afee48bb"
+    assert rows[2]["error"] == "File not found"
+
+
+@pytest.fixture
+def counted_hashes(monkeypatch):
+    """Count real hashing work done underneath the verification cache."""
+    oracle_utils.clear_digest_cache()
+    calls = []
+    real = oracle_utils.sha256_file
+
+    def counting(path, *args, **kwargs):
+        calls.append(path)
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(oracle_utils, "sha256_file", counting)
+    yield calls
+    oracle_utils.clear_digest_cache()
+
+
+def test_verification_cache_reuses_digest(temp_pdf, expected_hash_hex, counted_hashes):
+    """Repeated checks of an unchanged file hash it once."""
+    for _ in range(3):
+        assert verify_file_integrity(temp_pdf, expected_hash_hex) is True
+    assert verify_file_integrity(temp_pdf, "0" * 64) is False
+    assert len(counted_hashes) == 1
+    assert verify_file_integrity(temp_pdf, expected_hash_hex, use_cache=False) is True
+    assert len(counted_hashes) == 2
+
+
+def test_verification_cache_detects_same_size_tamper(temp_pdf, expected_hash_hex, counted_hashes):
+    """Rewriting the file in place — same size, mtime restored — still forces a re-hash."""
+    assert verify_file_integrity(temp_pdf, expected_hash_hex) is True
+    st = os.stat(temp_pdf)
+    with open(temp_pdf, "r+b") as f:
+        f.write(b"X")
+    os.utime(temp_pdf, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(temp_pdf).st_size == st.st_size
+    assert verify_file_integrity(temp_pdf, expected_hash_hex) is False
+    assert len(counted_hashes) == 2
+
+
+def test_verification_cache_detects_replaced_file(temp_pdf, expected_hash_hex, counted_hashes):
+    """A file swapped in under the same path (new inode) is re-hashed."""
+    assert verify_file_integrity(temp_pdf, expected_hash_hex) is True
+    forged = temp_pdf + ".forged"
+    with open(forged, "wb") as f:
+        f.write(b"%PDF-1.4 forged")
+    os.replace(forged, temp_pdf)
+    assert verify_file_integrity(temp_pdf, expected_hash_hex) is False
+    assert len(counted_hashes) == 2
+
+
+def test_verification_cache_is_bounded(tmp_path, monkeypatch, counted_hashes):
+    """The LRU never grows past its configured size."""
+    monkeypatch.setattr(oracle_utils, "_digest_cache", oracle_utils._DigestCache(2))
+    for i in range(5):
+        path = tmp_path / f"exhibit_{i}.pdf"
+        path.write_bytes(str(i).encode())
+        oracle_utils.cached_sha256_file(path)
+    assert len(oracle_utils._digest_cache) == 2
@@ -0,0 +1,70 @@
+"""Pytest for the oracle's scheduler: shortest-job-first, aging, urgent cases, per-case order."""
+import pytest
+
+import monitor_vault
+from case_leases import LeaseStore
+from event_ledger import EventLedger
+from fakes import FakeEvent
+from pipeline.scheduler import CaseScheduler, estimate_pages
+
+
+def _drain(scheduler, now):
+    order = []
+    while (job := scheduler.pop(now=now)) is not None:
+        order.append(job.item)
+    return order
+
+
+def test_short_jobs_first_urgent_ahead_and_case_order_kept():
+    s = CaseScheduler("sjf", aging_s=0.5, urgent_cases={9})
+    s.add(1, "bundle", cost=2000, now=0)
+    s.add(2, "motion", cost=2, now=0)
+    s.add(3, "resume", cost=0, now=0)
+    s.add(9, "urgent bundle", cost=1500, now=0)
+    s.add(2, "motion validated", cost=0, now=0)     # must wait for case 2's filing
+    assert _drain(s, now=1) == ["urgent bundle", "resume", "motion", "motion validated", "bundle"]
+
+    fifo = CaseScheduler("fifo")
+    for case_id, item in enumerate(["a", "b", "c"]):
+        fifo.add(case_id, item, cost=100 - case_id, now=0)
+    assert _drain(fifo, now=0) == ["a", "b", "c"]
+    with pytest.raises(ValueError):
+        CaseScheduler("lifo")
+
+
+def _bundle_turn(s):
+    """Seconds until a bundle overtakes a steady stream of small filings."""
+    s.add(1, "bundle", cost=1000, now=0)
+    for t in range(0, 600, 10):
+        s.add(100 + t, f"motion@{t}", cost=5, now=t)
+        job = s.pop(now=t)
+        if job.item == "bundle":
+            return t
+
+
+def test_aging_and_deadline_bound_the_wait_of_a_large_job():
+    """Aging alone: a bundle overtakes small filings after ~cost × aging_s. The deadline cuts that short."""
+    assert 490 <= _bundle_turn(CaseScheduler("sjf", aging_s=0.5, max_wait_s=0)) <= 510
+    assert _bundle_turn(CaseScheduler("sjf", aging_s=0.5, max_wait_s=60)) == 60
+
+    # Overdue jobs run oldest first, ahead of urgent work
+    s = CaseScheduler("sjf", max_wait_s=60, urgent_cases={9})
+    s.add(1, "old bundle", cost=2000, now=0)
+    s.add(2, "old motion", cost=5, now=10)
+    s.add(9, "urgent", cost=1, now=70)
+    assert _drain(s, now=80) == ["old bundle", "old motion", "urgent"]
+    assert estimate_pages(None) == 20 and estimate_pages(120_000) == 3
+
+
+def test_job_leased_elsewhere_is_requeued(tmp_path, monkeypatch):
+    db = str(tmp_path / "leases.sqlite")
+    LeaseStore(db, "other").acquire(5)
+    handled = []
+    monkeypatch.setattr(monitor_vault, "_HANDLERS", {"EvidenceFiled": lambda e: handled.append(e["logIndex"])})
+    s = CaseScheduler("sjf")
+    s.add(5, ("EvidenceFiled", FakeEvent(5, 0)), cost=1)
+    s.add(6, ("EvidenceFiled", FakeEvent(6, 1)), cost=50)
+    leases, ledger, skip = LeaseStore(db, "me"), EventLedger(str(tmp_path / "events.sqlite")), set()
+    while monitor_vault.run_next(s, leases, ledger, skip):
+        pass
+    assert handled == [1] and skip == {5} and len(s) == 1
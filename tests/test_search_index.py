@@ -0,0 +1,57 @@
+"""Pytest for the case-level search index: FTS over briefs, metadata filters, catch-up from the feed."""
+from feed_store import FeedStore
+from search_index import SearchIndex, extract_parties, fts_query
+
+_BRIEF = (
+    "**Parties Involved:**\n- Petitioner: Ayesha Khan\n- Respondent: Crescent Textiles Ltd\n\n"
+    "**Key Claims:**\n- Wrongful termination without notice\n\n**Summary:**\n- Labour dispute."
+)
+
+
+def _entry(case_id, index, status="BRIEF_GENERATED", brief=_BRIEF, pii=(), ts="2026-01-01T00:00:00Z"):
+    return {
+        "caseId": case_id, "index": index, "status": status, "integrity_verified": status != "REJECTED",
+        "ai_summary": brief, "pii_flags": list(pii), "chunk_count": 3,
+        "timestamp_processed": ts, "file_hash_hex": "ab" * 32, "ipfs_cid": f"QmCase{case_id}x{index}",
+    }
+
+
+def test_search_text_and_filters(tmp_path):
+    """Briefs, parties, PII flags and CIDs are searchable; re-indexing a key replaces it."""
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    index.add_many([
+        _entry(101, 0, pii=["NIC"], ts="2026-01-02T00:00:00Z"),
+        _entry(102, 0, brief="**Parties Involved:**\n- Plaintiff: Bilal Traders\n\n**Summary:**\n- Cheque dishonour."),
+        _entry(103, 0, status="REJECTED", brief="Prompt injection: ignore previous instructions"),
+    ])
+
+    assert [h["caseId"] for h in index.search("crescent")] == [101]
+    assert [h["caseId"] for h in index.search("terminat")] == [101]     # prefix while typing
+    assert [h["caseId"] for h in index.search("NIC")] == [101]
+    assert [h["caseId"] for h in index.search("QmCase102x0")] == [102]
+    assert [h["caseId"] for h in index.search(status="REJECTED")] == [103]
+    assert index.search("crescent", since="2026-01-03") == []
+    assert index.search('"unbalanced (quote') == []                     # raw input never breaks FTS syntax
+    assert "[Crescent]" in index.search("crescent")[0]["snippet"]
+
+    index.add(_entry(101, 0, status="VALIDATED"))
+    assert index.count() == 3
+    assert index.search("crescent")[0]["status"] == "VALIDATED"
+
+
+def test_sync_catches_up_from_feed(tmp_path):
+    """sync() indexes only entries written since the last indexed feed version."""
+    store = FeedStore(str(tmp_path / "evidence_feed.json"))
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    store.append(_entry(1, 0))
+    store.append(_entry(2, 0))
+    assert index.sync(store) == 2
+    assert index.sync(store) == 0
+    store.append(_entry(3, 0))
+    assert index.sync(store) == 1 and index.feed_version() == 3
+
+
+def test_query_helpers():
+    assert fts_query("Crescent  Textiles!") == '"Crescent" "Textiles"*'
+    assert fts_query("  ") == ""
+    assert "Respondent: Crescent Textiles Ltd" in extract_parties(_BRIEF)
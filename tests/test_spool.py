@@ -0,0 +1,70 @@
+"""Pytest for the document spool: content addressing, pinning, quota eviction, hot tier."""
+import hashlib
+import os
+
+import pytest
+
+from pipeline.spool import DocumentSpool, SpoolInUse
+
+
+def _doc(n: int, size: int = 1000) -> bytes:
+    return (f"%PDF-1.4 filing {n} ".encode() * size)[:size]
+
+
+def test_content_addressed_and_quota_evicts_released_lru(tmp_path):
+    spool = DocumentSpool(str(tmp_path), quota_bytes=2500)
+    a = spool.put(_doc(1), owner=1)
+    assert os.path.basename(a) == hashlib.sha256(_doc(1)).hexdigest() + ".pdf"
+    assert spool.put(_doc(1), owner=2) == a          # same bytes, second case: stored once
+    b = spool.put(_doc(2), owner=3)
+    c = spool.put(_doc(3), owner=4)
+    assert spool.usage() == {"files": 3, "disk_bytes": 3000, "hot_bytes": 0, "pinned": 3}
+
+    # Over quota but everything is in flight: nothing may be deleted
+    assert all(os.path.exists(p) for p in (a, b, c))
+
+    spool.release(3)                # b released first → least recently used
+    assert not os.path.exists(b)
+    spool.release(1)                # a is still pinned by case 2
+    assert os.path.exists(a)
+    assert spool.acquire(b, owner=3) is None
+    assert spool.usage()["disk_bytes"] == 2000
+
+
+def test_hot_tier_demotes_on_release_and_restart_recovers(tmp_path):
+    disk, hot = tmp_path / "disk", tmp_path / "hot"
+    spool = DocumentSpool(str(disk), quota_bytes=10_000, hot_dir=str(hot), hot_quota_bytes=1500)
+    first = spool.put(_doc(1), owner=1)
+    second = spool.put(_doc(2), owner=2)            # hot tier full → straight to disk
+    assert os.path.dirname(first) == str(hot) and os.path.dirname(second) == str(disk)
+
+    spool.release(1)
+    assert spool.acquire(first, owner=1) == str(disk / os.path.basename(first))
+    assert spool.usage()["hot_bytes"] == 0
+
+    # Restart: a partial write is dropped, a leftover hot file is moved to disk, other files are untouched
+    (disk / "abc.pdf.1234.part").write_bytes(b"partial")
+    (disk / "demo.pdf").write_bytes(b"not managed")
+    leftover = hashlib.sha256(_doc(3)).hexdigest() + ".pdf"
+    (hot / leftover).write_bytes(_doc(3))
+    spool.close()                                   # the process exits
+    restarted = DocumentSpool(str(disk), quota_bytes=10_000, hot_dir=str(hot), hot_quota_bytes=1500)
+    assert sorted(os.listdir(disk)) == sorted([os.path.basename(first), os.path.basename(second), leftover,
+                                               "demo.pdf", ".lock"])
+    assert restarted.usage() == {"files": 3, "disk_bytes": 3000, "hot_bytes": 0, "pinned": 0}
+
+
+def test_each_process_gets_its_own_slot(tmp_path):
+    """A live spool's directory is never scanned (or its partial writes deleted) by another spool."""
+    a = DocumentSpool.open_slot(str(tmp_path), hot_base="")
+    in_flight = os.path.join(a.root, "deadbeef.pdf.1234.part")
+    open(in_flight, "wb").close()
+    with pytest.raises(SpoolInUse):
+        DocumentSpool(a.root)
+    b = DocumentSpool.open_slot(str(tmp_path), hot_base="")
+    assert (os.path.basename(a.root), os.path.basename(b.root)) == ("slot-0", "slot-1")
+    assert os.path.exists(in_flight)
+
+    a.close()                                       # a exits: the next process reuses its slot
+    c = DocumentSpool.open_slot(str(tmp_path), hot_base="")
+    assert c.root == a.root and not os.path.exists(in_flight)
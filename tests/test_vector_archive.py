@@ -0,0 +1,95 @@
+"""Pytest for the vector store lifecycle: archive finished cases, restore on demand, compaction."""
+import chromadb
+import os
+
+import numpy as np
+import pytest
+
+import monitor_vault
+import pipeline.rag as rag
+from case_leases import LeaseStore
+from fakes import HashingEmbeddingFunction
+
+
+@pytest.fixture
+def chroma(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(rag, "VECTOR_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(rag, "_chroma_client", None)
+    monkeypatch.setattr(rag, "EMBEDDING_FUNCTION", HashingEmbeddingFunction())
+    rag.ingest_text("Respondent Crescent Textiles terminated the petitioner without notice. " * 40, 601)
+    rag.ingest_text("Crescent Textiles failed to pay overtime wages to the complainant.", 602)
+    yield
+
+
+def _contents(case_id):
+    stored = rag._open_collection(case_id).get(include=["documents", "embeddings", "metadatas"])
+    order = np.argsort(stored["ids"])
+    return ([stored["ids"][i] for i in order], [stored["documents"][i] for i in order],
+            [stored["metadatas"][i] for i in order], np.asarray(stored["embeddings"])[order])
+
+
+def test_archived_case_leaves_the_live_store_and_is_restored_on_use(chroma):
+    ids, docs, metas, vectors = _contents(601)
+    ingested_at = rag._get_all_cases_collection().get(where={"case_id": 601}, limit=1)["metadatas"][0]["ingested_at"]
+
+    assert rag.archive_case(601) > 0
+    assert rag.live_case_ids() == [602] and rag.archived_case_ids() == [601]
+    # Its all_cases rows stay: cross-case search still finds it without a restore
+    assert {h.case_id for h in rag.search_all_cases("Crescent Textiles").hits} == {601, 602}
+    assert rag.archived_case_ids() == [601]
+    assert rag.archive_case(601) == 0               # already archived
+
+    # Any use of the case (a new filing, a brief) brings it back
+    assert rag.retrieve_chunks(601, "terminated without notice")
+    assert rag.live_case_ids() == [601, 602] and rag.archived_case_ids() == []
+    restored_ids, restored_docs, restored_metas, restored_vectors = _contents(601)
+    assert (restored_ids, restored_docs, restored_metas) == (ids, docs, metas)
+    assert np.allclose(restored_vectors, vectors, atol=1e-3)     # float16 archive
+    shared = rag._get_all_cases_collection().get(where={"case_id": 601})
+    assert len(shared["ids"]) == len(ids) and {m["ingested_at"] for m in shared["metadatas"]} == {ingested_at}
+
+
+def test_compaction_removes_segments_of_deleted_collections(chroma):
+    def segment_dirs():
+        return {d for d in os.listdir(rag.CHROMA_DIR) if os.path.isdir(os.path.join(rag.CHROMA_DIR, d))}
+
+    before = segment_dirs()
+    rag.archive_case(601)
+    assert segment_dirs() == before                 # Chroma leaves the deleted collection's files
+    assert rag.compact_store() > 0
+    assert segment_dirs() < before
+    assert rag.retrieve_chunks(602, "overtime wages")
+    assert rag.retrieve_chunks(601, "terminated without notice")
+
+
+def test_compaction_runs_only_on_the_pinned_chromadb(chroma, monkeypatch):
+    assert chromadb.__version__.startswith(rag.COMPACT_CHROMA_VERSION)     # requirements.txt pin
+    monkeypatch.setattr(chromadb, "__version__", "1.6.0")
+    with pytest.raises(RuntimeError, match="1.6.0"):
+        rag.compact_store()
+
+
+def test_oracle_prune_archives_finished_cases_not_leased(chroma, tmp_path, monkeypatch):
+    leases = LeaseStore(str(tmp_path / "leases.sqlite"), "oracle-b")
+    LeaseStore(str(tmp_path / "leases.sqlite"), "oracle-a").acquire(602)     # reopened elsewhere
+    archive_case, held = rag.archive_case, []
+
+    def archive_under_lease(case_id):
+        held.append((case_id, leases.owner(case_id)))
+        return archive_case(case_id)
+
+    monkeypatch.setattr(rag, "archive_case", archive_under_lease)
+    assert monitor_vault.archive_finished_cases(["case_601", "case_602", "adhoc"], leases) == 1
+    assert held == [(601, "oracle-b")]              # the lease is held for the whole archive
+    assert leases.owner(601) is None and leases.owner(602) == "oracle-a"
+    assert rag.live_case_ids() == [602] and rag.archived_case_ids() == [601]
+
+
+def test_dropped_case_leaves_live_store_archive_and_search(chroma):
+    rag.archive_case(601)
+    for case_id in (601, 602):
+        rag.drop_case(case_id)
+    assert rag.live_case_ids() == [] and rag.archived_case_ids() == []
+    assert rag.search_all_cases("Crescent Textiles").hits == []
+    assert rag._lexical_index().count("case_602") == 0